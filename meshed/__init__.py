@@ -17,15 +17,74 @@ by an adjacency Mapping.
 """
 
 
-from meshed.dag import DAG, ch_funcs, ch_names
-from meshed.base import FuncNode, compare_signatures
-from meshed.makers import code_to_dag, code_to_fnodes
-from meshed.itools import random_graph, topological_sort
-from meshed.slabs import Slabs
-from meshed.util import (
-    iterize,
-    ConditionalIterize,
-    instance_checker,
-    replace_item_in_iterable,
-    parameter_merger,
-)
+import sys
+from typing import TYPE_CHECKING
+
+# The objects exported by ``meshed``, and the modules they're imported from.
+# They're imported lazily (on first access, see ``__getattr__``), so that
+# ``from meshed import DAG`` doesn't pay for the import of modules it doesn't need
+# (like ``meshed.makers`` or ``meshed.slabs``).
+_lazy_objects = {
+    'DAG': 'meshed.dag',
+    'ch_funcs': 'meshed.dag',
+    'ch_names': 'meshed.dag',
+    'FuncNode': 'meshed.base',
+    'compare_signatures': 'meshed.base',
+    'code_to_dag': 'meshed.makers',
+    'code_to_fnodes': 'meshed.makers',
+    'random_graph': 'meshed.itools',
+    'topological_sort': 'meshed.itools',
+    'Slabs': 'meshed.slabs',
+    'iterize': 'meshed.util',
+    'ConditionalIterize': 'meshed.util',
+    'instance_checker': 'meshed.util',
+    'replace_item_in_iterable': 'meshed.util',
+    'parameter_merger': 'meshed.util',
+}
+
+__all__ = list(_lazy_objects)
+
+
+def _import_module(name: str):
+    # (__import__ rather than importlib.import_module, since the latter's imports
+    # aren't reported by ``python -X importtime``)
+    __import__(name)
+    return sys.modules[name]
+
+
+def __getattr__(name):
+    """Import the exported objects, and the submodules, of ``meshed`` on demand"""
+    if name in _lazy_objects:
+        value = getattr(_import_module(_lazy_objects[name]), name)
+    elif not name.startswith('_'):
+        try:
+            value = _import_module(f'{__name__}.{name}')
+        except ModuleNotFoundError as error:
+            if error.name != f'{__name__}.{name}':
+                raise  # the submodule exists, but imports something that doesn't
+            raise AttributeError(
+                f'module {__name__!r} has no attribute {name!r}'
+            ) from None
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value  # so __getattr__ isn't called for it again
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:  # (so that static analysis tools see the exported objects)
+    from meshed.dag import DAG, ch_funcs, ch_names
+    from meshed.base import FuncNode, compare_signatures
+    from meshed.makers import code_to_dag, code_to_fnodes
+    from meshed.itools import random_graph, topological_sort
+    from meshed.slabs import Slabs
+    from meshed.util import (
+        iterize,
+        ConditionalIterize,
+        instance_checker,
+        replace_item_in_iterable,
+        parameter_merger,
+    )
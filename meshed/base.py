@@ -1,18 +1,35 @@
 """
 Base functionality of meshed
 """
+import sys
 from collections import Counter
 from dataclasses import dataclass, field, fields
 from functools import partial, cached_property
-from typing import Callable, MutableMapping, Iterable, Union, Sized, Sequence, Literal
+from typing import (
+    Callable,
+    MutableMapping,
+    Mapping,
+    Iterable,
+    Union,
+    Sized,
+    Sequence,
+    Literal,
+)
 
 from i2 import Sig, call_somewhat_forgivingly
 from i2.signatures import (
+    empty,
     ch_variadics_to_non_variadic_kind,
     CallableComparator,
     compare_signatures,
 )
-from meshed.util import ValidationError, NameValidationError, mk_func_name
+from meshed.util import (
+    ValidationError,
+    NameValidationError,
+    mk_func_name,
+    signature_of,
+)
+from meshed.caching import NodeCache, NodeCacheSpec, mk_node_cache
 from meshed.itools import add_edge
 
 BindInfo = Literal['var_nodes', 'params', 'hybrid']
@@ -100,7 +117,110 @@ def basic_node_validator(func_node):
     )
 
 
+class CallPlan:
+    """A precompiled plan to call ``func`` with arguments sourced from a scope.
+
+    The plan maps the (``bind``) scope keys directly to the positional and keyword
+    slots of ``func``, so that calling it on a scope only involves direct lookups
+    and one function call (no signature resolution).
+
+    >>> def foo(w, /, x, y=2, *, z=3):
+    ...     return (w, x, y, z)
+    >>> plan = CallPlan(foo, Sig(foo), bind={'w': 'W', 'x': 'X', 'y': 'Y', 'z': 'z'})
+    >>> plan({'W': 0, 'X': 1, 'z': 4})
+    (0, 1, 2, 4)
+
+    Extra scope keys are ignored, but missing required ones are not:
+
+    >>> plan({'X': 1, 'other': 42})
+    Traceback (most recent call last):
+      ...
+    TypeError: missing a required argument: 'w'
+
+    """
+
+    __slots__ = ('func', 'positional', 'keyword')
+
+    def __init__(self, func: Callable, sig: Sig, bind: dict):
+        self.func = func
+        positional, keyword = [], []
+        for param in sig.params:
+            src = bind.get(param.name, param.name)
+            if param.kind == param.POSITIONAL_ONLY:
+                positional.append((src, param.name, param.default))
+            else:
+                keyword.append((src, param.name, param.default))
+        self.positional = tuple(positional)
+        self.keyword = tuple(keyword)
+
+    def __call__(self, scope: Mapping):
+        args, kwargs = self.arguments(scope)
+        return self.func(*args, **kwargs)
+
+    def arguments(self, scope: Mapping):
+        """The ``(args, kwargs)`` to call ``func`` with, sourced from ``scope``"""
+        args = []
+        for src, name, default in self.positional:
+            if src in scope:
+                args.append(scope[src])
+            elif default is not empty:
+                # a positional-only arg can't be skipped, so we use its default
+                args.append(default)
+            else:
+                raise TypeError(f"missing a required argument: '{name}'")
+        kwargs = {}
+        for src, name, default in self.keyword:
+            if src in scope:
+                kwargs[name] = scope[src]
+            elif default is empty:
+                raise TypeError(f"missing a required argument: '{name}'")
+        return args, kwargs
+
+    def __repr__(self):
+        names = [name for _, name, _ in self.positional + self.keyword]
+        return f"CallPlan({getattr(self.func, '__name__', self.func)}: {names})"
+
+
+class CachingCallPlan(CallPlan):
+    """A ``CallPlan`` whose calls go through a ``cache`` (see
+    ``meshed.caching.NodeCache``), so that ``func`` isn't called again on the same
+    arguments.
+
+    >>> from meshed.caching import NodeCache
+    >>> def add(a, b=1):
+    ...     print('computing')
+    ...     return a + b
+    >>> plan = CachingCallPlan(add, Sig(add), bind={'a': 'x'}, cache=NodeCache())
+    >>> plan({'x': 2})
+    computing
+    3
+    >>> plan({'x': 2, 'y': 'not an input'})
+    3
+    """
+
+    __slots__ = ('cache',)
+
+    def __init__(self, func: Callable, sig: Sig, bind: dict, cache: NodeCache):
+        super().__init__(func, sig, bind)
+        self.cache = cache
+
+    def __call__(self, scope: Mapping):
+        args, kwargs = self.arguments(scope)
+        return self.cache(self.func, args, kwargs)
+
+
+def mk_call_plan(func: Callable, sig: Sig, bind: dict, cache=None) -> CallPlan:
+    if cache is None:
+        return CallPlan(func, sig, bind)
+    return CachingCallPlan(func, sig, bind, cache)
+
+
 def handle_variadics(func):
+    try:
+        if not signature_of(func).has_var_kinds:
+            return func  # (nothing to handle: no need to wrap func)
+    except ValueError:
+        pass
     func = ch_variadics_to_non_variadic_kind(func)
     # sig = Sig(func)
     # var_kw = sig.var_keyword_name
@@ -111,12 +231,37 @@ def handle_variadics(func):
     return func
 
 
+def _with_slots(*extra_slots):
+    """Make a dataclass use ``__slots__`` (its fields, and ``extra_slots``), as
+    ``dataclass(slots=True)`` does in python 3.10+.
+
+    Note: The class is remade, so its methods can't use the argumentless ``super()``.
+    """
+
+    def add_slots(cls):
+        field_names = tuple(f.name for f in fields(cls))
+        cls_dict = dict(cls.__dict__)
+        cls_dict['__slots__'] = field_names + tuple(extra_slots)
+        for name in field_names + ('__dict__', '__weakref__'):
+            cls_dict.pop(name, None)  # (the field defaults are kept by __init__)
+        new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+        new_cls.__qualname__ = cls.__qualname__
+        return new_cls
+
+    return add_slots
+
+
+def _interned(name):
+    return sys.intern(name) if type(name) is str else name
+
+
 # TODO: When 3.10, look into and possibly use match_args in to_dict and from_dict
 # TODO: Make FuncNode immutable (is there a way to use frozen=True with post_init?)
 # TODO: How to get a safe hash? Needs to be immutable only?
 # TODO: FuncNode(func_node) gives us FuncNode(scope -> ...). Should we have it be
 #  FuncNode.from_dict(func_node.to_dict()) instead?
 # @dataclass(eq=True, order=True, unsafe_hash=True)
+@_with_slots('__name__', 'sig', 'call_plan', '_hash', '__weakref__')
 @dataclass(order=True)
 class FuncNode:
     """A function wrapper that makes the function amenable to operating in a network.
@@ -128,6 +273,13 @@ class FuncNode:
         This only has to be used if the external names are different from the names
         of the arguments of the function.
     :param out: The variable name the function should write it's result to
+    :param executor: The executor the function should be computed with, when
+        computed in a ``DAG`` (e.g. ``'threads'`` or ``'processes'``. See
+        ``meshed.executors``). If ``None``, the ``DAG``'s executor is used.
+    :param cache: Whether to remember the outputs of the function, to not compute
+        them again for the same inputs: ``True``, a ``meshed.caching.NodeCache``
+        (to control the size, time-to-live, and keys of the cache), or a mapping of
+        ``NodeCache`` arguments. The cache stats are in ``func_node.cache.stats``.
 
     Like we stated: `FuncNode` is meant to operate in computational networks.
     But knowing what it does will help you make the networks you want, so we commend
@@ -213,6 +365,10 @@ class FuncNode:
     you'll **need** to give it a custom name because the functions are identified by
     this name in the network.
 
+    Since many func nodes are often kept in memory, they're compact: they have
+    ``__slots__``, and their names are interned. Their hash (which reflects their
+    ``name``, ``bind`` and ``out``) is computed once, and only recomputed if these
+    are reassigned (mutating ``bind`` in place isn't tracked: use ``ch_attrs``).
 
     """
 
@@ -225,24 +381,27 @@ class FuncNode:
     # write_output_into_scope: bool = True  # TODO: Do we really want to allow False?
     names_maker: Callable = underscore_func_node_names_maker
     node_validator: Callable = basic_node_validator
+    executor: Union[str, None] = field(default=None, repr=False)
+    cache: NodeCacheSpec = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         self.func = handle_variadics(self.func)
         _func_node_args_validation(func=self.func, name=self.name, out=self.out)
-        self.name, self.out = self.names_maker(self.func, self.name, self.out)
-        self.__name__ = self.name
-        # self.__name__ = self.name
+        name, out = self.names_maker(self.func, self.name, self.out)
+        self.name, self.out = _interned(name), _interned(out)
         # The wrapped function's signature will be useful
         # when interfacing with it and the scope.
-        self.sig = Sig(self.func)
+        self.sig = signature_of(self.func)  # (shared by all nodes of a same func)
 
         # replace integer bind keys with their corresponding name
-        self.bind = _bind_where_int_keys_repl_with_argname(self.bind, self.sig.names)
+        bind = _bind_where_int_keys_repl_with_argname(self.bind, self.sig.names)
         # complete bind with the argnames of the signature
-        _complete_dict_with_iterable_of_required_keys(self.bind, self.sig.names)
-        _func_node_args_validation(bind=self.bind)
+        _complete_dict_with_iterable_of_required_keys(bind, self.sig.names)
+        _func_node_args_validation(bind=bind)
+        self.bind = {_interned(k): _interned(v) for k, v in bind.items()}
 
-        self.extractor = partial(_mapped_extraction, to_extract=self.bind)
+        self.cache = mk_node_cache(self.cache, self)
+        self.call_plan = mk_call_plan(self.func, self.sig, self.bind, self.cache)
 
         if self.func_label is None:
             self.func_label = self.name
@@ -300,16 +459,47 @@ class FuncNode:
 
         Note: This method is only meant to be used as a backend to __call__, not as
         an actual interface method. Additional control/constraints on read and writes
-        can be implemented by providing a custom scope for that."""
-        relevant_kwargs = dict(self.extractor(scope))
-        args, kwargs = self.sig.args_and_kwargs_from_kwargs(relevant_kwargs)
-        output = call_somewhat_forgivingly(
-            self.func, args, kwargs, enforce_sig=self.sig
-        )
+        can be implemented by providing a custom scope for that.
+
+        The arguments are sourced through ``self.call_plan``, which is compiled once
+        (from ``func``, ``sig`` and ``bind``) so that no signature resolution happens
+        at call time.
+        """
+        output = self.call_plan(scope)
         if write_output_into_scope:
             scope[self.out] = output
         return output
 
+    @property
+    def extractor(self):
+        return partial(_mapped_extraction, to_extract=self.bind)
+
+    def __setattr__(self, name, value):
+        # (not super().__setattr__, since the class is remade by _with_slots)
+        object.__setattr__(self, name, value)
+        # Keep the call plan in sync if the attributes it was compiled from change
+        # (e.g. ``DAG.bindings_cleaner`` reassigns ``bind``), and the hash and
+        # __name__ if the identity (see ``_hash_str``) changes.
+        if name in _identity_attrs:
+            object.__setattr__(self, '_hash', None)
+            if name == 'name':
+                object.__setattr__(self, '__name__', value)
+        if name in _call_plan_attrs and hasattr(self, 'call_plan'):
+            self.call_plan = mk_call_plan(self.func, self.sig, self.bind, self.cache)
+
+    def __getstate__(self):
+        # The hash isn't pickled: string hashes differ between processes
+        return {
+            name: getattr(self, name)
+            for name in _func_node_state_attrs
+            if hasattr(self, name)
+        }
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_hash', None)
+
     def _hash_str(self):
         """Design idea.
         Attempt to construct a hash that reflects the actual identity we want.
@@ -322,7 +512,9 @@ class FuncNode:
 
     # TODO: Find a better one. Need to have guidance on hash and eq methods dos-&-donts
     def __hash__(self):
-        return hash(self._hash_str())
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash(self._hash_str()))
+        return self._hash
 
     def __eq__(self, other):
         return hash(self) == hash(other)
@@ -386,6 +578,13 @@ class FuncNode:
         return isinstance(obj, cls)
 
 
+_call_plan_attrs = frozenset({'func', 'sig', 'bind', 'cache'})
+_identity_attrs = frozenset({'name', 'bind', 'out'})
+_func_node_state_attrs = tuple(
+    name for name in FuncNode.__slots__ if name not in {'_hash', '__weakref__'}
+)
+
+
 @dataclass
 class Mesh:
     func_nodes: Iterable[FuncNode]
@@ -483,12 +682,16 @@ def is_not_func_node(obj) -> bool:
 def get_init_params_of_instance(obj):
     """Get names of instance object ``obj`` that are also parameters of the
     ``__init__`` of its class"""
-    return {k: v for k, v in vars(obj).items() if k in Sig(type(obj)).names}
+    init_names = signature_of(type(obj)).names
+    return {k: getattr(obj, k) for k in init_names if hasattr(obj, k)}
 
 
 def ch_func_node_attrs(fn: FuncNode, **new_attrs_values):
     """Returns a copy of the func node with some of its attributes changed
 
+    Unless a ``cache`` is given, the copy gets an empty copy of the cache of ``fn``
+    (if any), so doesn't share its outputs and stats.
+
     >>> def plus(a, b):
     ...     return a + b
     ...
@@ -517,6 +720,9 @@ def ch_func_node_attrs(fn: FuncNode, **new_attrs_values):
             f'These are not params of {type(fn).__name__}: '
             f'{params_that_are_not_init_params}'
         )
+    if 'cache' not in new_attrs_values and isinstance(fn.cache, NodeCache):
+        # the copy gets its own (empty) cache, so that its stats are its own
+        new_attrs_values['cache'] = fn.cache.empty_copy()
     fn_kwargs = dict(init_params, **new_attrs_values)
     return FuncNode(**fn_kwargs)
 
@@ -555,8 +761,8 @@ def ch_func_node_func(
 
 
 def _new_bind(fnode, new_func):
-    old_sig = Sig(fnode.func)
-    new_sig = Sig(new_func)
+    old_sig = signature_of(fnode.func)
+    new_sig = signature_of(new_func)
     old_bind: dict = fnode.bind
     old_to_new_names_map = dict(zip(old_sig.names, new_sig.names))
     # TODO: assert some health stats on old_to_new_names_map
@@ -788,4 +994,7 @@ def func_node_transformer(
     for trans in kwargs_transformers:
         if (new_kwargs := trans(func_node_kwargs)) is not None:
             func_node_kwargs = new_kwargs
+    if func_node_kwargs.get('cache') is fn.cache and isinstance(fn.cache, NodeCache):
+        # (as in ch_func_node_attrs: the new func node gets its own, empty, cache)
+        func_node_kwargs = dict(func_node_kwargs, cache=fn.cache.empty_copy())
     return FuncNode.from_dict(func_node_kwargs)
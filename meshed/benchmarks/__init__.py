@@ -0,0 +1,38 @@
+"""Benchmarks of meshed: The time (and memory) it takes to make DAGs of different
+shapes and sizes, to call them (or their ``compile()``-d function), and to
+transform them (``dag[ins:outs]``,
+``ch_funcs``, ``partial``, ``code_to_dag``).
+
+Run them, saving the results in a json file, with::
+
+    python -m meshed.benchmarks run -o results.json
+
+and compare two results (flagging, and exiting with a non-zero code, when a metric
+increased by more than the threshold) with::
+
+    python -m meshed.benchmarks compare baseline.json results.json --threshold 0.2
+
+(or ``run`` with a ``--baseline`` to do both). See ``--help`` for more options.
+
+``run`` also times the imports of ``meshed`` (see ``scenarios.import_statements``),
+and the modules an import spends the most time on can be listed with::
+
+    python -m meshed.benchmarks imports "from meshed import DAG"
+"""
+
+from meshed.benchmarks.scenarios import (
+    Scenario,
+    scenarios,
+    shapes,
+    import_statements,
+)
+from meshed.benchmarks.runner import (
+    run_benchmarks,
+    run_import_benchmarks,
+    import_time,
+    import_time_breakdown,
+    compare_results,
+    regressions,
+    save_results,
+    load_results,
+)
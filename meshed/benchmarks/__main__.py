@@ -0,0 +1,7 @@
+"""Run the meshed benchmarks: ``python -m meshed.benchmarks --help``"""
+
+import sys
+
+from meshed.benchmarks.runner import main
+
+sys.exit(main())
@@ -0,0 +1,314 @@
+"""Running the benchmark scenarios, saving their results, and comparing results."""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from meshed.benchmarks.scenarios import Scenario
+
+DFLT_REPEAT = 5
+DFLT_THRESHOLD = 0.2  # a 20% increase is a regression
+
+
+def time_scenario(
+    scenario: Scenario, repeat: int = DFLT_REPEAT, number: Optional[int] = None
+) -> dict:
+    """Time (and possibly memory-profile) the ``run`` of a ``scenario``.
+
+    The best (minimum) of ``repeat`` timings of ``number`` runs is kept, as the time
+    per run, in seconds. If ``number`` is not given, it's chosen (by
+    ``timeit.Timer.autorange``) so that a timing takes at least 0.2 seconds.
+    """
+    prepared = scenario.setup()
+    timer = timeit.Timer(lambda: scenario.run(prepared))
+    if number is None:
+        number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    result = {'time': min(times), 'times': times, 'number': number}
+    if scenario.measure_memory:
+        result['peak_memory'] = peak_memory(scenario.run, prepared)
+    return result
+
+
+def peak_memory(func, *args) -> int:
+    """The peak memory (in bytes) allocated during the call ``func(*args)``"""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    elif hasattr(tracemalloc, 'reset_peak'):  # (python 3.9+)
+        tracemalloc.reset_peak()
+    else:  # (clearing the traces also resets the peak)
+        tracemalloc.clear_traces()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return peak - baseline
+
+
+_import_timing_code = (
+    'import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)'
+)
+
+
+def _run_python(args: List[str]) -> subprocess.CompletedProcess:
+    """Run a fresh python interpreter (in which ``meshed`` is this ``meshed``)"""
+    from meshed import __file__ as meshed_file
+
+    env = dict(os.environ)
+    meshed_parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(meshed_file)))
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [meshed_parent_dir, env.get('PYTHONPATH', '')])
+    )
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True, env=env
+    )
+
+
+def import_time(statement: str, repeat: int = DFLT_REPEAT) -> dict:
+    """Time the (import) ``statement``, in seconds, in ``repeat`` fresh interpreters
+    (so that nothing is imported already), keeping the best (minimum) time."""
+    code = _import_timing_code.format(statement=statement)
+    times = [float(_run_python(['-c', code]).stdout) for _ in range(repeat)]
+    return {'time': min(times), 'times': times, 'number': 1}
+
+
+def import_time_breakdown(statement: str) -> List[Tuple[str, float, float]]:
+    """The ``(module, self_time, cumulative_time)`` triples (times in seconds) of the
+    modules imported by ``statement``, slowest (cumulative time) first, as reported
+    by ``python -X importtime``."""
+    stderr = _run_python(['-X', 'importtime', '-c', statement]).stderr
+    breakdown = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:') :].split('|')
+        breakdown.append((module.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return sorted(breakdown, key=lambda triple: triple[2], reverse=True)
+
+
+def _print_result(name: str, result: dict):
+    summary = f"{result['time']:.3e} s" if 'time' in result else 'FAILED'
+    print(f'{name:<30} {summary}', flush=True)
+
+
+def run_import_benchmarks(
+    statements: Mapping[str, str], repeat: int = DFLT_REPEAT, verbose: bool = False
+) -> dict:
+    """Time the ``{name: import_statement, ...}`` ``statements`` (see
+    ``import_time``), returning the ``{name: result, ...}`` results"""
+    results = {}
+    for name, statement in statements.items():
+        try:
+            results[name] = import_time(statement, repeat)
+        except subprocess.CalledProcessError as error:
+            results[name] = {'error': error.stderr.strip().splitlines()[-1]}
+        if verbose:
+            _print_result(name, results[name])
+    return results
+
+
+def run_benchmarks(
+    scenarios: Iterable[Scenario],
+    repeat: int = DFLT_REPEAT,
+    number: Optional[int] = None,
+    verbose: bool = False,
+) -> dict:
+    """Run the ``scenarios`` and return the results (a json-serializable dict).
+    See ``time_scenario`` for ``repeat`` and ``number``."""
+    results = {}
+    for scenario in scenarios:
+        try:
+            results[scenario.name] = time_scenario(scenario, repeat, number)
+        except Exception as error:
+            # a scenario that fails (e.g. hits the recursion limit) is recorded as such
+            results[scenario.name] = {'error': f'{type(error).__name__}: {error}'}
+        if verbose:
+            _print_result(scenario.name, results[scenario.name])
+    return {'meta': environment_info(repeat=repeat, number=number), 'results': results}
+
+
+def environment_info(**extras) -> dict:
+    from meshed import __file__ as meshed_file
+
+    try:
+        from importlib.metadata import version
+
+        meshed_version = version('meshed')
+    except Exception:
+        meshed_version = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'meshed_version': meshed_version,
+        'meshed_path': meshed_file,
+        **extras,
+    }
+
+
+def save_results(results: dict, filepath: str):
+    with open(filepath, 'w') as fp:
+        json.dump(results, fp, indent=2)
+
+
+def load_results(filepath: str) -> dict:
+    with open(filepath) as fp:
+        return json.load(fp)
+
+
+class Comparison(NamedTuple):
+    name: str
+    metric: str  # 'time' or 'peak_memory'
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float('inf')
+
+    def is_regression(self, threshold: float = DFLT_THRESHOLD) -> bool:
+        return self.ratio > 1 + threshold
+
+
+def compare_results(baseline: dict, current: dict) -> List[Comparison]:
+    """Compare the metrics of the scenarios that are in both results.
+    (A scenario that failed has no metrics, so isn't compared.)
+
+    >>> baseline = {'results': {'call/chain/10': {'time': 1e-05}}}
+    >>> current = {'results': {'call/chain/10': {'time': 1.5e-05}}}
+    >>> [comparison] = compare_results(baseline, current)
+    >>> comparison.ratio, comparison.is_regression(threshold=0.2)
+    (1.5, True)
+    """
+    comparisons = []
+    for name, current_result in current['results'].items():
+        baseline_result = baseline['results'].get(name, None)
+        if baseline_result is None:
+            continue
+        for metric in ('time', 'peak_memory'):
+            if metric in current_result and metric in baseline_result:
+                comparisons.append(
+                    Comparison(
+                        name, metric, baseline_result[metric], current_result[metric]
+                    )
+                )
+    return comparisons
+
+
+def regressions(
+    baseline: dict, current: dict, threshold: float = DFLT_THRESHOLD
+) -> List[Comparison]:
+    """The comparisons where the current metric is more than ``1 + threshold`` times
+    the baseline one"""
+    return [
+        c for c in compare_results(baseline, current) if c.is_regression(threshold)
+    ]
+
+
+def comparison_table(
+    comparisons: Iterable[Comparison], threshold: float = DFLT_THRESHOLD
+) -> str:
+    lines = [f"{'scenario':<30} {'metric':<12} {'baseline':>10} {'current':>10} ratio"]
+    for c in comparisons:
+        flag = '  REGRESSION' if c.is_regression(threshold) else ''
+        lines.append(
+            f'{c.name:<30} {c.metric:<12} {c.baseline:>10.3e} {c.current:>10.3e} '
+            f'{c.ratio:5.2f}{flag}'
+        )
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """The command line interface (see ``python -m meshed.benchmarks --help``)"""
+    import argparse
+
+    from meshed.benchmarks.scenarios import (
+        DFLT_SIZES,
+        import_statements,
+        scenarios,
+        shapes,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog='python -m meshed.benchmarks',
+        description='Benchmark meshed DAG construction and call overhead.',
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmarks')
+    run_parser.add_argument('-o', '--output', help='The json file to save results in')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=list(DFLT_SIZES))
+    run_parser.add_argument(
+        '--shapes', nargs='+', default=list(shapes), choices=list(shapes)
+    )
+    run_parser.add_argument('--repeat', type=int, default=DFLT_REPEAT)
+    run_parser.add_argument(
+        '--number', type=int, default=None, help='Runs per timing (default: auto)'
+    )
+    run_parser.add_argument(
+        '--baseline', help='A json file of results to compare to (see compare)'
+    )
+    run_parser.add_argument('--threshold', type=float, default=DFLT_THRESHOLD)
+    run_parser.add_argument(
+        '--no-imports',
+        dest='imports',
+        action='store_false',
+        help="Don't time the imports of meshed",
+    )
+
+    compare_parser = subparsers.add_parser(
+        'compare', help='Compare results, flagging regressions'
+    )
+    compare_parser.add_argument('baseline', help='The json file of baseline results')
+    compare_parser.add_argument('current', help='The json file of current results')
+    compare_parser.add_argument('--threshold', type=float, default=DFLT_THRESHOLD)
+
+    imports_parser = subparsers.add_parser(
+        'imports', help='Show the modules an import spends the most time importing'
+    )
+    imports_parser.add_argument(
+        'statement', nargs='?', default=import_statements['import/meshed']
+    )
+    imports_parser.add_argument('--top', type=int, default=20)
+
+    args = parser.parse_args(argv)
+    if args.command == 'imports':
+        print(f"{'cumulative':>10} {'self':>10}  module")
+        for module, self_time, cumulative_time in import_time_breakdown(
+            args.statement
+        )[: args.top]:
+            print(f'{cumulative_time:>10.6f} {self_time:>10.6f}  {module}')
+        return 0
+    if args.command == 'run':
+        current = run_benchmarks(
+            scenarios(args.sizes, args.shapes),
+            repeat=args.repeat,
+            number=args.number,
+            verbose=True,
+        )
+        if args.imports:
+            current['results'].update(
+                run_import_benchmarks(import_statements, args.repeat, verbose=True)
+            )
+        if args.output:
+            save_results(current, args.output)
+        if not args.baseline:
+            return 0
+        baseline = load_results(args.baseline)
+    else:
+        baseline, current = load_results(args.baseline), load_results(args.current)
+    print(comparison_table(compare_results(baseline, current), args.threshold))
+    # a non-zero exit code if there are regressions (e.g. to fail a CI step)
+    return int(bool(regressions(baseline, current, args.threshold)))
@@ -0,0 +1,203 @@
+"""The benchmark scenarios: Dags of trivial functions of different shapes and sizes,
+and the operations (on them) that are timed.
+
+Each scenario is a ``Scenario(name, setup, run)`` where ``setup()`` makes (untimed)
+what ``run(prepared)`` needs, and only ``run`` is timed (and memory-profiled).
+Scenario names are ``operation/shape/size`` (e.g. ``'construct/chain/1000'``), and
+are what's compared between runs.
+
+The time of (some) imports of ``meshed`` is benchmarked too, under ``import/...``
+names (see ``import_statements``), each timing being made in a fresh interpreter.
+"""
+
+import random
+from typing import Callable, Iterable, Iterator, List, NamedTuple
+
+from meshed.base import FuncNode
+from meshed.dag import DAG
+from meshed.itools import random_graph
+from meshed.makers import code_to_dag
+
+DFLT_SIZES = (10, 100, 1000, 10000)
+DFLT_SEED = 42
+MAX_RANDOM_GRAPH_SIZE = 1000
+
+
+class Scenario(NamedTuple):
+    name: str
+    setup: Callable[[], object]
+    run: Callable[[object], object]
+    measure_memory: bool = False
+
+
+# --------------------------------------------------------------------------------------
+# Trivial functions
+
+
+def inc(x):
+    return x + 1
+
+
+def add2(x, y):
+    return x + y
+
+
+def add3(x, y, z):
+    return x + y + z
+
+
+def other_inc(x):
+    return x + 2
+
+
+_adders = {1: inc, 2: add2, 3: add3}
+
+
+def _node(i: int, srcs: List[str]) -> FuncNode:
+    func = _adders[len(srcs)]
+    bind = dict(zip(['x', 'y', 'z'], srcs))
+    return FuncNode(func, name=f'f{i}', bind=bind, out=f'v{i}')
+
+
+# --------------------------------------------------------------------------------------
+# Dag shapes
+
+
+def chain_func_nodes(n: int) -> List[FuncNode]:
+    """``a -> f0 -> v0 -> f1 -> v1 -> ...``
+
+    >>> DAG(chain_func_nodes(3)).synopsis_string().splitlines()
+    ['a -> f0 -> v0', 'v0 -> f1 -> v1', 'v1 -> f2 -> v2']
+    """
+    return [_node(i, [f'v{i - 1}' if i else 'a']) for i in range(n)]
+
+
+def fan_out_func_nodes(n: int) -> List[FuncNode]:
+    """``n`` func nodes all reading the same root: ``a -> fi -> vi``"""
+    return [_node(i, ['a']) for i in range(n)]
+
+
+def random_func_nodes(n: int, seed: int = DFLT_SEED) -> List[FuncNode]:
+    """A random dag, where nodes have at most 3 inputs.
+
+    The edges are taken from ``itools.random_graph`` (only keeping those that go
+    from a node to a later one, so it's acyclic). Since ``random_graph`` makes dense
+    graphs, above ``MAX_RANDOM_GRAPH_SIZE`` nodes, the inputs of each node are
+    sampled directly (from the nodes before it).
+
+    >>> random_func_nodes(5) == random_func_nodes(5)  # reproducible
+    True
+    """
+    rng = random.Random(seed)
+    if n <= MAX_RANDOM_GRAPH_SIZE:
+        state = random.getstate()  # (random_graph uses the global random state)
+        random.seed(seed)
+        try:
+            graph = random_graph(n)
+        finally:
+            random.setstate(state)
+        parents = {i: [] for i in range(n)}
+        for src, dsts in graph.items():
+            for dst in dsts:
+                if src < dst:
+                    parents[dst].append(src)
+    else:
+        parents = {
+            i: rng.sample(range(i), rng.randint(0, min(3, i))) for i in range(n)
+        }
+    func_nodes = []
+    for i in range(n):
+        srcs = sorted(rng.sample(parents[i], min(3, len(parents[i]))))
+        func_nodes.append(_node(i, [f'v{j}' for j in srcs] or ['a']))
+    return func_nodes
+
+
+shapes = {
+    'chain': chain_func_nodes,
+    'fan_out': fan_out_func_nodes,
+    'random': random_func_nodes,
+}
+
+# The import statements that are timed (see ``runner.import_time``)
+import_statements = {
+    'import/meshed': 'import meshed',
+    'import/dag': 'from meshed import DAG, FuncNode',
+    'import/all': 'from meshed import *',
+}
+
+
+def chain_code(n: int) -> str:
+    """Python code whose ``code_to_dag`` is a chain of ``n`` func nodes"""
+    lines = [f"    v{i} = inc({f'v{i - 1}' if i else 'a'})" for i in range(n)]
+    return 'def main(a):\n' + '\n'.join(lines)
+
+
+# --------------------------------------------------------------------------------------
+# Scenarios
+
+
+def _call_dag(dag):
+    return dag(1)
+
+
+def _dag_of_shape(shape: str, n: int) -> Callable[[], DAG]:
+    def setup():
+        return DAG(shapes[shape](n))
+
+    return setup
+
+
+def _compiled_dag_of_shape(shape: str, n: int) -> Callable[[], Callable]:
+    def setup():
+        return DAG(shapes[shape](n)).compile()
+
+    return setup
+
+
+def _middle_slice(dag: DAG):
+    n = len(dag.func_nodes)
+    return dag[f'v{n // 4}':f'v{3 * n // 4}']
+
+
+def _ch_middle_func(dag: DAG):
+    return dag.ch_funcs(**{f'f{len(dag.func_nodes) // 2}': other_inc})
+
+
+def _partial(dag: DAG):
+    return dag.partial(a=1)
+
+
+def scenarios(
+    sizes: Iterable[int] = DFLT_SIZES, shapes_to_use: Iterable[str] = tuple(shapes)
+) -> Iterator[Scenario]:
+    """Yield the benchmark scenarios for the given sizes and shapes.
+
+    >>> [s.name for s in scenarios(sizes=[10], shapes_to_use=['chain'])]
+    ... # doctest: +NORMALIZE_WHITESPACE
+    ['construct/chain/10', 'call/chain/10', 'call_compiled/chain/10',
+     'getitem/chain/10', 'ch_funcs/chain/10', 'partial/chain/10',
+     'code_to_dag/chain/10']
+    """
+    sizes, shapes_to_use = list(sizes), list(shapes_to_use)
+    for n in sizes:
+        for shape in shapes_to_use:
+            mk_func_nodes = shapes[shape]
+            yield Scenario(
+                f'construct/{shape}/{n}',
+                setup=lambda mk=mk_func_nodes, n=n: mk(n),
+                run=DAG,
+                measure_memory=True,
+            )
+            yield Scenario(f'call/{shape}/{n}', _dag_of_shape(shape, n), _call_dag)
+            compiled_setup = _compiled_dag_of_shape(shape, n)
+            yield Scenario(f'call_compiled/{shape}/{n}', compiled_setup, _call_dag)
+        if 'chain' in shapes_to_use:
+            dag_setup = _dag_of_shape('chain', n)
+            yield Scenario(f'getitem/chain/{n}', dag_setup, _middle_slice)
+            yield Scenario(f'ch_funcs/chain/{n}', dag_setup, _ch_middle_func)
+            yield Scenario(f'partial/chain/{n}', dag_setup, _partial)
+            yield Scenario(
+                f'code_to_dag/chain/{n}',
+                setup=lambda n=n: chain_code(n),
+                run=code_to_dag,
+            )
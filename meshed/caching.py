@@ -1,7 +1,20 @@
 """Caching meshes"""
 
-from functools import cached_property
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from copy import copy
+from functools import cached_property, lru_cache, partial
+from importlib import import_module
 from inspect import signature
+from types import BuiltinMethodType, FunctionType, MethodType, ModuleType
+from typing import Callable, Hashable, Mapping, NamedTuple, Optional, Union
+from warnings import warn
 
 from meshed.util import func_name, LiteralVal
 
@@ -61,3 +74,626 @@ def with_cached_properties(funcs):
         return cls
 
     return add_cached_properties
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int  # entries removed because the cache was full
+    expirations: int  # entries removed because they were too old
+    size: int
+
+
+_kwargs_mark = object()  # separates args from kwargs items in keys
+_no_entry = object()
+
+
+def _default_key(*args, **kwargs) -> Hashable:
+    if kwargs:
+        return args + (_kwargs_mark,) + tuple(kwargs.items())
+    return args
+
+
+def content_key(*args, **kwargs) -> str:
+    """A key made from the (pickled) contents of the arguments.
+    Use it as a ``NodeCache`` ``key`` when arguments are not hashable (dicts,
+    numpy arrays, etc.).
+
+    >>> content_key([1, 2], b={'c': 3}) == content_key([1, 2], b={'c': 3})
+    True
+    >>> content_key([1, 2]) == content_key([1, 3])
+    False
+
+    The order in which a set is pickled depends on the hashes of its elements, which
+    (for strings) change from one process to another. So the sets and frozensets
+    that are in (possibly nested) tuples, lists and dicts are sorted before being
+    pickled. Those held by other objects aren't, so their keys may differ across
+    processes (and miss a ``DiskCache``).
+
+    >>> content_key({'b', 'a', 'c'}) == content_key({'c', 'a', 'b'})
+    True
+    >>> content_key({'a', 'b'}) == content_key(frozenset({'a', 'b'}))
+    False
+    """
+    pickled = pickle.dumps((args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+    if _set_opcodes.search(pickled):  # there might be sets: sort them, and re-pickle
+        normalized = _with_sorted_sets((args, kwargs))
+        pickled = pickle.dumps(normalized, protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.blake2b(pickled, digest_size=16).hexdigest()
+
+
+# The opcodes of (protocol 4+) pickles of sets and frozensets. Found in the bytes of
+# a pickle, they might be something else (data), but if they're not found, there's
+# no set to sort.
+_set_opcodes = re.compile(b'[%b%b]' % (pickle.EMPTY_SET, pickle.FROZENSET))
+
+
+class _SortedSet(tuple):
+    """What a set (or frozenset) is replaced by before being pickled in a key"""
+
+
+def _with_sorted_sets(obj):
+    """``obj``, where sets and frozensets (found in tuples, lists and dicts) are
+    replaced by ``_SortedSet`` tuples of their (pickled-bytes-sorted) elements"""
+    if isinstance(obj, (set, frozenset)):
+        items = sorted(
+            map(_with_sorted_sets, obj),
+            key=partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        return _SortedSet((type(obj).__name__, *items))
+    elif type(obj) in (tuple, list):
+        return type(obj)(map(_with_sorted_sets, obj))
+    elif type(obj) is dict:
+        return {_with_sorted_sets(k): _with_sorted_sets(v) for k, v in obj.items()}
+    return obj
+
+
+class NodeCache:
+    """Remembers the outputs of the function of a func node, keyed by its inputs.
+
+    :param maxsize: The maximum number of outputs to remember. When full, the least
+        recently used output is forgotten. ``None`` means no limit.
+    :param ttl: The number of seconds an output is remembered for (no limit if None)
+    :param key: A function that makes a (hashable) key from the arguments of the
+        function (so with the same signature as it). By default, the arguments
+        themselves (so they need to be hashable). See ``content_key`` for arguments
+        that aren't.
+    :param timer: The function giving the current time (in seconds), for the ``ttl``
+
+    >>> def add(a, b):
+    ...     print(f'computing {a} + {b}')
+    ...     return a + b
+    >>> cache = NodeCache(maxsize=2)
+    >>> cache(add, (1, 2), {})
+    computing 1 + 2
+    3
+    >>> cache(add, (1, 2), {})
+    3
+    >>> cache(add, (), {'a': 3, 'b': 4})
+    computing 3 + 4
+    7
+    >>> cache(add, (5, 6), {})  # evicts (1, 2), the least recently used
+    computing 5 + 6
+    11
+    >>> cache.stats
+    CacheStats(hits=1, misses=3, evictions=1, expirations=0, size=2)
+
+    Calls whose arguments (or key) are not hashable are not cached (but are counted
+    as misses).
+
+    You'll usually not call a ``NodeCache`` directly, but give it to a ``FuncNode``
+    (or ``DAG``) as its ``cache`` argument.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 128,
+        ttl: Optional[float] = None,
+        key: Optional[Callable[..., Hashable]] = None,
+        *,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.key = key or _default_key
+        self.timer = timer
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __call__(self, func: Callable, args: tuple, kwargs: dict):
+        try:
+            # func is part of the key so that func nodes copied with another func
+            # don't share outputs
+            key = (func, self.key(*args, **kwargs))
+            hash(key)
+        except TypeError:  # not hashable: can't cache
+            with self._lock:
+                self.misses += 1
+            return func(*args, **kwargs)
+        with self._lock:
+            entry = self._entries.get(key, _no_entry)
+            if entry is not _no_entry:
+                output, expires_at = entry
+                if expires_at is None or self.timer() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return output
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        output = func(*args, **kwargs)
+        expires_at = None if self.ttl is None else self.timer() + self.ttl
+        with self._lock:
+            self._entries[key] = (output, expires_at)
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return output
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            self.hits, self.misses, self.evictions, self.expirations, len(self)
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        n_calls = self.hits + self.misses
+        return self.hits / n_calls if n_calls else 0.0
+
+    def clear(self):
+        """Forget all outputs, and reset the stats"""
+        with self._lock:
+            self._entries = OrderedDict()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def empty_copy(self) -> 'NodeCache':
+        """A cache with the same configuration, but no outputs (and fresh stats)
+
+        >>> cache = NodeCache(maxsize=2)
+        >>> _ = cache(max, (1, 2), {})
+        >>> cache.empty_copy().stats
+        CacheStats(hits=0, misses=0, evictions=0, expirations=0, size=0)
+        """
+        return copy(self)  # (__getstate__ leaves the outputs and stats out)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(maxsize={self.maxsize}, ttl={self.ttl})'
+
+    def __getstate__(self):
+        # Locks can't be pickled, and (when sent to another process) outputs and
+        # stats shouldn't be: only the configuration is.
+        state = dict(self.__dict__, _entries=OrderedDict())
+        state.update(hits=0, misses=0, evictions=0, expirations=0)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self.clear()
+
+
+NodeCacheSpec = Union[bool, Mapping, NodeCache, 'DiskCache', None]
+
+
+def mk_node_cache(cache: NodeCacheSpec, func_node=None) -> Optional[NodeCache]:
+    """Resolve a cache specification: ``None`` or ``False`` (no cache), ``True``
+    (a default ``NodeCache``), a mapping of ``NodeCache`` arguments, a
+    ``NodeCache`` instance, or a ``DiskCache`` (whose cache for ``func_node`` is
+    returned).
+
+    >>> mk_node_cache(True)
+    NodeCache(maxsize=128, ttl=None)
+    >>> mk_node_cache({'maxsize': 10, 'ttl': 60})
+    NodeCache(maxsize=10, ttl=60)
+    >>> mk_node_cache(False) is None
+    True
+    """
+    if cache is None or cache is False:
+        return None
+    elif cache is True:
+        return NodeCache()
+    elif isinstance(cache, NodeCache):
+        return cache
+    elif isinstance(cache, Mapping):
+        return NodeCache(**cache)
+    elif isinstance(cache, (DiskCache, DiskNodeCache)):
+        return cache.for_func_node(func_node)
+    raise ValueError(
+        f'Invalid cache: {cache!r}. Should be a bool, a NodeCache, a DiskCache, or a '
+        f'mapping of NodeCache arguments'
+    )
+
+
+# --------------------------------------------------------------------------------------
+# Persistent caching
+
+
+def _hash_bytes(*parts: bytes) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def _code_fingerprint(code) -> bytes:
+    """What identifies the behavior of a code object: Not where it is (file, line
+    numbers), but its bytecode, constants (including nested code) and names"""
+    consts = tuple(
+        _code_fingerprint(c) if hasattr(c, 'co_code') else repr(c).encode()
+        for c in code.co_consts
+    )
+    return b'|'.join((code.co_code, *consts, repr(code.co_names).encode()))
+
+
+def func_fingerprint(func: Callable) -> str:
+    """A hash of the identity of ``func``: Its qualified name and (when it's a python
+    function) its code, defaults, and the values its closure captured, so that the
+    hash changes when any of those do.
+
+    >>> def f(x):
+    ...     return x + 1
+    >>> fingerprint = func_fingerprint(f)
+    >>> def f(x):
+    ...     return x + 1
+    >>> func_fingerprint(f) == fingerprint
+    True
+    >>> def f(x):
+    ...     return x + 2
+    >>> func_fingerprint(f) == fingerprint
+    False
+
+    Functions made by a factory have the same code, but not the same closure:
+
+    >>> def mk_scale(factor):
+    ...     def scale(x):
+    ...         return x * factor
+    ...     return scale
+    >>> func_fingerprint(mk_scale(2)) == func_fingerprint(mk_scale(3))
+    False
+
+    Callable instances (and bound methods) are identified by the code of the
+    ``__call__`` of their class (the method), and the state of the instance:
+
+    >>> class Scale:
+    ...     def __init__(self, factor):
+    ...         self.factor = factor
+    ...     def __call__(self, x):
+    ...         return x * self.factor
+    >>> func_fingerprint(Scale(2)) == func_fingerprint(Scale(3))
+    False
+    >>> func_fingerprint(Scale(2).__call__) == func_fingerprint(Scale(3).__call__)
+    False
+
+    A ``TypeError`` is raised if a captured value (or a default, or the state of an
+    instance) can't be pickled, since the function can't be told apart from another
+    one then.
+    """
+    return _func_fingerprint(func, frozenset())
+
+
+def _func_fingerprint(func: Callable, seen: frozenset) -> str:
+    parts = [
+        f"{getattr(func, '__module__', '')}."
+        f"{getattr(func, '__qualname__', type(func).__qualname__)}".encode()
+    ]
+    seen = seen | {id(func)}  # (closures can refer to the function itself)
+    if isinstance(func, partial):
+        parts.append(_func_fingerprint(func.func, seen).encode())
+        values = (*func.args, *_items(func.keywords))
+        parts.append(_values_fingerprint(func, values, seen))
+    elif isinstance(func, MethodType):  # a bound method: its function, and its object
+        parts.append(_func_fingerprint(func.__func__, seen).encode())
+        parts.append(_values_fingerprint(func, _state_of(func.__self__), seen))
+    elif isinstance(func, BuiltinMethodType):  # (bound to a module, or an object)
+        if not isinstance(func.__self__, ModuleType):
+            parts.append(_values_fingerprint(func, (func.__self__,), seen))
+    elif not isinstance(func, (FunctionType, type)):  # a callable instance
+        call = getattr(type(func).__call__, '__code__', None)
+        if call is not None:
+            parts.append(_code_fingerprint(call))
+        parts.append(_values_fingerprint(func, _state_of(func), seen))
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        parts.append(_code_fingerprint(code))
+        values = (
+            *(cell.cell_contents for cell in func.__closure__ or ()),
+            *(func.__defaults__ or ()),
+            *_items(func.__kwdefaults__),
+        )
+        parts.append(_values_fingerprint(func, values, seen))
+    return _hash_bytes(*parts)
+
+
+def _items(d: Optional[dict]) -> tuple:
+    return tuple(d.items()) if d else ()
+
+
+def _state_of(obj) -> tuple:
+    """What ``obj`` holds: The (sorted) items of its ``__dict__`` and ``__slots__``, or
+    (for objects that have neither, like ``operator.itemgetter('a')``) the arguments
+    and state that it's pickled with."""
+    if isinstance(obj, type):
+        return (obj,)
+    state = dict(getattr(obj, '__dict__', {}))
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if name not in ('__dict__', '__weakref__') and hasattr(obj, name):
+                state[name] = getattr(obj, name)
+    if state:
+        return tuple(sorted(state.items()))
+    return obj.__reduce_ex__(pickle.HIGHEST_PROTOCOL)[1:3]
+
+
+def _values_fingerprint(func: Callable, values: tuple, seen: frozenset) -> bytes:
+    """The ``content_key`` of the ``values`` (captured, or given as defaults, or as
+    ``partial`` arguments, or the state of an instance) of ``func``. Python functions
+    are fingerprinted instead, since they're pickled by reference (if at all), and
+    modules are identified by their name."""
+
+    def fingerprinted(value):
+        if isinstance(value, tuple):  # (the (name, value) items of keyword values)
+            return tuple(map(fingerprinted, value))
+        elif isinstance(value, ModuleType):  # (captured by local imports)
+            return f'<module {value.__name__}>'
+        elif getattr(value, '__code__', None) is None:
+            return value
+        elif id(value) in seen:
+            return _recursive_mark
+        return _func_fingerprint(value, seen)
+
+    try:
+        return content_key(*map(fingerprinted, values)).encode()
+    except (pickle.PicklingError, TypeError, AttributeError) as error:
+        raise TypeError(
+            f"Can't fingerprint {func!r}: One of the values it captured (or one of "
+            f'its defaults, or its state) could not be pickled ({error})'
+        ) from error
+
+
+_recursive_mark = '<recursive>'
+
+
+def func_node_fingerprint(func_node, func: Optional[Callable] = None) -> str:
+    """A hash of the identity of a func node: Its function (see
+    ``func_fingerprint``), its ``bind`` and its ``out``."""
+    func = func if func is not None else func_node.func
+    return _hash_bytes(
+        func_fingerprint(func).encode(),
+        repr(sorted(func_node.bind.items())).encode(),
+        func_node.out.encode(),
+    )
+
+
+@lru_cache(maxsize=1)
+def _numpy():
+    """The numpy module, or None if it's not installed"""
+    try:
+        import numpy
+
+        return numpy
+    except ImportError:
+        return None
+
+
+def _is_ndarray(obj) -> bool:
+    # (checking without importing numpy)
+    cls = type(obj)
+    return cls.__name__ == 'ndarray' and cls.__module__ == 'numpy'
+
+
+_compressions = ('zlib', 'bz2', 'lzma')  # (names of stdlib modules)
+
+
+class DiskCache:
+    """A persistent, content-addressed, store of func node outputs.
+
+    Give it as the ``cache`` of a ``FuncNode`` or a ``DAG`` and the outputs of the
+    func nodes will be stored in files under ``rootdir``, keyed by a hash of the
+    func node (see ``func_node_fingerprint``) and a hash of its inputs (see
+    ``content_key``). Since the keys only depend on contents, a new process (say,
+    the rerun of a batch that crashed) will find, and not recompute, the outputs of
+    all the func nodes whose inputs didn't change.
+
+    :param rootdir: The directory the outputs are stored in
+    :param compress: Whether to compress the (pickled) outputs: ``False``, ``True``
+        (meaning ``'zlib'``), ``'zlib'``, ``'bz2'`` or ``'lzma'``.
+    :param mmap_arrays: Whether to store numpy arrays as ``.npy`` files, that are
+        loaded as (zero-copy, read-only) memory-maps. Only when not compressing.
+    :param key: The function making (a ``str``) key from the inputs of a function.
+
+    >>> import tempfile
+    >>> from meshed import DAG
+    >>> def f(a, b):
+    ...     print(f'computing f({a}, {b})')
+    ...     return a + b
+    >>> def g(f, c):
+    ...     print(f'computing g({f}, {c})')
+    ...     return f * c
+    >>> rootdir = tempfile.mkdtemp()
+    >>> dag = DAG([f, g], cache=DiskCache(rootdir))
+    >>> dag(1, 2, 3)
+    computing f(1, 2)
+    computing g(3, 3)
+    9
+
+    Another dag, with the same functions, using the same directory, doesn't
+    need to compute what was already computed:
+
+    >>> dag = DAG([f, g], cache=DiskCache(rootdir))
+    >>> dag(1, 2, 3)
+    9
+    >>> dag(1, 2, 4)
+    computing g(3, 4)
+    12
+
+    """
+
+    def __init__(
+        self,
+        rootdir: str,
+        *,
+        compress: Union[bool, str] = False,
+        mmap_arrays: bool = True,
+        key: Callable[..., str] = content_key,
+    ):
+        if compress is True:
+            compress = 'zlib'
+        if compress and compress not in _compressions:
+            raise ValueError(
+                f'Unknown compression: {compress!r}. Should be one of: '
+                f"{', '.join(_compressions)}"
+            )
+        self.rootdir = os.path.abspath(os.path.expanduser(rootdir))
+        self.compress = compress or None
+        self.mmap_arrays = mmap_arrays
+        self.key = key
+        os.makedirs(self.rootdir, exist_ok=True)
+
+    def for_func_node(self, func_node) -> 'DiskNodeCache':
+        return DiskNodeCache(self, func_node)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.rootdir!r}, compress={self.compress!r})'
+
+    # Reading and writing ------------------------------------------------------------
+
+    @property
+    def _pickle_ext(self):
+        return '.pkl' + (f'.{self.compress}' if self.compress else '')
+
+    def load(self, path_without_ext: str, default=None):
+        """The value stored under the given path (without extension), or ``default``
+        if there's none."""
+        if self.mmap_arrays and not self.compress and (numpy := _numpy()):
+            try:
+                return numpy.load(path_without_ext + '.npy', mmap_mode='r')
+            except FileNotFoundError:
+                pass
+        try:
+            with open(path_without_ext + self._pickle_ext, 'rb') as fp:
+                data = fp.read()
+        except FileNotFoundError:
+            return default
+        if self.compress:
+            data = import_module(self.compress).decompress(data)
+        return pickle.loads(data)
+
+    def dump(self, path_without_ext: str, value):
+        """Store ``value`` (atomically) under the given path (without extension)"""
+        os.makedirs(os.path.dirname(path_without_ext), exist_ok=True)
+        if (
+            self.mmap_arrays
+            and not self.compress
+            and _is_ndarray(value)
+            and not value.dtype.hasobject  # (those can't be memory-mapped)
+        ):
+            _atomic_write(path_without_ext + '.npy', partial(_numpy().save, arr=value))
+        else:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.compress:
+                data = import_module(self.compress).compress(data)
+            _atomic_write(path_without_ext + self._pickle_ext, _writer_of(data))
+
+
+def _writer_of(data: bytes):
+    def write(fp):
+        fp.write(data)
+
+    return write
+
+
+def _atomic_write(path: str, write: Callable):
+    """Write to ``path`` through ``write(fp)``, atomically: Readers never see a partial
+    file (it's written to a temporary file, then moved to ``path``)"""
+    dirname, basename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=f'.{basename}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            write(fp)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class DiskNodeCache:
+    """The cache of a ``DiskCache`` for a given func node.
+    (Called like a ``NodeCache``: ``cache(func, args, kwargs)``.)"""
+
+    def __init__(self, disk_cache: DiskCache, func_node):
+        self.disk_cache = disk_cache
+        self.func_node = func_node
+        self._lock = threading.Lock()
+        self._node_dirs = {}  # fingerprinting code is costly, so we remember them
+        self._dump_failed = False
+        self.hits = self.misses = 0
+
+    def for_func_node(self, func_node) -> 'DiskNodeCache':
+        return DiskNodeCache(self.disk_cache, func_node)
+
+    def node_dir(self, func: Optional[Callable] = None) -> Optional[str]:
+        """The directory where the outputs of the func node (with ``func``) are, or
+        ``None`` if the func node can't be fingerprinted (so can't be disk-cached)"""
+        func = func if func is not None else self.func_node.func
+        func_node = self.func_node
+        identity = (func, tuple(func_node.bind.items()), func_node.out)
+        node_dir = self._node_dirs.get(identity, _no_entry)
+        if node_dir is _no_entry:
+            try:
+                fingerprint = func_node_fingerprint(func_node, func)
+                node_dir = os.path.join(self.disk_cache.rootdir, fingerprint)
+            except TypeError as error:
+                warn(f'{error}\nThe outputs of {func_node} will not be disk-cached.')
+                node_dir = None
+            self._node_dirs[identity] = node_dir
+        return node_dir
+
+    def __call__(self, func: Callable, args: tuple, kwargs: dict):
+        node_dir = self.node_dir(func)
+        if node_dir is None:
+            return func(*args, **kwargs)
+        path = os.path.join(node_dir, self.disk_cache.key(*args, **kwargs))
+        output = self.disk_cache.load(path, _no_entry)
+        if output is not _no_entry:
+            with self._lock:
+                self.hits += 1
+            return output
+        with self._lock:
+            self.misses += 1
+        output = func(*args, **kwargs)
+        try:
+            self.disk_cache.dump(path, output)
+        except (pickle.PicklingError, TypeError, AttributeError, OSError) as error:
+            if not self._dump_failed:  # (warn once per func node)
+                self._dump_failed = True
+                warn(f'An output of {self.func_node} could not be disk-cached: {error}')
+        return output
+
+    @property
+    def stats(self) -> CacheStats:
+        node_dir = self.node_dir()
+        size = len(os.listdir(node_dir)) if node_dir and os.path.isdir(node_dir) else 0
+        return CacheStats(self.hits, self.misses, 0, 0, size)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.disk_cache!r}, {self.func_node!r})'
+
+    def __getstate__(self):
+        state = dict(self.__dict__, _node_dirs={})
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,190 @@
+"""Compiling a DAG into a plain python function (the reverse of ``code_to_dag``).
+
+A ``DAG`` call binds its arguments to a scope (a dict), then has each func node read
+its inputs from, and write its output to, that scope. ``dag_to_function`` instead
+generates (and ``exec``s, once) the source of a function with one assignment per
+func node, in topological order, whose var nodes are local variables: Calling it
+costs what calling the equivalent hand-written function would.
+
+>>> from meshed.dag import DAG
+>>> def f(a, b=2):
+...     return a + b
+>>> def g(f, c=3):
+...     return f * c
+>>> dag = DAG([f, g])
+>>> print(dag_to_source(dag))
+def DAG(a, b=_default0, c=_default1):
+    f = _func0(a=a, b=b)
+    g = _func1(f=f, c=c)
+    return g
+<BLANKLINE>
+>>> func = dag_to_function(dag)
+>>> func(1), func(1, c=10)
+(9, 30)
+>>> from inspect import signature
+>>> signature(func) == signature(dag)
+True
+
+The source of the function can be seen with ``inspect.getsource(func)``.
+
+Note that the function doesn't do what's specific to DAG calls: It calls all func
+nodes inline, in the calling thread (ignoring executors), it doesn't record the
+last scope, nor calls made while profiling, and it can't be given the values of
+intermediate var nodes (see ``DAG.plan`` for that).
+"""
+
+import linecache
+from inspect import Parameter
+from itertools import count
+from keyword import iskeyword
+from typing import Callable, Tuple
+
+from meshed.util import extract_values
+
+_counter = count()
+
+
+def _is_valid_name(name) -> bool:
+    return isinstance(name, str) and name.isidentifier() and not iskeyword(name)
+
+
+def _prefix_not_used_by(names, prefix: str = '_') -> str:
+    """A prefix for the (global) names of the generated code, such that they can't
+    collide with the names of var nodes (which are local variables)"""
+    while any(name.startswith(prefix) for name in names):
+        prefix += '_'
+    return prefix
+
+
+def _params_source(params, default_name: Callable[[Parameter], str]) -> str:
+    """The source of the parameters of a function definition (``'a, b=x, *, c'``)"""
+    sources = []
+    for i, param in enumerate(params):
+        if param.kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
+            raise ValueError(f"Can't compile a dag with a variadic param: {param}")
+        if param.kind == Parameter.KEYWORD_ONLY and (
+            i == 0 or params[i - 1].kind != Parameter.KEYWORD_ONLY
+        ):
+            sources.append('*')
+        source = param.name
+        if param.default is not Parameter.empty:
+            source += f'={default_name(param)}'
+        sources.append(source)
+        if param.kind == Parameter.POSITIONAL_ONLY and (
+            i == len(params) - 1 or params[i + 1].kind != Parameter.POSITIONAL_ONLY
+        ):
+            sources.append('/')
+    return ', '.join(sources)
+
+
+def _call_source(
+    func_node,
+    func_name: str,
+    cache_name: str,
+    defined=None,
+    default_name: Callable[[Parameter], str] = None,
+) -> str:
+    """The source of the call of the function of ``func_node`` (sourcing its
+    arguments as its ``CallPlan`` does: An argument whose source is not ``defined``
+    takes its default)"""
+    positional, keyword = [], []
+    for param in func_node.sig.params:
+        src = func_node.bind.get(param.name, param.name)
+        if param.kind == Parameter.POSITIONAL_ONLY:
+            if defined is not None and src not in defined:
+                src = default_name(param)  # (a positional-only can't be skipped)
+            positional.append(src)
+        elif defined is None or src in defined:
+            keyword.append((param.name, src))
+    if func_node.cache is None:
+        args = positional + [f'{name}={src}' for name, src in keyword]
+        return f"{func_name}({', '.join(args)})"
+    # (the cache is called as a CachingCallPlan calls it)
+    args = ''.join(f'{src}, ' for src in positional)
+    kwargs = ', '.join(f"'{name}': {src}" for name, src in keyword)
+    return f'{cache_name}({func_name}, ({args}), {{{kwargs}}})'
+
+
+def _function_name(dag, func_name: str = None) -> str:
+    func_name = func_name or dag.__name__
+    return func_name if _is_valid_name(func_name) else 'dag'
+
+
+def dag_to_source_and_namespace(dag, func_name: str = None) -> Tuple[str, dict]:
+    """The source of the function computing ``dag``, and the namespace (the globals)
+    it should be executed in (holding the functions, defaults, etc. it refers to).
+    """
+    func_name = _function_name(dag, func_name)
+    params = dag.__signature__.params
+    names = set(dag.var_nodes) | {p.name for p in params} | {func_name}
+    invalid_names = sorted(name for name in names if not _is_valid_name(name))
+    if invalid_names:
+        raise ValueError(f"Can't compile a dag with var nodes named {invalid_names}")
+    prefix = _prefix_not_used_by(names)
+    namespace = {}
+    default_index = count()
+
+    def default_name(param):
+        name = f'{prefix}default{next(default_index)}'
+        namespace[name] = param.default
+        return name
+
+    lines = [f'def {func_name}({_params_source(params, default_name)}):']
+    defined = {p.name for p in params}
+    releases = dag._releases or ((),) * len(dag.func_nodes)
+    for i, (func_node, released) in enumerate(zip(dag.func_nodes, releases)):
+        missing = {
+            src
+            for param, src in func_node.bind.items()
+            if src not in defined and param not in func_node.sig.defaults
+        }
+        if missing:
+            raise ValueError(
+                f"Can't compile the dag: {func_node} needs {sorted(missing)}, which "
+                f'are neither arguments of the dag, nor computed before it, and have '
+                f'no defaults'
+            )
+        func_name_i, cache_name_i = f'{prefix}func{i}', f'{prefix}cache{i}'
+        namespace[func_name_i] = func_node.func
+        if func_node.cache is not None:
+            namespace[cache_name_i] = func_node.cache
+        call = _call_source(
+            func_node, func_name_i, cache_name_i, defined, default_name
+        )
+        lines.append(f'    {func_node.out} = {call}')
+        defined.add(func_node.out)
+        if released:
+            lines.append(f"    del {', '.join(released)}")
+            defined.difference_update(released)
+    if dag.extract_output_from_scope is extract_values:
+        lines.append(f"    return {', '.join(dag.leafs) or None}")
+    else:  # (a custom extraction needs a scope)
+        namespace[f'{prefix}extract'] = dag.extract_output_from_scope
+        namespace[f'{prefix}leafs'] = dag.leafs
+        scope = ', '.join(f"'{name}': {name}" for name in sorted(defined))
+        lines.append(f'    return {prefix}extract({{{scope}}}, {prefix}leafs)')
+    return '\n'.join(lines) + '\n', namespace
+
+
+def dag_to_source(dag, func_name: str = None) -> str:
+    """The source of the function computing ``dag`` (see ``dag_to_function``)"""
+    source, _ = dag_to_source_and_namespace(dag, func_name)
+    return source
+
+
+def dag_to_function(dag, func_name: str = None) -> Callable:
+    """A plain python function computing ``dag``, generated (see the module's docs).
+    It has the signature of ``dag``, and its source can be seen with
+    ``inspect.getsource``."""
+    source, namespace = dag_to_source_and_namespace(dag, func_name)
+    filename = f'<meshed.codegen {dag.__name__} {next(_counter)}>'
+    # (so that inspect.getsource, and tracebacks, can show the source)
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(compile(source, filename, 'exec'), namespace)
+    func = namespace[_function_name(dag, func_name)]
+    func.__annotations__ = {
+        p.name: p.annotation
+        for p in dag.__signature__.params
+        if p.annotation is not Parameter.empty
+    }
+    return func
@@ -0,0 +1,493 @@
+"""Compiled DAGs: A serializable form of a ``DAG`` that loads without redoing its
+analysis.
+
+Making a ``DAG`` validates its func nodes, sorts them topologically, merges the
+signatures of their functions, and cleans their bindings. ``compile_dag`` captures
+the result of all that (the validated func nodes, with their functions referenced
+by import path, the topological order, and the signature) in a json-serializable
+dict, and ``dag_from_compiled`` makes a ready-to-call ``DAG`` from it, without
+analyzing anything again. This is useful, for instance, for worker processes that
+would otherwise rebuild the same large DAG every time they're spawned.
+
+>>> from operator import add, mul
+>>> from meshed.dag import DAG
+>>> dag = DAG([
+...     FuncNode(add, bind={'a': 'x', 'b': 'y'}, out='x_plus_y'),
+...     FuncNode(mul, bind={'a': 'x_plus_y', 'b': 'z'}, out='result'),
+... ])
+>>> compiled = compile_dag(dag)
+>>> compiled['format'], compiled['version']
+('meshed.compiled_dag', 2)
+>>> compiled['func_nodes'][0]['func']
+{'import': '_operator:add'}
+>>> loaded = dag_from_compiled(compiled)
+>>> loaded(1, 2, 3)
+9
+>>> print(loaded.synopsis_string())
+x,y -> add -> x_plus_y
+x_plus_y,z -> mul -> result
+
+The compiled dag includes a ``hash`` of its structure (see ``structural_hash``),
+which can be used to key compiled dags on disk (see ``save_compiled_dag`` and
+``load_compiled_dag``), and which ``dag_from_compiled`` checks, to catch compiled
+dags that were modified.
+
+>>> compiled['hash'] == compile_dag(DAG(dag.func_nodes[::-1]))['hash']
+True
+>>> compiled['hash'] == compile_dag(dag.ch_funcs(mul=add))['hash']
+False
+
+Functions (and other objects, like defaults) that can't be referenced by import
+path (lambdas, local functions...), nor encoded as json, can only be compiled if
+pickling them is explicitly allowed (see ``meshed.executors.dumps_callable``):
+
+>>> compile_dag(DAG([FuncNode(lambda x: x + 1, name='inc', out='y')]))
+Traceback (most recent call last):
+  ...
+ValueError: Can't compile <function <lambda> at ...> without pickling it...
+
+**Warning**: Unpickling can run arbitrary code, so loading a compiled dag that
+contains pickled objects is also only done if explicitly allowed
+(``allow_pickle=True``): Only allow it for compiled dags you trust, as you would
+for any pickle file. Pickled objects are hashed (see ``structural_hash``) by their
+fingerprint (their qualified name and code, see ``meshed.caching.func_fingerprint``),
+not by their pickle bytes, which can differ from one process (or version) to
+another.
+
+Note that caches of func nodes are compiled as their configuration: A cache shared
+by several func nodes won't be shared by their loaded copies.
+"""
+
+import base64
+import hashlib
+import json
+import pickle
+from functools import partial
+from importlib import import_module
+from inspect import Parameter
+from typing import Any, Optional
+
+from i2 import Sig
+
+from meshed.base import (
+    FuncNode,
+    basic_node_validator,
+    mk_call_plan,
+    underscore_func_node_names_maker,
+    _interned,
+)
+from meshed.caching import NodeCache, content_key, func_fingerprint
+from meshed.dag import DAG
+from meshed.executors import dumps_callable
+from meshed.util import signature_of
+
+COMPILED_DAG_FORMAT = 'meshed.compiled_dag'
+COMPILED_DAG_VERSION = 2  # increment when the format changes
+
+_json_natives = (str, int, float, bool, type(None))
+# The DAG fields that are compiled (as "options"). The func nodes and name are
+# compiled separately, and cache is already compiled in the func nodes.
+_dag_option_fields = (
+    'cache_last_scope',
+    'parameter_merge',
+    'new_scope',
+    'extract_output_from_scope',
+    'executor',
+    'max_workers',
+    'free_intermediates',
+    'cse',
+)
+
+
+# --------------------------------------------------------------------------------------
+# Objects
+
+
+def import_path(obj) -> Optional[str]:
+    """The ``'module:qualname'`` path ``obj`` can be imported from, or ``None`` if
+    it can't be (e.g. it's a lambda, or a local function).
+
+    >>> import_path(json.dumps)
+    'json:dumps'
+    >>> import_path(FuncNode.ch_attrs)
+    'meshed.base:FuncNode.ch_attrs'
+    >>> import_path(lambda x: x) is None
+    True
+    """
+    module_name = getattr(obj, '__module__', None)
+    qualname = getattr(obj, '__qualname__', None)
+    if not isinstance(module_name, str) or not isinstance(qualname, str):
+        return None
+    path = f'{module_name}:{qualname}'
+    try:
+        if import_object(path) is obj:
+            return path
+    except (ImportError, AttributeError):
+        pass
+    return None
+
+
+def import_object(path: str):
+    """The object referenced by the ``'module:qualname'`` ``path``
+
+    >>> import_object('json:dumps') is json.dumps
+    True
+    """
+    module_name, qualname = path.split(':')
+    obj = import_module(module_name)
+    for attr in qualname.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def encode_object(obj, allow_pickle: bool = False) -> Any:
+    """Encode ``obj`` as a json-serializable value: As is if it's a json-native
+    scalar, as ``{'import': path}`` if it can be imported, as ``{'tuple': [...]}``
+    (or ``'list'``) of encoded items if it's a tuple (or list), as
+    ``{'partial': {...}}`` of its encoded func and arguments if it's a
+    ``functools.partial``, else, only if ``allow_pickle``, as
+    ``{'pickle': base64_of_pickle, 'fingerprint': ...}``. (The inverse of
+    ``decode_object``.)
+
+    >>> encode_object(3)
+    3
+    >>> encode_object(json.dumps)
+    {'import': 'json:dumps'}
+    >>> encode_object((1, [2, None]))
+    {'tuple': [1, {'list': [2, None]}]}
+    >>> encode_object(partial(int, base=2))['partial']
+    {'func': {'import': 'builtins:int'}, 'args': [], 'keywords': {'base': 2}}
+    >>> encode_object({1, 2})
+    Traceback (most recent call last):
+      ...
+    ValueError: Can't compile {1, 2} without pickling it...
+    >>> sorted(encode_object({1, 2}, allow_pickle=True))
+    ['fingerprint', 'pickle']
+    """
+    if isinstance(obj, _json_natives):
+        return obj
+    elif type(obj) in (tuple, list):
+        items = [encode_object(item, allow_pickle) for item in obj]
+        return {type(obj).__name__: items}
+    elif type(obj) is partial:
+        encode = partial(encode_object, allow_pickle=allow_pickle)
+        return {
+            'partial': {
+                'func': encode(obj.func),
+                'args': list(map(encode, obj.args)),
+                'keywords': {k: encode(v) for k, v in obj.keywords.items()},
+            }
+        }
+    path = import_path(obj)
+    if path is not None:
+        return {'import': path}
+    if not allow_pickle:
+        raise ValueError(
+            f"Can't compile {obj!r} without pickling it (it can't be imported): "
+            f'Define it at the top level of a module, or use allow_pickle=True'
+        )
+    try:
+        pickled = dumps_callable(obj)
+    except Exception as error:
+        raise ValueError(
+            f"Can't compile {obj!r}: It can't be imported, nor pickled ({error})"
+        ) from error
+    return {
+        'pickle': base64.b64encode(pickled).decode('ascii'),
+        'fingerprint': _fingerprint(obj, pickled),
+    }
+
+
+def _fingerprint(obj, pickled: bytes) -> str:
+    """What identifies ``obj`` in ``structural_hash``: The ``func_fingerprint`` of
+    callables, the ``content_key`` of other objects, and (only if those fail) a hash
+    of the pickled bytes."""
+    try:
+        return func_fingerprint(obj) if callable(obj) else content_key(obj)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return hashlib.blake2b(pickled, digest_size=16).hexdigest()
+
+
+def decode_object(encoded, allow_pickle: bool = False):
+    """The inverse of ``encode_object``
+
+    >>> decode_object({'import': 'json:dumps'}) is json.dumps
+    True
+    >>> decode_object(encode_object((1, [2, None])))
+    (1, [2, None])
+    >>> decode_object(encode_object({1, 2}, allow_pickle=True), allow_pickle=True)
+    {1, 2}
+    """
+    if not isinstance(encoded, dict):
+        return encoded
+    elif 'import' in encoded:
+        return import_object(encoded['import'])
+    elif 'tuple' in encoded or 'list' in encoded:
+        [(kind, items)] = encoded.items()
+        container = tuple if kind == 'tuple' else list
+        return container(decode_object(item, allow_pickle) for item in items)
+    elif 'partial' in encoded:
+        decode = partial(decode_object, allow_pickle=allow_pickle)
+        func, args, keywords = (
+            encoded['partial'][k] for k in ('func', 'args', 'keywords')
+        )
+        keywords = {k: decode(v) for k, v in keywords.items()}
+        return partial(decode(func), *map(decode, args), **keywords)
+    elif 'pickle' in encoded:
+        if not allow_pickle:
+            raise ValueError(
+                'The compiled dag contains pickled objects, and unpickling can run '
+                'arbitrary code: Use allow_pickle=True (only) if you trust it'
+            )
+        return pickle.loads(base64.b64decode(encoded['pickle']))
+    raise ValueError(f'Unknown encoding of an object: {encoded!r}')
+
+
+def _encode_cache(cache, allow_pickle: bool = False):
+    """Encode a ``NodeCache`` as its configuration (other caches as objects)"""
+    if type(cache) is not NodeCache:
+        return encode_object(cache, allow_pickle)
+    config = {'maxsize': cache.maxsize, 'ttl': cache.ttl}
+    config['key'] = encode_object(cache.key, allow_pickle)
+    config['timer'] = encode_object(cache.timer, allow_pickle)
+    return {'node_cache': config}
+
+
+def _decode_cache(encoded, allow_pickle: bool = False):
+    if isinstance(encoded, dict) and 'node_cache' in encoded:
+        config = encoded['node_cache']
+        return NodeCache(
+            config['maxsize'],
+            config['ttl'],
+            decode_object(config['key'], allow_pickle),
+            timer=decode_object(config['timer'], allow_pickle),
+        )
+    return decode_object(encoded, allow_pickle)
+
+
+# --------------------------------------------------------------------------------------
+# Compiling
+
+
+def _compile_func_node(func_node: FuncNode, allow_pickle: bool = False) -> dict:
+    encode = partial(encode_object, allow_pickle=allow_pickle)
+    compiled = {
+        'name': func_node.name,
+        'func': encode(func_node.func),
+        'bind': dict(func_node.bind),
+        'out': func_node.out,
+    }
+    # (the optional attributes are only included if they're not the default)
+    if func_node.func_label != func_node.name:
+        compiled['func_label'] = func_node.func_label
+    if func_node.names_maker is not underscore_func_node_names_maker:
+        compiled['names_maker'] = encode(func_node.names_maker)
+    if func_node.node_validator is not basic_node_validator:
+        compiled['node_validator'] = encode(func_node.node_validator)
+    if func_node.executor is not None:
+        compiled['executor'] = func_node.executor
+    if func_node.cache is not None:
+        compiled['cache'] = _encode_cache(func_node.cache, allow_pickle)
+    return compiled
+
+
+def _same_param(p: Parameter, q: Parameter) -> bool:
+    # (defaults are compared by identity, since == could fail, e.g. on arrays)
+    return (
+        p.kind == q.kind and p.default is q.default and p.annotation == q.annotation
+    )
+
+
+def _compile_signature(
+    dag: DAG, func_node_index: dict, allow_pickle: bool = False
+) -> list:
+    """The params of the signature of the dag, referenced, when possible, by the
+    param of a func node they come from (so that defaults and annotations don't need
+    to be encoded)"""
+    compiled = []
+    for param in dag.__signature__.params:
+        compiled_param = {'name': param.name}
+        for func_node in dag.func_nodes:
+            for arg_name, src_name in func_node.bind.items():
+                if src_name == param.name and _same_param(
+                    func_node.sig.parameters[arg_name], param
+                ):
+                    compiled_param['source'] = [func_node_index[func_node], arg_name]
+                    break
+            if 'source' in compiled_param:
+                break
+        else:  # (e.g. the signature was changed): encode the param itself
+            compiled_param['kind'] = param.kind.name
+            if param.default is not Parameter.empty:
+                compiled_param['default'] = encode_object(param.default, allow_pickle)
+        compiled.append(compiled_param)
+    return compiled
+
+
+def structural_hash(compiled: dict) -> str:
+    """A hash of the structure of a compiled dag: Its func nodes (keyed by name),
+    signature, leafs, and options, but not the (incidental) order of its nodes.
+    Pickled objects are hashed by their fingerprint, not their pickle bytes."""
+    func_nodes = compiled['func_nodes']
+    signature = [
+        dict(p, source=[func_nodes[p['source'][0]]['name'], p['source'][1]])
+        if 'source' in p
+        else p
+        for p in compiled['signature']
+    ]
+    structure = {
+        'format': compiled['format'],
+        'version': compiled['version'],
+        'name': compiled['name'],
+        'func_nodes': {fn['name']: fn for fn in func_nodes},
+        'signature': signature,
+        'leafs': sorted(compiled['leafs']),
+        'options': compiled['options'],
+    }
+    canonical = json.dumps(
+        _without_pickles(structure), sort_keys=True, separators=(',', ':')
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _without_pickles(obj):
+    """``obj`` where the encodings of pickled objects are replaced by their
+    fingerprint"""
+    if isinstance(obj, dict):
+        if 'pickle' in obj:
+            return {'fingerprint': obj['fingerprint']}
+        return {k: _without_pickles(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return list(map(_without_pickles, obj))
+    return obj
+
+
+def compile_dag(dag: DAG, *, allow_pickle: bool = False) -> dict:
+    """The (json-serializable) compiled form of ``dag`` (see the module's docs).
+    Objects that can't be imported, nor encoded as json, are pickled only if
+    ``allow_pickle`` (else a ``ValueError`` is raised)."""
+    encode = partial(encode_object, allow_pickle=allow_pickle)
+    func_node_index = {fn: i for i, fn in enumerate(dag.func_nodes)}
+    compiled = {
+        'format': COMPILED_DAG_FORMAT,
+        'version': COMPILED_DAG_VERSION,
+        'name': dag.name,
+        'func_nodes': [_compile_func_node(fn, allow_pickle) for fn in dag.func_nodes],
+        # the topological order: var nodes by name, and func nodes by index
+        'nodes': [func_node_index.get(node, node) for node in dag.nodes],
+        'signature': _compile_signature(dag, func_node_index, allow_pickle),
+        'leafs': list(dag.leafs),
+        'options': {name: encode(getattr(dag, name)) for name in _dag_option_fields},
+    }
+    compiled['hash'] = structural_hash(compiled)
+    return compiled
+
+
+# --------------------------------------------------------------------------------------
+# Loading
+
+
+def _load_func_node(compiled: dict, allow_pickle: bool = False) -> FuncNode:
+    """Make a func node from its compiled form, without validating it again"""
+    decode = partial(decode_object, allow_pickle=allow_pickle)
+    func = decode(compiled['func'])
+    name = _interned(compiled['name'])
+    bind = {_interned(k): _interned(v) for k, v in compiled['bind'].items()}
+    cache = _decode_cache(compiled.get('cache', None), allow_pickle)
+    sig = signature_of(func)
+    func_node = FuncNode.__new__(FuncNode)
+    func_node.__setstate__(
+        {
+            'func': func,
+            'name': name,
+            '__name__': name,
+            'bind': bind,
+            'out': _interned(compiled['out']),
+            'func_label': compiled.get('func_label', name),
+            'names_maker': decode(
+                compiled.get('names_maker', underscore_func_node_names_maker)
+            ),
+            'node_validator': decode(
+                compiled.get('node_validator', basic_node_validator)
+            ),
+            'executor': compiled.get('executor', None),
+            'cache': cache,
+            'sig': sig,
+            'call_plan': mk_call_plan(func, sig, bind, cache),
+        }
+    )
+    return func_node
+
+
+def _load_param(compiled: dict, func_nodes, allow_pickle: bool = False) -> Parameter:
+    if 'source' in compiled:
+        i, arg_name = compiled['source']
+        param = func_nodes[i].sig.parameters[arg_name]
+        return param.replace(name=compiled['name'])
+    default = Parameter.empty
+    if 'default' in compiled:
+        default = decode_object(compiled['default'], allow_pickle)
+    kind = getattr(Parameter, compiled['kind'])
+    return Parameter(compiled['name'], kind, default=default)
+
+
+def validate_compiled(compiled: dict, verify_hash: bool = True):
+    """Raise a ``ValueError`` if ``compiled`` isn't a compiled dag of the current
+    format and version, or (if ``verify_hash``) if its hash doesn't match its
+    contents."""
+    if compiled.get('format', None) != COMPILED_DAG_FORMAT:
+        raise ValueError(f'Not a compiled dag (no {COMPILED_DAG_FORMAT!r} format)')
+    if compiled.get('version', None) != COMPILED_DAG_VERSION:
+        raise ValueError(
+            f"Unsupported compiled dag version: {compiled.get('version', None)!r} "
+            f'(the current version is {COMPILED_DAG_VERSION}). Compile the dag again.'
+        )
+    if verify_hash and compiled.get('hash', None) != structural_hash(compiled):
+        raise ValueError("The hash of the compiled dag doesn't match its contents")
+
+
+def dag_from_compiled(
+    compiled: dict, verify_hash: bool = True, *, allow_pickle: bool = False
+) -> DAG:
+    """Make a ready-to-call ``DAG`` from its compiled form (see ``compile_dag``),
+    without redoing the analysis made when the dag was first made.
+
+    Since unpickling can run arbitrary code, a compiled dag containing pickled
+    objects is only loaded if ``allow_pickle`` (else a ``ValueError`` is raised):
+    Only allow it for compiled dags you trust."""
+    validate_compiled(compiled, verify_hash)
+    func_nodes = [
+        _load_func_node(fn, allow_pickle) for fn in compiled['func_nodes']
+    ]
+    nodes = [
+        func_nodes[node] if isinstance(node, int) else node
+        for node in compiled['nodes']
+    ]
+    signature = Sig(
+        [_load_param(p, func_nodes, allow_pickle) for p in compiled['signature']]
+    )
+    options = {
+        k: decode_object(v, allow_pickle) for k, v in compiled['options'].items()
+    }
+    leafs, name = compiled['leafs'], compiled['name']
+    return DAG._from_analysis(func_nodes, nodes, signature, leafs, name=name, **options)
+
+
+def save_compiled_dag(
+    dag: DAG, filepath: str, *, allow_pickle: bool = False
+) -> dict:
+    """Compile ``dag`` and save it (as json) in ``filepath``. Returns the compiled
+    dag (whose ``hash`` can be used to name files, for instance)."""
+    compiled = compile_dag(dag, allow_pickle=allow_pickle)
+    with open(filepath, 'w') as fp:
+        json.dump(compiled, fp)
+    return compiled
+
+
+def load_compiled_dag(
+    filepath: str, verify_hash: bool = True, *, allow_pickle: bool = False
+) -> DAG:
+    """Load the dag that was compiled and saved in ``filepath`` (see
+    ``save_compiled_dag``, and ``dag_from_compiled`` about ``allow_pickle``)"""
+    with open(filepath) as fp:
+        return dag_from_compiled(json.load(fp), verify_hash, allow_pickle=allow_pickle)
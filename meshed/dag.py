@@ -131,11 +131,13 @@ That said it is your responsiblity to use the right policy for your particular c
 
 """
 
+from copy import copy as shallow_copy
 from functools import partial, wraps, cached_property
 from collections import defaultdict
 
-from dataclasses import dataclass, field
-from itertools import chain
+from dataclasses import MISSING, dataclass, field, fields
+from concurrent.futures import Executor
+from itertools import chain, islice
 from operator import attrgetter, eq
 from typing import (
     Callable,
@@ -145,7 +147,10 @@ from typing import (
     Iterable,
     Any,
     Mapping,
+    Hashable,
     Tuple,
+    List,
+    Iterator,
     KT,
     VT,
 )
@@ -166,6 +171,7 @@ from meshed.base import (
     FuncNode,
     BindInfo,
     ch_func_node_func,
+    ch_func_node_attrs,
     validate_that_func_node_names_are_sane,
     _mk_func_nodes,
     _func_nodes_to_graph_dict,
@@ -187,16 +193,37 @@ from meshed.util import (
     replace_item_in_iterable,
     InvalidFunctionParameters,
     extract_values,
+    mk_values_extractor,
     extract_items,
     ParameterMerger,
     conservative_parameter_merge,
+    signature_of,
+)
+from meshed.caching import NodeCacheSpec
+from meshed.profiling import NodeProfiler, profiled
+from meshed.executors import (
+    ExecutorSpec,
+    FuncNodeSubmitter,
+    mk_executor,
+    is_process_pool,
+    validate_executor_spec,
+    dumps_callable,
+    _call_pickled,
+    func_node_dependencies,
+    func_node_releases,
+    func_node_levels,
+    stream_func_nodes,
+    call_func_nodes_with_executor,
+    acall_func_nodes_with_executor,
 )
 from meshed.itools import (
+    _split_if_str,
     topological_sort,
     leaf_nodes,
     root_nodes,
     descendants,
     ancestors,
+    IndexedGraph,
 )
 
 dflt_configs = dict(
@@ -279,7 +306,7 @@ def mk_nodes_names_unique(nodes):
 
 
 def arg_names(func, func_name, exclude_names=()):
-    names = Sig(func).names
+    names = signature_of(func).names
 
     def gen():
         _exclude_names = exclude_names
@@ -372,6 +399,125 @@ def _separate_func_nodes_and_var_nodes(nodes):
     return func_nodes, var_nodes
 
 
+class ArgumentBinder:
+    """Binds ``(args, kwargs)`` to a fresh ``{argname: argval}`` scope, following a
+    layout precomputed from a signature.
+
+    This is what ``DAG`` uses to make the initial scope of a call, instead of going
+    through the generic ``Sig`` binding machinery on every call.
+
+    >>> def foo(w, /, x, y=2, *, z=3): ...
+    >>> binder = ArgumentBinder(Sig(foo))
+    >>> binder((0, 1), {'z': 4})
+    {'w': 0, 'x': 1, 'y': 2, 'z': 4}
+    >>> binder((0,), {'x': 1})
+    {'w': 0, 'x': 1, 'y': 2, 'z': 3}
+
+    Errors are the ones you'd get from calling a function with that signature:
+
+    >>> binder((0, 1, 2, 3), {})
+    Traceback (most recent call last):
+      ...
+    TypeError: too many positional arguments
+    >>> binder((0,), {'x': 1, 'u': 2})
+    Traceback (most recent call last):
+      ...
+    TypeError: got an unexpected keyword argument 'u'
+    >>> binder((), {'x': 1})
+    Traceback (most recent call last):
+      ...
+    TypeError: missing a required argument: 'w'
+
+    Names listed in ``optional_names`` are not required, even if they don't have
+    a default: When missing, they're just not in the scope.
+
+    >>> ArgumentBinder(Sig(foo), optional_names=['x'])((0,), {})
+    {'w': 0, 'y': 2, 'z': 3}
+
+    """
+
+    def __init__(self, sig: Sig, optional_names: Iterable[str] = ()):
+        self.sig = sig
+        self.names = frozenset(sig.names)
+        optional_names = set(optional_names)
+        self.layout = tuple(
+            (
+                p.name,
+                p.kind == Parameter.POSITIONAL_ONLY,
+                p.default,
+                p.name not in optional_names,  # whether it's required or not
+            )
+            for p in sig.params
+        )
+        self.n_positional = sum(
+            p.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+            for p in sig.params
+        )
+        self.has_variadics = sig.has_var_positional or sig.has_var_keyword
+
+    def __call__(self, args: tuple, kwargs: dict) -> dict:
+        n_args = len(args)
+        if n_args > self.n_positional:
+            raise TypeError('too many positional arguments')
+        scope = {}
+        n_kwargs_used = 0
+        for i, (name, positional_only, default, required) in enumerate(self.layout):
+            if i < n_args:
+                if name in kwargs and not positional_only:
+                    raise TypeError(f"multiple values for argument '{name}'")
+                scope[name] = args[i]
+            elif name in kwargs and not positional_only:
+                scope[name] = kwargs[name]
+                n_kwargs_used += 1
+            elif default is not empty:
+                scope[name] = default
+            elif required:
+                raise TypeError(f"missing a required argument: '{name}'")
+        if n_kwargs_used != len(kwargs):
+            self._raise_for_unexpected_kwargs(kwargs)
+        return scope
+
+    def defaults_for(self, names: Iterable[str]) -> dict:
+        """The ``{name: value, ...}`` of the arguments that are not in ``names``, for
+        calls where only (and exactly) ``names`` are given, as keywords.
+
+        Raises the same errors a call with those keyword arguments would.
+
+        >>> def foo(w, /, x, y=2, *, z=3): ...
+        >>> binder = ArgumentBinder(Sig(foo), optional_names=['w'])
+        >>> binder.defaults_for(['x', 'z'])
+        {'y': 2}
+        >>> binder.defaults_for(['z'])
+        Traceback (most recent call last):
+          ...
+        TypeError: missing a required argument: 'x'
+        """
+        names = set(names)
+        defaults = {}
+        n_names_used = 0
+        for name, positional_only, default, required in self.layout:
+            if name in names and not positional_only:
+                n_names_used += 1
+            elif default is not empty:
+                defaults[name] = default
+            elif required:
+                raise TypeError(f"missing a required argument: '{name}'")
+        if n_names_used != len(names):
+            self._raise_for_unexpected_kwargs(names)
+        return defaults
+
+    def _raise_for_unexpected_kwargs(self, kwargs):
+        positional_only = {name for name, po, *_ in self.layout if po}
+        for name in kwargs:
+            if name in positional_only:
+                raise TypeError(
+                    f"'{name}' parameter is positional only, but was passed as a "
+                    f'keyword'
+                )
+            elif name not in self.sig.names:
+                raise TypeError(f"got an unexpected keyword argument '{name}'")
+
+
 _not_found = object()
 
 
@@ -390,7 +536,7 @@ def _find_unique_element(item, search_iterable, key: Callable[[Any, Any], bool])
 
 
 def modified_func_node(func_node, **modifications) -> FuncNode:
-    modifiable_attrs = {'func', 'name', 'bind', 'out'}
+    modifiable_attrs = {'func', 'name', 'bind', 'out', 'executor'}
     assert not modifications.keys().isdisjoint(
         modifiable_attrs
     ), f"Can only modify these: {', '.join(modifiable_attrs)}"
@@ -399,6 +545,7 @@ def modified_func_node(func_node, **modifications) -> FuncNode:
         'name': func_node.name,
         'bind': func_node.bind,
         'out': func_node.out,
+        'executor': func_node.executor,
     }
     return FuncNode(**dict(original_func_node_kwargs, **modifications))
 
@@ -427,6 +574,89 @@ def partialized_funcnodes(func_nodes, **keyword_defaults):
             yield func_node
 
 
+class _Constant:
+    """A function returning ``value`` (a folded func node, whose output is an output
+    of the dag, becomes a func node of a ``_Constant``)"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self):
+        return self.value
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.value!r})'
+
+
+def _func_node_with_constants(func_node, bindings: dict) -> FuncNode:
+    """The func node whose func has the ``{param: value, ...}`` ``bindings`` bound,
+    through a ``functools.partial`` (whose call is much cheaper than that of the
+    wrapper ``partialized_funcnodes`` makes), and whose signature (so ``bind``)
+    doesn't have the bound params anymore: The func node doesn't refer to the var
+    nodes of the constants. Since a func node calls its func with keyword arguments,
+    moving the bound params to the end isn't needed. (Positional-only params can't
+    be bound by keyword, so the func is first made to have none.)"""
+    func, kinds = func_node.func, func_node.sig.kinds
+    if any(kinds[param] == Parameter.POSITIONAL_ONLY for param in bindings):
+        func = ch_func_to_all_pk(func)
+    func_with_constants = partial(func, **bindings)
+    Sig(func).remove_names(list(bindings))(func_with_constants)
+    bind = {param: src for param, src in func_node.bind.items() if param not in bindings}
+    return modified_func_node(func_node, func=func_with_constants, bind=bind)
+
+
+def fold_constants(func_nodes, constants: dict, outputs: Iterable[str] = ()):
+    """Evaluate, once, the func nodes whose inputs are all ``constants`` (given as
+    ``{var_node: value, ...}``), or outputs of such func nodes (so including func
+    nodes that have no inputs), and remove them.
+
+    Returns the remaining func nodes, where the values of the constants they need are
+    bound (as defaults of their funcs), and the ``{var_node: value, ...}`` dict of
+    ``constants``, completed with the outputs of the folded func nodes.
+    The folded func nodes computing ``outputs`` (var nodes that must still be
+    computed) are replaced by func nodes returning their (constant) value.
+
+    ``func_nodes`` must be in topological order, and their funcs must be pure, since
+    the folded ones are called only once, here.
+
+    >>> def f(a, b):
+    ...     return a + b
+    >>> def g(f, c):
+    ...     return f * c
+    >>> func_nodes, constants = fold_constants(
+    ...     [FuncNode(f), FuncNode(g)], {'a': 1, 'b': 2}
+    ... )
+    >>> func_nodes  # (the constant f is bound in the func of g, not in its bind)
+    [FuncNode(c -> g_ -> g)]
+    >>> constants
+    {'a': 1, 'b': 2, 'f': 3}
+    >>> func_nodes[0].call_on_scope(dict(c=10), write_output_into_scope=False)
+    30
+    """
+    constants = dict(constants)
+    outputs = set(outputs)
+    folded = set()  # (ids of the folded func nodes)
+    for func_node in func_nodes:
+        if all(src in constants for src in func_node.bind.values()):
+            constants[func_node.out] = func_node.call_plan(constants)
+            folded.add(id(func_node))
+    remaining = []
+    for func_node in func_nodes:
+        if id(func_node) in folded:
+            if func_node.out in outputs:
+                value = _Constant(constants[func_node.out])
+                remaining.append(modified_func_node(func_node, func=value, bind={}))
+        elif bindings := {
+            param: constants[src]
+            for param, src in func_node.bind.items()
+            if src in constants
+        }:
+            remaining.append(_func_node_with_constants(func_node, bindings))
+        else:
+            remaining.append(func_node)
+    return remaining, constants
+
+
 Scope = dict
 VarNames = Iterable[str]
 DagOutput = Any
@@ -449,6 +679,254 @@ def dflt_debugger_feedback(func_node, scope, output, step):
     return output
 
 
+def func_nodes_needed_for(
+    func_nodes: Iterable[FuncNode], outputs: Iterable[str], inputs: Iterable[str] = ()
+) -> Tuple[FuncNode, ...]:
+    """The subset of ``func_nodes`` (in the same order) that need to be computed to
+    get the ``outputs`` var nodes, given that the values of the ``inputs`` var nodes
+    will be provided (so don't need to be computed).
+
+    >>> def f(a): ...
+    >>> def g(f): ...
+    >>> def h(a): ...
+    >>> func_nodes = list(map(FuncNode, [f, g, h]))
+    >>> func_nodes_needed_for(func_nodes, ['g'])
+    (FuncNode(a -> f_ -> f), FuncNode(f -> g_ -> g))
+    >>> func_nodes_needed_for(func_nodes, ['a', 'h'])
+    (FuncNode(a -> h_ -> h),)
+    >>> func_nodes_needed_for(func_nodes, ['g'], inputs=['f'])
+    (FuncNode(f -> g_ -> g),)
+    """
+    func_nodes = tuple(func_nodes)
+    inputs = set(inputs)
+    index_of_out = {
+        fn.out: i for i, fn in enumerate(func_nodes) if fn.out not in inputs
+    }
+    needed = set()
+    to_visit = [index_of_out[out] for out in outputs if out in index_of_out]
+    while to_visit:
+        i = to_visit.pop()
+        if i not in needed:
+            needed.add(i)
+            for src in func_nodes[i].bind.values():
+                if src in index_of_out:
+                    to_visit.append(index_of_out[src])
+    return tuple(fn for i, fn in enumerate(func_nodes) if i in needed)
+
+
+def func_nodes_affected_by(
+    func_nodes: Iterable[FuncNode], var_nodes: Iterable[str]
+) -> Tuple[FuncNode, ...]:
+    """The subset of ``func_nodes`` (in the same order) whose output depends on some
+    of the ``var_nodes``. These are the func nodes that need to be computed again
+    when the values of the ``var_nodes`` change (and only they do).
+
+    The ``func_nodes`` are assumed to be in topological order (as in ``DAG``), and
+    the func nodes computing the ``var_nodes`` themselves are not included.
+
+    >>> def f(a, b): ...
+    >>> def g(f, c): ...
+    >>> def h(a, d): ...
+    >>> func_nodes = list(map(FuncNode, [f, g, h]))
+    >>> func_nodes_affected_by(func_nodes, ['b'])
+    (FuncNode(a,b -> f_ -> f), FuncNode(f,c -> g_ -> g))
+    >>> func_nodes_affected_by(func_nodes, ['d'])
+    (FuncNode(a,d -> h_ -> h),)
+    >>> func_nodes_affected_by(func_nodes, ['b', 'f'])
+    (FuncNode(f,c -> g_ -> g),)
+    """
+    given = set(var_nodes)
+    changed = set(given)
+    affected = []
+    for func_node in func_nodes:
+        if func_node.out not in given and not changed.isdisjoint(
+            func_node.bind.values()
+        ):
+            affected.append(func_node)
+            changed.add(func_node.out)
+    return tuple(affected)
+
+
+def eliminate_common_subexpressions(func_nodes: Iterable[FuncNode]) -> List[FuncNode]:
+    """Merge the func nodes that compute the same thing: The same function (the same
+    object) on the same sources. The first of these (in topological order) is kept,
+    and the binds of the func nodes that used the others' outputs are rewired to its
+    output (which can make more func nodes the same, and so on).
+
+    Since only one of them is computed, this should only be used if the functions
+    are pure (their output only depends on their inputs, and they have no side
+    effects).
+
+    >>> def normalize(x): return x / 10
+    >>> def f(normalize): return normalize + 1
+    >>> def g(norm): return norm * 2
+    >>> def h(f, g): return f + g
+    >>> func_nodes = [
+    ...     FuncNode(normalize), f,  # (a fragment)
+    ...     FuncNode(normalize, name='norm_', out='norm'), g,  # (another fragment)
+    ...     h,
+    ... ]
+    >>> print(DAG(eliminate_common_subexpressions(func_nodes)).synopsis_string())
+    x -> normalize_ -> normalize
+    normalize -> f_ -> f
+    normalize -> g_ -> g
+    f,g -> h_ -> h
+
+    Func nodes whose outputs aren't used by any other func node (that is, are outputs
+    of the DAG) aren't merged with func nodes of another output, so that the outputs
+    of the DAG don't change.
+    """
+    func_nodes = list(_mk_func_nodes(func_nodes))
+    nodes = topological_sort(_func_nodes_to_graph_dict(func_nodes))
+    func_nodes = list(filter(is_func_node, nodes))
+    consumed = {src for fn in func_nodes for src in fn.bind.values()}
+
+    def is_consumed(fn):  # (binds can also refer to func nodes by their name)
+        return fn.out in consumed or fn.name in consumed
+
+    # Number the values of var nodes, so that those computed the same way have the
+    # same number. A func node can't read the same var node twice, so var nodes that
+    # a func node reads along with another one of the same value must stay distinct.
+    value_numbers, value_of = {}, {}
+    distinct = set()
+    for func_node in func_nodes:
+        values = {k: value_of.get(v, v) for k, v in func_node.bind.items()}
+        srcs_of_value = defaultdict(list)
+        for src, value in zip(func_node.bind.values(), values.values()):
+            srcs_of_value[value].append(src)
+        distinct.update(*(srcs for srcs in srcs_of_value.values() if len(srcs) > 1))
+        key = (id(func_node.func), tuple(sorted(values.items())))
+        value_of[func_node.out] = value_numbers.setdefault(key, len(value_numbers))
+
+    kept = {}  # {(id of func, bind items): func node kept for them}
+    renames = {}  # {out (or name) of a merged func node: out to use instead}
+    merged = []
+    for func_node in func_nodes:
+        if renames and any(src in renames for src in func_node.bind.values()):
+            bind = {k: renames.get(v, v) for k, v in func_node.bind.items()}
+            func_node = ch_func_node_attrs(func_node, bind=bind)
+        key = (id(func_node.func), tuple(sorted(func_node.bind.items())))
+        original = kept.setdefault(key, func_node)
+        if original is not func_node and (
+            original.out == func_node.out
+            or (
+                is_consumed(original)
+                and is_consumed(func_node)
+                and func_node.out not in distinct
+            )
+        ):
+            renames[func_node.out] = renames[func_node.name] = original.out
+        else:
+            merged.append(func_node)
+    return merged
+
+
+def _chunks(iterable: Iterable, chunksize: int) -> Iterator[list]:
+    """Split ``iterable`` into lists of (at most) ``chunksize`` items.
+
+    >>> list(_chunks(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, chunksize)):
+        yield chunk
+
+
+def _call_with_kwargs(func, kwargs):
+    return func(**kwargs)
+
+
+def _call_func_nodes_releasing(func_nodes, releases, scope):
+    """Call the func nodes on scope, deleting the var nodes that are released (see
+    ``meshed.executors.func_node_releases``) after each call"""
+    for func_node, released in zip(func_nodes, releases):
+        output = func_node.call_on_scope(scope)
+        for name in released:
+            del scope[name]
+        yield output
+
+
+class _ValidatedFuncNodes(tuple):
+    """Func nodes (of a DAG) that were already made, validated and cleaned (names made
+    unique, bindings to func node names resolved) by a DAG, which, given these,
+    doesn't redo it (see ``DAG._sub_dag``)."""
+
+
+class DagPlan:
+    """A specialization of a ``DAG`` that only computes what's needed to get some of
+    its var nodes (the ``outputs``), possibly given the values of some of its
+    intermediate var nodes (the ``inputs``).
+
+    You'll usually get one through ``DAG.plan``, which caches them.
+
+    The signature of the plan only contains the arguments of the dag that are
+    needed to compute the ``outputs``, followed by the (keyword-only) ``inputs``,
+    and it returns the value of the ``outputs`` (a tuple if there are several, the
+    value itself if there's only one).
+    """
+
+    def __init__(
+        self, dag: 'DAG', outputs: Tuple[str, ...], inputs: Tuple[str, ...] = ()
+    ):
+        self.dag = dag
+        self.outputs = outputs
+        self.inputs = inputs
+        self.func_nodes = func_nodes_needed_for(dag.func_nodes, outputs, inputs)
+        self.dag_sig = dag.__signature__  # to know if the plan needs to be remade
+        needed_names = set(outputs)
+        for func_node in self.func_nodes:
+            needed_names.update(func_node.bind.values())
+        input_params = [Parameter(name, Parameter.KEYWORD_ONLY) for name in inputs]
+        self.__signature__ = Sig(
+            [p for p in self.dag_sig.params if p.name in needed_names] + input_params
+        )
+        self._argument_binder = ArgumentBinder(self.__signature__)
+        # To bind arguments the way the dag would (see DAG.call)
+        self._dag_argument_binder = ArgumentBinder(
+            Sig(self.dag_sig.params + input_params),
+            optional_names=set(self.dag_sig.names) - needed_names,
+        )
+        self._extract_output = mk_values_extractor(outputs)
+        self._dependencies = func_node_dependencies(self.func_nodes)
+        self._releases = None
+        if dag.free_intermediates:
+            self._releases = func_node_releases(self.func_nodes, keep=outputs)
+
+    def __call__(self, *args, **kwargs):
+        return self._call_on_scope(self._argument_binder(args, kwargs))
+
+    def call_with_dag_arguments(self, args: tuple, kwargs: dict):
+        """Call the plan with arguments given as they would be to the dag.
+        That is, positional arguments are matched to the dag's signature, not the
+        plan's, and arguments the plan doesn't need can be given (but are ignored).
+        """
+        return self._call_on_scope(self._dag_argument_binder(args, kwargs))
+
+    def _call_on_scope(self, scope):
+        scope = self.dag._preprocess_scope(scope)
+        if self.dag._calls_with_executors:
+            call_func_nodes_with_executor(
+                self.func_nodes,
+                scope,
+                self.dag._get_submitter(),
+                self._dependencies,
+                self._releases,
+            )
+        elif self._releases is None:
+            for func_node in self.func_nodes:
+                func_node.call_on_scope(scope)
+        else:
+            for _ in _call_func_nodes_releasing(self.func_nodes, self._releases, scope):
+                pass
+        return self._extract_output(scope)
+
+    def __repr__(self):
+        inputs = f", inputs={', '.join(self.inputs)}" if self.inputs else ''
+        return (
+            f"DagPlan({self.dag.__name__}, outputs={', '.join(self.outputs)}{inputs})"
+        )
+
+
 # TODO: caching last scope isn't really the DAG's direct concern -- it's a debugging
 #  concern. Perhaps a more general form would be to define a cache factory defaulting
 #  to a dict, but that could be a "dict" that logs writes (even to an attribute of self)
@@ -509,17 +987,33 @@ class DAG:
     extract_output_from_scope: Callable[[Scope, VarNames], DagOutput] = field(
         default=extract_values, repr=False
     )
+    # None (call func nodes sequentially), 'threads', 'processes', or an Executor
+    executor: ExecutorSpec = field(default=None, repr=False)
+    max_workers: Optional[int] = field(default=None, repr=False)
+    # delete intermediates from the scope as soon as no func node needs them anymore
+    free_intermediates: bool = field(default=False, repr=False)
+    # cache (see meshed.caching) the func nodes that don't have their own cache
+    cache: NodeCacheSpec = field(default=None, repr=False)
+    # merge func nodes that compute the same thing (common subexpression elimination:
+    # see eliminate_common_subexpressions). Only for DAGs of pure functions!
+    cse: bool = field(default=False, repr=False)
 
     def __post_init__(self):
+        validated = isinstance(self.func_nodes, _ValidatedFuncNodes)
         self.func_nodes = tuple(_mk_func_nodes(self.func_nodes))
-        self.graph = _func_nodes_to_graph_dict(self.func_nodes)
+        if self.cse and not validated:
+            self.func_nodes = tuple(eliminate_common_subexpressions(self.func_nodes))
+        if self.cache:
+            self.func_nodes = tuple(map(self._with_cache, self.func_nodes))
+        # (indexed, so that reachability queries, e.g. to get sub-dags, are fast)
+        self.graph = IndexedGraph(_func_nodes_to_graph_dict(self.func_nodes))
         self.nodes = topological_sort(self.graph)
         # reorder the nodes to fit topological order
         self.func_nodes, self.var_nodes = _separate_func_nodes_and_var_nodes(self.nodes)
         # self.sig = Sig(dict(extract_items(sig.parameters, 'xz')))
         self.__signature__ = Sig(  # make a signature
             sort_params(  # with the sorted params (sorted to satisfy kind/default order)
-                self.src_name_params(root_nodes(self.graph))
+                self.src_name_params(self.graph.root_nodes())
             )
         )
 
@@ -528,13 +1022,125 @@ class DAG:
         self.roots = tuple(
             self.__signature__.names
         )  # roots in the same order as signature
-        leafs = leaf_nodes(self.graph)
+        leafs = self.graph.leaf_nodes()
         # But we want leafs in topological order
         self.leafs = tuple([name for name in self.nodes if name in leafs])
         self.last_scope = None
         self.__name__ = self.name or 'DAG'
 
-        self.bindings_cleaner()
+        if not validated:
+            self.bindings_cleaner()
+        self._prepare_calls()
+
+    def _prepare_calls(self):
+        """Precompute what calls need (from the analysis made by ``__post_init__``)"""
+        # precompile the argument binding (entry) and output extraction (exit)
+        self._argument_binder = ArgumentBinder(self.__signature__)
+        self._extract_output = None
+        if self.extract_output_from_scope is extract_values:
+            self._extract_output = mk_values_extractor(self.leafs)
+
+        validate_executor_spec(self.executor)
+        for func_node in self.func_nodes:
+            validate_executor_spec(func_node.executor)
+        self._submitter = None
+        self._func_nodes_have_executors = any(
+            func_node.executor is not None for func_node in self.func_nodes
+        )
+        # liveness analysis: what intermediates can be freed after each func node
+        self._releases = None
+        if self.free_intermediates:
+            self._releases = func_node_releases(self.func_nodes, keep=self.leafs)
+
+    @classmethod
+    def _from_analysis(
+        cls,
+        func_nodes: Iterable[FuncNode],
+        nodes: Iterable,
+        signature: Sig,
+        leafs: Iterable[str],
+        **dag_fields,
+    ) -> 'DAG':
+        """Make a dag from the results of the analysis that ``__post_init__`` makes
+        (``func_nodes`` that were validated and cleaned, ``nodes`` in topological
+        order, the merged ``signature``, and the ``leafs``), without redoing it.
+        (See ``meshed.compiled``, which saves and loads these.)
+        """
+        dag = cls.__new__(cls)
+        for f in fields(cls):
+            if f.name in dag_fields:
+                value = dag_fields[f.name]
+            elif f.default is not MISSING:
+                value = f.default
+            else:
+                value = f.default_factory()
+            setattr(dag, f.name, value)
+        dag.nodes = list(nodes)
+        dag.func_nodes, dag.var_nodes = _separate_func_nodes_and_var_nodes(dag.nodes)
+        dag.graph = IndexedGraph(_func_nodes_to_graph_dict(dag.func_nodes))
+        dag.__signature__ = signature
+        dag.roots = tuple(signature.names)
+        dag.leafs = tuple(leafs)
+        dag.last_scope = None
+        dag.__name__ = dag.name or 'DAG'
+        dag._prepare_calls()
+        return dag
+
+    def _with_cache(self, func_node: FuncNode) -> FuncNode:
+        if func_node.cache is not None:
+            return func_node
+        # Note: Unless self.cache is a NodeCache instance (then shared by all func
+        # nodes), each func node gets its own cache (so its own size limits and stats).
+        # Copies of func nodes (so of dags: ch_funcs, partial...) get empty caches.
+        return ch_func_node_attrs(func_node, cache=self.cache)
+
+    def profile(self, profiler: Optional[NodeProfiler] = None):
+        """A context manager in which the calls of the func nodes of the dag are
+        recorded (see ``meshed.profiling``).
+
+        >>> def f(a):
+        ...     return a + 1
+        >>> def g(f):
+        ...     return f * 2
+        >>> dag = DAG([f, g])
+        >>> with dag.profile() as profiler:
+        ...     dag(1)
+        4
+        >>> [call.name for call in profiler.calls]
+        ['f_', 'g_']
+        >>> print(profiler.stats_table())  # doctest: +SKIP
+          ncalls  nerrors    tottime    percall    cputime    maxtime  node
+               1        0   0.000002   0.000002   0.000002   0.000002  f_
+               1        0   0.000001   0.000001   0.000001   0.000001  g_
+        """
+        return profiled(self.func_nodes, profiler)
+
+    def cache_stats(self) -> dict:
+        """The ``{func_node_name: cache_stats, ...}`` of the func nodes that have a
+        cache (see ``meshed.caching.NodeCache``).
+
+        >>> def f(a):
+        ...     return a + 1
+        >>> def g(f, b):
+        ...     return f * b
+        >>> dag = DAG([f, g], cache={'maxsize': 2})
+        >>> [dag(1, b) for b in [1, 2, 1, 3]]
+        [2, 4, 2, 6]
+        >>> dag.cache_stats()['f_']
+        CacheStats(hits=3, misses=1, evictions=0, expirations=0, size=1)
+        >>> dag.cache_stats()['g_']
+        CacheStats(hits=1, misses=3, evictions=1, expirations=0, size=2)
+
+        Note that dags made from the same func nodes share their caches (and stats):
+        Those of sub-dags (``dag[...]``), and the func nodes that ``ch_funcs`` or
+        ``partial`` leave unchanged. Only the func nodes that are copied (see
+        ``ch_func_node_attrs``) get new (empty) caches.
+        """
+        return {
+            func_node.name: func_node.cache.stats
+            for func_node in self.func_nodes
+            if func_node.cache is not None
+        }
 
     # TODO: No control of other DAG args (cache_last_scope etc.).
     @classmethod
@@ -579,11 +1185,36 @@ class DAG:
         """
         Get a dict of {argname: argval} pairs from positional and keyword arguments.
         """
-        return self.__signature__.kwargs_from_args_and_kwargs(
-            args, kwargs, apply_defaults=True
-        )
+        binder = self._get_argument_binder()
+        if binder.has_variadics:
+            return self.__signature__.kwargs_from_args_and_kwargs(
+                args, kwargs, apply_defaults=True
+            )
+        return binder(args, kwargs)
+
+    def _get_argument_binder(self):
+        binder = self._argument_binder
+        if binder.sig is not self.__signature__:
+            # the signature was changed after construction: recompile the binder
+            binder = self._argument_binder = ArgumentBinder(self.__signature__)
+        return binder
+
+    def _intermediate_var_nodes_in(self, names: Iterable[str]) -> Tuple[str, ...]:
+        """The names that are var nodes computed by the dag (not arguments of it)"""
+        outs = self._func_node_outs
+        return tuple(sorted(name for name in names if name in outs))
+
+    @cached_property
+    def _func_node_outs(self):
+        return frozenset(func_node.out for func_node in self.func_nodes)
 
     def _call(self, *args, **kwargs):
+        if kwargs and not self._get_argument_binder().names.issuperset(kwargs):
+            # Some values of intermediate var nodes may have been given, in which case
+            # we don't need to compute them (nor what's only needed to compute them)
+            if inputs := self._intermediate_var_nodes_in(kwargs):
+                plan = self.plan(None, inputs)
+                return plan.call_with_dag_arguments(args, kwargs)
         # Get a dict of {argname: argval} pairs from positional and keyword arguments
         # How positionals are resolved is determined by self.__signature__
         # The result is the initial ``scope`` the func nodes will both read from
@@ -594,8 +1225,459 @@ class DAG:
         self.call_on_scope(scope)
         # From the scope, that may contain all intermediary results,
         # extract the desired final output and return it
+        if self._extract_output is not None:
+            return self._extract_output(scope)
+        return self.extract_output_from_scope(scope, self.leafs)
+
+    async def acall(self, *args, **kwargs):
+        """Call the DAG asynchronously: ``await dag.acall(...)``.
+
+        Func nodes whose functions are coroutine functions are run as ``asyncio``
+        tasks, concurrently when they don't depend on each other. Plain functions
+        are run inline (in the event loop's thread), or in their executor, if they,
+        or the DAG, have one (see ``meshed.executors``).
+
+        >>> import asyncio
+        >>> async def f(a):
+        ...     await asyncio.sleep(0.01)
+        ...     return a + 1
+        >>> def g(f, b=2):
+        ...     return f * b
+        >>> dag = DAG([f, g])
+        >>> asyncio.run(dag.acall(3))
+        8
+        """
+        scope = self._get_kwargs(*args, **kwargs)
+        await self.acall_on_scope(scope)
+        if self._extract_output is not None:
+            return self._extract_output(scope)
+        return self.extract_output_from_scope(scope, self.leafs)
+
+    async def acall_on_scope(self, scope=None):
+        """The asynchronous version of ``call_on_scope``."""
+        scope = self._preprocess_scope(scope)
+        await acall_func_nodes_with_executor(
+            self.func_nodes,
+            scope,
+            self._get_submitter(),
+            self._func_node_dependencies,
+            self._releases,
+        )
+
+    def call(self, *args, _outputs=None, **kwargs):
+        """Call the dag, computing only what's needed to get the ``_outputs`` var
+        nodes (all the leafs, if not given).
+
+        The arguments are given as they would be to the dag itself: Positional
+        arguments are bound to the dag's signature (not to the one of
+        ``self.plan(_outputs)``), and only those needed to compute the ``_outputs``
+        are required (the others are ignored). The underscore in ``_outputs`` is so it
+        doesn't clash with the names of the dag's arguments.
+
+        >>> def f(a, b): return a + b
+        >>> def g(f, c): return f * c
+        >>> def h(a, d=10): return a - d
+        >>> dag = DAG([f, g, h])
+        >>> dag(1, 2, 3)
+        (9, -9)
+        >>> dag.call(1, 2, 3, _outputs='g')
+        9
+        >>> dag.call(a=1, b=2, _outputs=['f', 'h'])
+        (3, -9)
+
+        Values for intermediate var nodes can also be given, in which case what was
+        only needed to compute them is skipped (the same goes for ``dag(...)``):
+
+        >>> dag.call(f=3, c=3, _outputs='g')
+        9
+
+        Even then, positional arguments are those of the dag, ``(a, b, c, d=10)``, so
+        here, ``10`` is ``c`` (``1`` and ``2``, ``a`` and ``b``, aren't needed):
+
+        >>> dag.call(1, 2, 10, f=3, _outputs='g')
+        30
+
+        """
+        inputs = self._intermediate_var_nodes_in(kwargs)
+        if _outputs is None and not inputs:
+            return self(*args, **kwargs)
+        return self.plan(_outputs, inputs).call_with_dag_arguments(args, kwargs)
+
+    def compile(self, func_name: Optional[str] = None) -> Callable:
+        """A plain python function, with the same signature as the dag, that
+        computes what the dag computes, with one assignment per func node, in
+        topological order, and var nodes as local variables (so no scope).
+        Since it's generated (and exec-ed) once, call it, rather than the dag, where
+        the per-call overhead matters. See ``meshed.codegen`` for its limitations.
+
+        >>> def f(a, b=2): return a + b
+        >>> def g(f, c=3): return f * c
+        >>> func = DAG([f, g], name='f_times_c').compile()
+        >>> func(1), func(1, c=10)
+        (9, 30)
+        >>> import inspect
+        >>> print(inspect.getsource(func))
+        def f_times_c(a, b=_default0, c=_default1):
+            f = _func0(a=a, b=b)
+            g = _func1(f=f, c=c)
+            return g
+        <BLANKLINE>
+        """
+        from meshed.codegen import dag_to_function
+
+        return dag_to_function(self, func_name)
+
+    def plan(self, outputs=None, inputs=()) -> DagPlan:
+        """Get a (cached) ``DagPlan`` that only computes what's needed to get the
+        ``outputs`` var nodes.
+
+        :param outputs: The var nodes (or func nodes, meaning their ``.out``) to
+            compute. Can be a space-separated string of names. Defaults to the leafs.
+        :param inputs: Intermediate var nodes whose values will be given, so don't
+            need to be computed (nor what's only needed to compute them).
+
+        >>> def f(a, b): return a + b
+        >>> def g(f, c): return f * c
+        >>> def h(a, d=10): return a - d
+        >>> dag = DAG([f, g, h])
+        >>> plan = dag.plan('f h')
+        >>> plan
+        DagPlan(DAG, outputs=f, h)
+        >>> plan.func_nodes
+        (FuncNode(a,b -> f_ -> f), FuncNode(a,d -> h_ -> h))
+        >>> from inspect import signature
+        >>> str(signature(plan))
+        '(a, b, d=10)'
+        >>> plan(1, 2)
+        (3, -9)
+        >>> dag.plan(['f', 'h']) is plan  # plans are cached
+        True
+
+        If we have the value of ``f`` already, ``f_`` doesn't need to be computed,
+        so ``b`` isn't needed anymore:
+
+        >>> plan = dag.plan('g', inputs=['f'])
+        >>> plan.func_nodes
+        (FuncNode(f,c -> g_ -> g),)
+        >>> str(signature(plan))
+        '(c, *, f)'
+        >>> plan(3, f=2)
+        6
+        """
+        inputs = tuple(sorted(_split_if_str(inputs)))
+        key = (outputs, inputs)
+        try:  # fast path: the outputs spec was seen already (if hashable)
+            plan = self._plans[key]
+        except (KeyError, TypeError):
+            plan = None
+        if plan is None or plan.dag_sig is not self.__signature__:
+            normalized_key = (self._normalize_outputs(outputs), inputs)
+            plan = self._plans.get(normalized_key, None)
+            if plan is None or plan.dag_sig is not self.__signature__:
+                if not_var_nodes := set(inputs) - set(self.var_nodes):
+                    raise NotFound(f"These inputs aren't var nodes: {not_var_nodes}")
+                plan = DagPlan(self, *normalized_key)
+                self._plans[normalized_key] = plan
+            if isinstance(outputs, Hashable):
+                self._plans[key] = plan
+        return plan
+
+    def _normalize_outputs(self, outputs) -> Tuple[str, ...]:
+        if outputs is None:
+            return self.leafs
+        if isinstance(outputs, str):
+            outputs = outputs.split()
+
+        def output_name(output):
+            if isinstance(output, str) and output in self.var_nodes:
+                return output
+            func_node = self.find_func_node(output)
+            if func_node is None:
+                raise NotFound(f"No var node (or func node) named: {output}")
+            return func_node.out
+
+        return tuple(map(output_name, outputs))
+
+    @cached_property
+    def _plans(self):
+        return {}
+
+    def update(self, **changed_inputs):
+        """Recompute the dag after a change of some of its inputs, reusing the values
+        of the (``last_scope`` of the) previous call for everything that doesn't
+        depend on the changed inputs. Returns the (updated) leafs, as a call would.
+
+        >>> def f(a, b):
+        ...     print('computing f')
+        ...     return a + b
+        >>> def g(f, c):
+        ...     print('computing g')
+        ...     return f * c
+        >>> def h(a, d):
+        ...     print('computing h')
+        ...     return a - d
+        >>> dag = DAG([f, g, h])
+        >>> dag(1, 2, 3, 4)
+        computing f
+        computing g
+        computing h
+        (9, -3)
+        >>> dag.update(d=10)
+        computing h
+        (9, -9)
+        >>> dag.update(c=2)
+        computing g
+        (6, -9)
+
+        The values of intermediate var nodes can also be changed:
+
+        >>> dag.update(f=100)
+        computing g
+        (200, -9)
+
+        Note that the ``last_scope`` is updated in place (it's the scope of the
+        update), so ``update`` needs ``cache_last_scope=True`` and the
+        intermediates to be kept (``free_intermediates=False``). The previous call
+        must also have computed all the leafs (not only some ``_outputs``):
+
+        >>> _ = dag.call(1, 2, 3, 4, _outputs=['g'])
+        computing f
+        computing g
+        >>> dag.update(c=5)
+        Traceback (most recent call last):
+          ...
+        ValueError: There is no previous scope to update: These var nodes are missing from the last scope: ['h']. The dag needs to be called first (for all its outputs), with cache_last_scope=True and free_intermediates=False
+        """
+        scope = self.last_scope
+        if scope is None or self.free_intermediates:
+            raise ValueError(
+                'There is no previous scope to update: The dag needs to be called '
+                'first, with cache_last_scope=True and free_intermediates=False'
+            )
+        changed = tuple(sorted(changed_inputs))
+        func_nodes, dependencies, needed = self._update_plan(changed)
+        if missing := needed - scope.keys() - changed_inputs.keys():
+            raise ValueError(
+                'There is no previous scope to update: These var nodes are missing '
+                f'from the last scope: {sorted(missing)}. The dag needs to be called '
+                'first (for all its outputs), with cache_last_scope=True and '
+                'free_intermediates=False'
+            )
+        scope.update(changed_inputs)
+        if self._calls_with_executors:
+            call_func_nodes_with_executor(
+                func_nodes, scope, self._get_submitter(), dependencies
+            )
+        else:
+            for func_node in func_nodes:
+                func_node.call_on_scope(scope)
+        return self._extract_output_from(scope)
+
+    def _update_plan(self, changed: Tuple[str, ...]):
+        """The (cached) func nodes to recompute (and their dependencies) when the
+        ``changed`` var nodes change, and the var nodes the scope needs to have for
+        that (the inputs of those func nodes, and the leafs, that they don't compute)
+        """
+        update_plan = self._update_plans.get(changed, None)
+        if update_plan is None:
+            if not_var_nodes := set(changed) - set(self.var_nodes):
+                raise NotFound(f"These aren't var nodes: {not_var_nodes}")
+            func_nodes = func_nodes_affected_by(self.func_nodes, changed)
+            needed = set(self.leafs).union(
+                *(func_node.bind.values() for func_node in func_nodes)
+            ) - {func_node.out for func_node in func_nodes}
+            update_plan = (func_nodes, func_node_dependencies(func_nodes), needed)
+            self._update_plans[changed] = update_plan
+        return update_plan
+
+    @cached_property
+    def _update_plans(self):
+        return {}
+
+    def map(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        *,
+        chunksize: int = 1000,
+        executor: ExecutorSpec = None,
+        max_workers: Optional[int] = None,
+    ) -> Iterator:
+        """Call the dag on each of the ``rows`` (mappings of keyword arguments),
+        yielding the outputs in the same order.
+
+        The work that doesn't depend on the values of a row (binding the arguments,
+        looking up the plan for the intermediates that are given...) is done once
+        for all the (consecutive) rows that have the same keys, not once per row.
+
+        >>> def f(a, b=1):
+        ...     return a + b
+        >>> def g(f, c=2):
+        ...     return f * c
+        >>> dag = DAG([f, g])
+        >>> list(dag.map([{'a': 1}, {'a': 2}, {'a': 1, 'c': 10}, {'f': 5}]))
+        [4, 6, 20, 10]
+
+        With an ``executor`` (``'threads'``, ``'processes'`` or an ``Executor``
+        instance), the rows are grouped in chunks of ``chunksize`` rows, that are
+        computed in parallel.
+
+        >>> rows = ({'a': i} for i in range(5))
+        >>> list(dag.map(rows, chunksize=2, executor='threads'))
+        [2, 4, 6, 8, 10]
+
+        Note that ``map`` doesn't update ``last_scope``.
+        """
+        if executor is None:
+            return self._call_on_rows(rows)
+        validate_executor_spec(executor)
+        return self._map_with_executor(rows, chunksize, executor, max_workers)
+
+    def map_columns(self, columns: Mapping[str, Iterable], **map_kwargs) -> Iterator:
+        """Like ``map``, but with the rows given as columns:
+        A ``{argname: values, ...}`` mapping.
+
+        >>> def f(a, b=1):
+        ...     return a + b
+        >>> dag = DAG([f])
+        >>> list(dag.map_columns({'a': [1, 2, 3], 'b': [10, 20, 30]}))
+        [11, 22, 33]
+        """
+        names = tuple(columns)
+        rows = (dict(zip(names, values)) for values in zip(*columns.values()))
+        return self.map(rows, **map_kwargs)
+
+    def stream(
+        self,
+        records: Iterable[Mapping[str, Any]],
+        *,
+        stages: Optional[Iterable[Iterable[Union[str, FuncNode]]]] = None,
+        maxsize: int = 2,
+    ) -> Iterator:
+        """Call the dag on each of the ``records`` (mappings of keyword arguments),
+        as a pipeline, yielding the outputs in the same order.
+
+        The func nodes are grouped in stages that each run in their own thread, and
+        that are connected by queues (holding at most ``maxsize`` records):
+        While a stage works on a record, the previous stage can work on the next one.
+
+        By default, there's a stage per topological level of the dag (see
+        ``meshed.executors.func_node_levels``), but ``stages`` can also be given
+        explicitly, as groups of func nodes (or their names).
+
+        >>> import time
+        >>> def fetch(url):
+        ...     time.sleep(0.01)  # a slow I/O-bound function
+        ...     return url.upper()
+        >>> def parse(fetch):
+        ...     return len(fetch)
+        >>> def store(parse, url):
+        ...     return f'{url}: {parse}'
+        >>> dag = DAG([fetch, parse, store])
+        >>> records = ({'url': url} for url in ['a.com', 'bb.org', 'ccc.net'])
+        >>> list(dag.stream(records, stages=[['fetch_'], ['parse_', 'store_']]))
+        ['a.com: 5', 'bb.org: 6', 'ccc.net: 7']
+
+        The executors of the dag and its func nodes are not used: Func nodes are
+        called in the thread of their stage.
+        """
+        stages = self._stream_stages(stages)
+        scopes = (self._get_kwargs(**record) for record in records)
+        scopes = stream_func_nodes(stages, scopes, maxsize)
+        return map(self._extract_output_from, scopes)
+
+    def _extract_output_from(self, scope):
+        if self._extract_output is not None:
+            return self._extract_output(scope)
         return self.extract_output_from_scope(scope, self.leafs)
 
+    def _stream_stages(self, stages=None) -> List[Tuple[FuncNode, ...]]:
+        dependencies = self._func_node_dependencies
+        if stages is None:
+            levels = func_node_levels(self.func_nodes, dependencies)
+            return [tuple(self.func_nodes[i] for i in level) for level in levels]
+        index_of = {id(func_node): i for i, func_node in enumerate(self.func_nodes)}
+        stage_of = {}
+        for stage_idx, stage in enumerate(stages):
+            for node in _split_if_str(stage):
+                func_node = self.find_func_node(node)
+                if func_node is None or id(func_node) not in index_of:
+                    raise NotFound(f'No such func node: {node}')
+                if (i := index_of[id(func_node)]) in stage_of:
+                    raise ValidationError(f'{func_node} is in more than one stage')
+                stage_of[i] = stage_idx
+        if missing := set(range(len(self.func_nodes))) - set(stage_of):
+            missing = ', '.join(self.func_nodes[i].name for i in sorted(missing))
+            raise ValidationError(f'These func nodes are in no stage: {missing}')
+        _, children = dependencies
+        for i, children_of_i in enumerate(children):
+            for child in children_of_i:
+                if stage_of[child] < stage_of[i]:
+                    raise ValidationError(
+                        f'{self.func_nodes[child]} is in an earlier stage than '
+                        f'{self.func_nodes[i]}, which it depends on'
+                    )
+        n_stages = max(stage_of.values(), default=-1) + 1
+        grouped = [[] for _ in range(n_stages)]
+        for i in sorted(stage_of):  # so func nodes are in topological order
+            grouped[stage_of[i]].append(self.func_nodes[i])
+        return [tuple(stage) for stage in grouped if stage]
+
+    def _map_with_executor(self, rows, chunksize, executor, max_workers):
+        chunks = _chunks(rows, chunksize)
+        if isinstance(executor, Executor):
+            yield from self._map_chunks_with_executor(chunks, executor)
+        else:  # we made it, so we shut it down
+            with mk_executor(executor, max_workers) as executor:
+                yield from self._map_chunks_with_executor(chunks, executor)
+
+    def _map_chunks_with_executor(self, chunks, executor: Executor):
+        if is_process_pool(executor):
+            # The dag is pickled once, and unpickled once per worker process
+            call_on_chunk = partial(_call_pickled, dumps_callable(self._call_on_chunk))
+        else:
+            call_on_chunk = self._call_on_chunk
+        for outputs in executor.map(call_on_chunk, chunks):
+            yield from outputs
+
+    def _call_on_chunk(self, rows):
+        return list(self._call_on_rows(rows))
+
+    def _call_on_rows(self, rows):
+        keys, call_row = None, None
+        for row in rows:
+            if row.keys() != keys:
+                keys = row.keys()
+                call_row = self._row_caller(keys)
+            yield call_row(row)
+
+    def _row_caller(self, names: Iterable[str]) -> Callable[[Mapping], Any]:
+        """Make a function that calls the dag on a row, a mapping with the given
+        names as keys"""
+        if inputs := self._intermediate_var_nodes_in(names):
+            plan = self.plan(None, inputs)
+            binder, func_nodes = plan._dag_argument_binder, plan.func_nodes
+            releases, extract_output = plan._releases, plan._extract_output
+        else:
+            binder, func_nodes = self._get_argument_binder(), self.func_nodes
+            releases, extract_output = self._releases, self._extract_output_from
+        if (
+            self._calls_with_executors
+            or binder.has_variadics
+            or releases is not None
+            or self.new_scope is not dict
+        ):  # no shortcuts: call the dag on each row
+            return partial(_call_with_kwargs, self)
+        defaults = binder.defaults_for(names)
+        steps = tuple((func_node.call_plan, func_node.out) for func_node in func_nodes)
+
+        def call_row(row):
+            scope = {**defaults, **row}
+            for call_plan, out in steps:
+                scope[out] = call_plan(scope)
+            return extract_output(scope)
+
+        return call_row
+
     def _preprocess_scope(self, scope):
         """Take care of the stuff that needs to be taking care of before looping
         though the func_nodes and calling them on scope. Namely:
@@ -611,17 +1693,88 @@ class DAG:
         return scope
 
     def _call_func_nodes_on_scope_gen(self, scope):
-        """Loop over ``func_nodes`` yielding ``func_node.call_on_scope(scope)``."""
-        for func_node in self.func_nodes:
-            yield func_node.call_on_scope(scope)
+        """Loop over ``func_nodes`` yielding ``func_node.call_on_scope(scope)``.
+
+        If ``free_intermediates`` is True, the intermediates that aren't needed
+        anymore are deleted from the scope after each call.
+        """
+        if self._releases is None:
+            for func_node in self.func_nodes:
+                yield func_node.call_on_scope(scope)
+        else:
+            yield from _call_func_nodes_releasing(
+                self.func_nodes, self._releases, scope
+            )
 
     def _call_func_nodes_on_scope(self, scope):
         """
         Loop over ``func_nodes`` calling func_node.call_on_scope on scope.
         (Really, just "consumes" the generator output by _call_func_nodes_on_scope_gen)
+
+        If an ``executor`` was specified (for the DAG, or some of its func nodes),
+        the func nodes are submitted to executors instead, each as soon as the func
+        nodes it depends on are done (see ``meshed.executors``).
         """
-        for _ in self._call_func_nodes_on_scope_gen(scope):
-            pass
+        if self._calls_with_executors:
+            call_func_nodes_with_executor(
+                self.func_nodes,
+                scope,
+                self._get_submitter(),
+                self._func_node_dependencies,
+                self._releases,
+            )
+        else:
+            for _ in self._call_func_nodes_on_scope_gen(scope):
+                pass
+
+    def __getstate__(self):
+        # The executors of the submitter can't be pickled (nor should they be shared)
+        state = self.__dict__.copy()
+        state['_submitter'] = None
+        return state
+
+    @property
+    def _calls_with_executors(self):
+        """Whether func nodes are submitted to executors. (Not computed once and for
+        all, since the ``executor`` of the dag can be changed after it's made.)"""
+        return self.executor is not None or self._func_nodes_have_executors
+
+    def _get_submitter(self):
+        """The (lazily made, then reused) func node submitter. A new one is made if
+        the ``executor`` or ``max_workers`` of the dag changed."""
+        submitter = self._submitter
+        if (
+            submitter is None
+            or submitter.dflt_executor != (self.executor or 'inline')
+            or submitter.max_workers != self.max_workers
+        ):
+            validate_executor_spec(self.executor)
+            if submitter is not None:
+                submitter.close()
+            submitter = self._submitter = FuncNodeSubmitter(
+                self.executor, self.max_workers
+            )
+        return submitter
+
+    def close(self):
+        """Shut down the thread and process pools the dag made to compute its func
+        nodes (if any). They'll be remade if the dag is called again.
+        (They're also shut down when the dag is garbage collected.)
+
+        >>> dag = DAG([lambda a: a + 1], executor='threads')
+        >>> dag(1)
+        2
+        >>> dag.close()
+        >>> dag(2)
+        3
+        """
+        if self._submitter is not None:
+            self._submitter.close()
+            self._submitter = None
+
+    @cached_property
+    def _func_node_dependencies(self):
+        return func_node_dependencies(self.func_nodes)
 
     def call_on_scope(self, scope=None):
         """Calls the func_nodes using scope (a dict or MutableMapping) both to
@@ -761,16 +1914,91 @@ class DAG:
         i -> k_ -> k
         i,j -> l_ -> l
 
-        >>>
+        Sub-dags are cached (a bounded number of them), so getting the same one again
+        (even if specified differently) is cheap. What's returned is a copy of the
+        cached sub-dag though, so changing it (its name, executor, signature...)
+        doesn't change the sub-dags that are returned next:
+
+        >>> dag['u':'h'].func_nodes == dag[['u']:['h']].func_nodes
+        True
+        >>> dag['u':'h'] is dag['u':'h']
+        False
 
         """
         return self._getitem(item)
 
+    _max_cached_sub_dags = 128
+
     def _getitem(self, item):
+        sub_dag = None
+        key = None
+        if isinstance(item, slice):
+            try:  # fast path: the item spec was seen already (if hashable)
+                key = (item.start, item.stop)
+                sub_dag = self._cached_sub_dag(key)
+            except TypeError:
+                key = None
+        if sub_dag is None:
+            ins, outs = self.process_item(item)
+            normalized_key = (frozenset(ins), frozenset(outs))
+            sub_dag = self._cached_sub_dag(normalized_key)
+            if sub_dag is None:
+                sub_dag = self._sub_dag(self._ordered_subgraph_nodes(item))
+                self._cache_sub_dag(normalized_key, sub_dag)
+            if key is not None:
+                self._cache_sub_dag(key, sub_dag)
+        return sub_dag._copy()
+
+    # The (cached_property) caches whose contents refer to the dag they're in
+    _per_instance_caches = ('_plans', '_update_plans', '_sub_dags')
+
+    def _copy(self) -> 'DAG':
+        """A shallow copy of the dag: Its analysis (graph, signature, func nodes...)
+        is shared, but not its state (``last_scope``, executors, cached plans...)"""
+        dag = shallow_copy(self)  # (without the submitter: see __getstate__)
+        for name in self._per_instance_caches:
+            dag.__dict__.pop(name, None)
+        dag.last_scope = None
+        return dag
+
+    def _sub_dag_config(self):
+        return (
+            self.func_nodes,
+            self.cache_last_scope,
+            self.parameter_merge,
+            self.executor,
+            self.max_workers,
+            self.free_intermediates,
+        )
+
+    def _cached_sub_dag(self, key):
+        config, sub_dag = self._sub_dags.get(key, (None, None))
+        if config is None or any(
+            x is not y for x, y in zip(config, self._sub_dag_config())
+        ):
+            return None  # not cached, or the dag was changed since
+        return sub_dag
+
+    def _cache_sub_dag(self, key, sub_dag):
+        if len(self._sub_dags) >= self._max_cached_sub_dags:
+            del self._sub_dags[next(iter(self._sub_dags))]  # (the oldest)
+        self._sub_dags[key] = (self._sub_dag_config(), sub_dag)
+
+    @cached_property
+    def _sub_dags(self):
+        return {}
+
+    def _sub_dag(self, func_nodes: Iterable[FuncNode]) -> 'DAG':
+        """A dag made of some of the func nodes of this dag. Since these are already
+        validated and cleaned, they aren't again."""
         return DAG(
-            func_nodes=self._ordered_subgraph_nodes(item),
+            func_nodes=_ValidatedFuncNodes(func_nodes),
             cache_last_scope=self.cache_last_scope,
             parameter_merge=self.parameter_merge,
+            executor=self.executor,
+            max_workers=self.max_workers,
+            free_intermediates=self.free_intermediates,
+            cse=self.cse,
         )
 
     def _ordered_subgraph_nodes(self, item):
@@ -784,10 +2012,10 @@ class DAG:
     def _subgraph_nodes(self, item):
         ins, outs = self.process_item(item)
         _descendants = set(
-            filter(FuncNode.has_as_instance, set(ins) | descendants(self.graph, ins))
+            filter(FuncNode.has_as_instance, set(ins) | self.graph.descendants(ins))
         )
         _ancestors = set(
-            filter(FuncNode.has_as_instance, set(outs) | ancestors(self.graph, outs))
+            filter(FuncNode.has_as_instance, set(outs) | self.graph.ancestors(outs))
         )
         subgraph_nodes = _descendants.intersection(_ancestors)
         return subgraph_nodes
@@ -799,6 +2027,7 @@ class DAG:
         *positional_dflts,
         _remove_bound_arguments=False,
         _consider_defaulted_arguments_as_bound=False,
+        _fold_constants=False,
         **keyword_dflts,
     ):
         """Get a curried version of the DAG.
@@ -813,6 +2042,11 @@ class DAG:
         :param _consider_defaulted_arguments_as_bound: False -- set to True if
             you want to also consider arguments that already had defaults as bound
             (and be removed).
+        :param _fold_constants: False -- set to True to compute, once and for all,
+            the func nodes that only depend on bound arguments (or on nothing), and
+            remove them: The (bound) arguments and outputs of these are then
+            constants of the new dag, so are not in its signature (see
+            ``fold_constants``). The funcs of the folded func nodes must be pure.
         :return:
 
         >>> def f(a, b):
@@ -837,6 +2071,19 @@ class DAG:
         '(a, b, c=3, d=4)'
         >>> new_dag(1, 2)  # same as dag(c=3, a=1, b=2, d=4), so:
         9
+
+        With ``_fold_constants=True``, ``g`` (which then only depends on bound
+        arguments) is computed once, here, instead of at every call of the new dag:
+
+        >>> folded_dag = dag.partial(c=3, d=4, _fold_constants=True)
+        >>> folded_dag
+        DAG(func_nodes=[FuncNode(a,b -> f_ -> f), FuncNode(f -> h_ -> h)], name=None)
+        >>> str(signature(folded_dag))
+        '(a, b)'
+        >>> folded_dag.roots
+        ('a', 'b')
+        >>> folded_dag(1, 2)
+        9
         """
 
         keyword_dflts = self.__signature__.kwargs_from_args_and_kwargs(
@@ -853,6 +2100,13 @@ class DAG:
         )
         # TODO: mk_instance: What about other init args (cache_last_scope, ...)?
         mk_instance = type(self)
+        if _fold_constants:
+            # (the func nodes that are left don't refer to the constants, so these
+            # are not roots, nor in the signature, of new_dag)
+            func_nodes, _ = fold_constants(
+                self.func_nodes, keyword_dflts, outputs=self.leafs
+            )
+            return mk_instance(func_nodes)
         func_nodes = partialized_funcnodes(self, **keyword_dflts)
         new_dag = mk_instance(func_nodes)
         if _remove_bound_arguments:
@@ -1241,6 +2495,10 @@ class DAG:
 
         return other
 
+    def _cse_for_addition(self, other) -> bool:
+        # (the union is made with cse if any of the added dags was)
+        return self.cse or getattr(other, 'cse', False)
+
     def __radd__(self, other):
         """A union of DAGs. See ``__add__`` for more details.
 
@@ -1256,7 +2514,10 @@ class DAG:
         # we would like to control some orders of things via the order of addition
         # (thinkg list addition versus set addition for example), so instead we write
         # the explicit code:
-        return DAG(self._prepare_other_for_addition(other) + list(self.func_nodes))
+        return DAG(
+            self._prepare_other_for_addition(other) + list(self.func_nodes),
+            cse=self._cse_for_addition(other),
+        )
 
     def __add__(self, other):
         """A union of DAGs.
@@ -1269,8 +2530,24 @@ class DAG:
         iterable -> tuple_ -> tuple
         >>> dag([1,2,3])
         ([1, 2, 3], (1, 2, 3))
+
+        If any of the dags has ``cse=True``, func nodes that compute the same thing
+        (see ``eliminate_common_subexpressions``) are merged:
+
+        >>> def normalize(x): return x / 10
+        >>> def f(norm): return norm + 1
+        >>> def g(normalized): return normalized * 2
+        >>> dag1 = DAG([FuncNode(normalize, out='norm'), f], cse=True)
+        >>> dag2 = DAG([FuncNode(normalize, out='normalized'), g])
+        >>> print((dag1 + dag2).synopsis_string())
+        x -> normalize -> norm
+        norm -> f_ -> f
+        norm -> g_ -> g
         """
-        return DAG(list(self.func_nodes) + self._prepare_other_for_addition(other))
+        return DAG(
+            list(self.func_nodes) + self._prepare_other_for_addition(other),
+            cse=self._cse_for_addition(other),
+        )
 
     def copy(self, renamer=numbered_suffix_renamer):
         return DAG(ch_names(self.func_nodes, renamer=renamer))
@@ -1578,7 +2855,7 @@ def param_to_dot_definition(p: Parameter, shape=dflt_configs['vnode_shape']):
 
 def call_func(func, kwargs):
     kwargs = {k.__name__: v for k, v in kwargs.items()}
-    return Sig(func).source_kwargs(kwargs)
+    return signature_of(func).source_kwargs(kwargs)
 
 
 def dot_lines_of_func_parameters(
@@ -0,0 +1,679 @@
+"""Executing the func nodes of a DAG concurrently.
+
+The default way a ``DAG`` computes is to call its func nodes one after another, in
+topological order. When branches of the DAG are independent though (the ``this``
+and ``that`` of the ``meshed.dag`` docs for example), they don't need to wait for
+each other. The tools here schedule each func node as soon as all the func nodes it
+depends on have computed, submitting it to a ``concurrent.futures.Executor``.
+
+>>> from meshed import DAG
+>>> def this(a, b=1):
+...     return a + b
+>>> def that(x, b=1):
+...     return x * b
+>>> def combine(this, that):
+...     return (this, that)
+>>> dag = DAG((this, that, combine), executor='threads', max_workers=2)
+>>> dag(1, 2, 3)
+(4, 6)
+
+Only the main thread reads from, or writes to, the scope: Workers are given the
+inputs their func node needs (see ``inputs_from_scope``), and their outputs are
+written in the scope when they're collected.
+
+Individual func nodes can also be marked to run in a given executor, through their
+``executor`` attribute. Func nodes that aren't marked run with the executor of the
+``DAG``, or inline (in the main thread) if the ``DAG`` doesn't have one.
+For instance, CPU-bound functions can be sent to a process pool:
+
+>>> from operator import add, mul
+>>> from meshed import FuncNode
+>>> dag = DAG([
+...     FuncNode(add, out='this', executor='processes'),
+...     FuncNode(mul, out='that', bind={'a': 'x'}, executor='processes'),
+...     combine,
+... ])
+>>> dag(1, 2, 3)
+(3, 6)
+
+Only the inputs a func node needs are sent to the worker process, and its output
+is written back in the scope of the main process. Functions are pickled by
+reference, so should be importable (defined at the top level of a module). Functions
+that the standard pickler can't handle (lambdas, local functions...) are serialized
+with ``cloudpickle`` (or ``dill``) instead, if installed (``pip install
+meshed[processes]`` installs ``cloudpickle``).
+
+DAGs whose func nodes include coroutine functions can be awaited with
+``DAG.acall``: Independent coroutines run concurrently (as ``asyncio`` tasks), and
+plain functions run inline, or in their executor if they have one.
+
+>>> import asyncio
+>>> async def this(a, b=1):
+...     await asyncio.sleep(0.01)
+...     return a + b
+>>> async def that(x, b=1):
+...     await asyncio.sleep(0.01)
+...     return x * b
+>>> dag = DAG((this, that, combine))
+>>> asyncio.run(dag.acall(1, 2, 3))
+(4, 6)
+
+Finally, ``DAG.stream`` computes a stream of inputs through a pipeline of stages
+(see ``stream_func_nodes``), each stage running in its own thread, so that a slow
+stage doesn't keep the others idle.
+
+"""
+
+import pickle
+import sys
+import threading
+import weakref
+from queue import Queue, Empty, Full
+from inspect import isawaitable
+from concurrent.futures import (
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+    FIRST_COMPLETED,
+)
+from functools import lru_cache
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from meshed.base import FuncNode
+from meshed.profiling import ProfiledCallPlan
+
+Dependencies = Tuple[Tuple[int, ...], Tuple[Tuple[int, ...], ...]]
+ExecutorSpec = Union[str, Executor, None]
+Submit = Callable[[FuncNode, dict], Future]
+Releases = Tuple[Tuple[str, ...], ...]
+
+
+class InlineExecutor(Executor):
+    """An executor that calls the functions it's submitted right away, in the
+    calling thread, returning an already completed future.
+
+    >>> future = InlineExecutor().submit(sum, [1, 2, 3])
+    >>> future.done(), future.result()
+    (True, 6)
+    """
+
+    def __init__(self, max_workers=None):
+        pass
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+def _process_pool_executor(max_workers=None) -> Executor:
+    # (imported here since importing multiprocessing is slow, and seldom needed)
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def is_process_pool(executor) -> bool:
+    """Whether ``executor`` is a ``ProcessPoolExecutor``, without importing
+    ``concurrent.futures.process`` (if it's not imported, it can't be one).
+
+    >>> is_process_pool(ThreadPoolExecutor())
+    False
+    """
+    process = sys.modules.get('concurrent.futures.process', None)
+    return process is not None and isinstance(executor, process.ProcessPoolExecutor)
+
+
+# The executor factories that can be referenced by name (as DAG(..., executor=name))
+executor_factories = {
+    'inline': InlineExecutor,
+    'threads': ThreadPoolExecutor,
+    'processes': _process_pool_executor,
+}
+
+
+def mk_executor(executor: ExecutorSpec, max_workers=None) -> Executor:
+    """Resolve an executor specification into an ``Executor`` instance.
+
+    >>> isinstance(mk_executor('threads', max_workers=2), ThreadPoolExecutor)
+    True
+    >>> mk_executor('carrier_pigeons')
+    Traceback (most recent call last):
+      ...
+    ValueError: Unknown executor: 'carrier_pigeons'. Should be an Executor instance or one of: inline, threads, processes
+    """
+    validate_executor_spec(executor)
+    if isinstance(executor, Executor):
+        return executor
+    return executor_factories[executor](max_workers=max_workers)
+
+
+def validate_executor_spec(executor: ExecutorSpec):
+    """Raise a ``ValueError`` if ``executor`` is not a valid executor specification,
+    that is, ``None``, an ``Executor`` instance, or a key of ``executor_factories``.
+    """
+    if not (
+        executor is None
+        or isinstance(executor, Executor)
+        or executor in executor_factories
+    ):
+        raise ValueError(
+            f'Unknown executor: {executor!r}. Should be an Executor instance or one '
+            f"of: {', '.join(executor_factories)}"
+        )
+
+
+def func_node_dependencies(func_nodes: Sequence[FuncNode]) -> Dependencies:
+    """The ``(in_degrees, children)`` pair describing how ``func_nodes`` (indices)
+    depend on each other.
+
+    ``in_degrees[i]`` is the number of func nodes whose output ``func_nodes[i]``
+    needs, and ``children[i]`` are the (indices of the) func nodes that need the
+    output of ``func_nodes[i]``.
+
+    >>> def f(a): ...
+    >>> def g(f): ...
+    >>> def h(a, f, g): ...
+    >>> func_nodes = list(map(FuncNode, [f, g, h]))
+    >>> func_node_dependencies(func_nodes)
+    ((0, 1, 2), ((1, 2), (2,), ()))
+    """
+    index_of_out = {fn.out: i for i, fn in enumerate(func_nodes)}
+    parents = [
+        {index_of_out[src] for src in fn.bind.values() if src in index_of_out}
+        for fn in func_nodes
+    ]
+    children = [[] for _ in func_nodes]
+    for i, parents_of_i in enumerate(parents):
+        for parent in sorted(parents_of_i):
+            children[parent].append(i)
+    return tuple(map(len, parents)), tuple(map(tuple, children))
+
+
+def func_node_releases(
+    func_nodes: Sequence[FuncNode], keep: Iterable[str] = ()
+) -> Releases:
+    """The var nodes that can be released (deleted from the scope) after each func
+    node is called, since no func node after it will read them.
+
+    Only the outputs of ``func_nodes`` (the intermediates) that are not in ``keep``
+    are ever released: The arguments given to the DAG are not the DAG's to release.
+
+    >>> def f(a): ...
+    >>> def g(f): ...
+    >>> def h(a, f, g): ...
+    >>> def i(h): ...
+    >>> func_nodes = list(map(FuncNode, [f, g, h, i]))
+    >>> func_node_releases(func_nodes, keep=['i'])
+    ((), (), ('f', 'g'), ('h',))
+
+    Here, ``f`` and ``g`` are last read by ``h``, and ``h`` by ``i``.
+    """
+    keep = set(keep)
+    release_index = {fn.out: i for i, fn in enumerate(func_nodes) if fn.out not in keep}
+    for i, func_node in enumerate(func_nodes):
+        for src in func_node.bind.values():
+            if src in release_index:
+                release_index[src] = i
+    releases = [[] for _ in func_nodes]
+    for name, i in release_index.items():
+        releases[i].append(name)
+    return tuple(map(tuple, releases))
+
+
+class _ScopeReleaser:
+    """Releases var nodes from the scope when all their readers have read them.
+    Used by the executors, where func nodes don't complete in topological order.
+    """
+
+    def __init__(self, func_nodes: Sequence[FuncNode], releases: Releases, scope):
+        self.scope = scope
+        self.n_readers = dict.fromkeys(set().union(*releases), 0)
+        for func_node in func_nodes:
+            for src in set(func_node.bind.values()):
+                if src in self.n_readers:
+                    self.n_readers[src] += 1
+
+    def inputs_were_read(self, func_node: FuncNode):
+        for src in set(func_node.bind.values()):
+            if src in self.n_readers:
+                self.n_readers[src] -= 1
+                if self.n_readers[src] == 0:
+                    del self.scope[src]
+
+    def output_was_written(self, func_node: FuncNode):
+        if self.n_readers.get(func_node.out, None) == 0:  # no one will read it
+            del self.scope[func_node.out]
+
+
+def func_node_levels(
+    func_nodes: Sequence[FuncNode], dependencies: Dependencies = None
+) -> Tuple[Tuple[int, ...], ...]:
+    """Group the (indices of the) func nodes by topological level: The func nodes
+    that only depend on the inputs are in the first level, the ones that depend on
+    those are in the second level, etc.
+
+    >>> def f(a): ...
+    >>> def g(a): ...
+    >>> def h(f): ...
+    >>> def i(g, h): ...
+    >>> func_nodes = list(map(FuncNode, [f, g, h, i]))
+    >>> func_node_levels(func_nodes)
+    ((0, 1), (2,), (3,))
+    """
+    if dependencies is None:
+        dependencies = func_node_dependencies(func_nodes)
+    _, children = dependencies
+    level_of = [0] * len(func_nodes)
+    for i, children_of_i in enumerate(children):  # (func nodes in topological order)
+        for child in children_of_i:
+            level_of[child] = max(level_of[child], level_of[i] + 1)
+    levels = [[] for _ in range(max(level_of, default=-1) + 1)]
+    for i, level in enumerate(level_of):
+        levels[level].append(i)
+    return tuple(map(tuple, levels))
+
+
+def inputs_from_scope(func_node: FuncNode, scope: Mapping) -> dict:
+    """The ``{src_name: value, ...}`` subset of ``scope`` that ``func_node`` needs.
+
+    >>> fn = FuncNode(lambda x, y: x + y, bind={'x': 'a'})
+    >>> inputs_from_scope(fn, {'a': 1, 'y': 2, 'z': 3})
+    {'a': 1, 'y': 2}
+    """
+    return {src: scope[src] for src in func_node.bind.values() if src in scope}
+
+
+def call_func_nodes_with_executor(
+    func_nodes: Sequence[FuncNode],
+    scope: MutableMapping,
+    submit: Union[Submit, Executor],
+    dependencies: Dependencies = None,
+    releases: Optional[Releases] = None,
+):
+    """Call ``func_nodes`` on ``scope``, submitting each func node as soon as all
+    the func nodes it depends on are done.
+
+    :param func_nodes: The func nodes to call (in topological order)
+    :param scope: Where the inputs are read from and the outputs written to
+    :param submit: A ``submit(func_node, inputs)`` function that submits the
+        computation of ``func_node`` on ``inputs`` and returns a future
+        (see ``FuncNodeSubmitter``), or an ``Executor`` to submit all calls to.
+    :param dependencies: The ``func_node_dependencies(func_nodes)``, if precomputed
+    :param releases: The ``func_node_releases(func_nodes, keep)``, if the
+        intermediates should be deleted from the scope as soon as they're not needed
+
+    If some func nodes raise an exception, the exception of the first func node (in
+    topological order) that failed is raised, as it would be if the func nodes were
+    called one after the other: The func nodes that come before the first failure so
+    far are still submitted (they could fail first), those that come after it are
+    not (and are cancelled, if they didn't start yet), and those already running are
+    waited for.
+
+    >>> def f(a): return a + 1
+    >>> def g(a): return a * 10
+    >>> def h(f, g): return f + g
+    >>> func_nodes = list(map(FuncNode, [f, g, h]))
+    >>> scope = {'a': 2}
+    >>> with ThreadPoolExecutor() as executor:
+    ...     call_func_nodes_with_executor(func_nodes, scope, executor)
+    >>> scope['h']
+    23
+    """
+    if dependencies is None:
+        dependencies = func_node_dependencies(func_nodes)
+    if isinstance(submit, Executor):
+        submit = FuncNodeSubmitter(submit)
+    in_degrees, children = dependencies
+    n_missing_inputs = list(in_degrees)
+    pending = {}  # future -> index of func node
+    errors = {}  # index of func node -> exception
+    releaser = releases and _ScopeReleaser(func_nodes, releases, scope)
+
+    def _submit(i):
+        func_node = func_nodes[i]
+        future = submit(func_node, inputs_from_scope(func_node, scope))
+        if releaser:
+            releaser.inputs_were_read(func_node)
+        pending[future] = i
+
+    for i, in_degree in enumerate(in_degrees):
+        if in_degree == 0:
+            _submit(i)
+
+    first_error = len(func_nodes)  # (index of the first func node that failed)
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = pending.pop(future, None)
+            if i is None:  # (cancelled)
+                continue
+            try:
+                output = future.result()
+            except Exception as error:
+                errors[i] = error
+                first_error = min(first_error, i)
+                for other, j in list(pending.items()):
+                    if j > first_error and other.cancel():
+                        del pending[other]
+                continue
+            scope[func_nodes[i].out] = output
+            if releaser:
+                releaser.output_was_written(func_nodes[i])
+            for child in children[i]:
+                n_missing_inputs[child] -= 1
+                if n_missing_inputs[child] == 0 and child < first_error:
+                    _submit(child)
+
+    if errors:
+        raise errors[first_error]
+
+
+async def acall_func_nodes_with_executor(
+    func_nodes: Sequence[FuncNode],
+    scope: MutableMapping,
+    submit: 'FuncNodeSubmitter',
+    dependencies: Dependencies = None,
+    releases: Optional[Releases] = None,
+):
+    """The ``asyncio`` version of ``call_func_nodes_with_executor``.
+
+    Func nodes are started as soon as all the func nodes they depend on are done.
+    Func nodes whose executor is inline are called in the event loop's thread:
+    If they return an awaitable (e.g. they wrap a coroutine function), it's run as a
+    task, concurrently with the other tasks. Other func nodes are submitted to their
+    executor (see ``FuncNodeSubmitter``) and their future is awaited.
+
+    >>> import asyncio
+    >>> async def f(a):
+    ...     await asyncio.sleep(0.01)
+    ...     return a + 1
+    >>> def g(a): return a * 10
+    >>> def h(f, g): return f + g
+    >>> func_nodes = list(map(FuncNode, [f, g, h]))
+    >>> scope = {'a': 2}
+    >>> asyncio.run(
+    ...     acall_func_nodes_with_executor(func_nodes, scope, FuncNodeSubmitter())
+    ... )
+    >>> scope['h']
+    23
+    """
+    import asyncio  # (imported here since it's slow to import, and seldom needed)
+
+    if dependencies is None:
+        dependencies = func_node_dependencies(func_nodes)
+    in_degrees, children = dependencies
+    n_missing_inputs = list(in_degrees)
+    ready = [i for i, in_degree in enumerate(in_degrees) if in_degree == 0]
+    pending = {}  # task or future -> index of func node
+    errors = {}  # index of func node -> exception
+    releaser = releases and _ScopeReleaser(func_nodes, releases, scope)
+
+    def _complete(i, output):
+        if isawaitable(output):  # not done yet: wait for it as a task
+            pending[asyncio.ensure_future(output)] = i
+            return
+        scope[func_nodes[i].out] = output
+        if releaser:
+            releaser.output_was_written(func_nodes[i])
+        for child in children[i]:
+            n_missing_inputs[child] -= 1
+            if n_missing_inputs[child] == 0:
+                ready.append(child)
+
+    def _first_error():
+        return min(errors, default=len(func_nodes))
+
+    while ready or pending:
+        # (as with call_func_nodes_with_executor, only the func nodes that come
+        # before the first failure are started, so that it's the same failure)
+        ready = [i for i in ready if i < _first_error()]
+        while ready:
+            i = ready.pop(0)
+            if i > _first_error():
+                continue
+            func_node = func_nodes[i]
+            inputs = inputs_from_scope(func_node, scope)
+            if releaser:
+                releaser.inputs_were_read(func_node)
+            if isinstance(submit.executor_for(func_node), InlineExecutor):
+                try:
+                    output = func_node.call_plan(inputs)
+                except Exception as error:
+                    errors[i] = error
+                    continue
+                _complete(i, output)
+            else:
+                pending[asyncio.wrap_future(submit(func_node, inputs))] = i
+        if not pending:
+            break
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            i = pending.pop(task)
+            try:
+                output = task.result()
+            except Exception as error:
+                errors[i] = error
+                continue
+            _complete(i, output)
+
+    if errors:
+        raise errors[_first_error()]
+
+
+class _Failure:
+    """What goes down a stream pipeline instead of a scope whose computation failed"""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+_end_of_stream = object()
+
+
+def stream_func_nodes(
+    stages: Sequence[Sequence[FuncNode]],
+    scopes: Iterable[MutableMapping],
+    maxsize: int = 2,
+) -> Iterator[MutableMapping]:
+    """Call func nodes on a stream of scopes, as a pipeline: Each stage (a sequence
+    of func nodes, in topological order) runs in its own thread, and hands its scopes
+    over to the next through a queue (holding at most ``maxsize`` scopes). So while a
+    stage works on a scope, the previous stage can work on the next one.
+
+    The ``scopes`` are also iterated over in their own thread, and the computed scopes
+    are yielded in the same order. If the computation of a scope fails, the error is
+    raised when that scope would have been yielded.
+
+    >>> def f(a): return a + 1
+    >>> def g(f): return f * 10
+    >>> stages = [[FuncNode(f)], [FuncNode(g)]]
+    >>> scopes = ({'a': a} for a in range(4))
+    >>> [scope['g'] for scope in stream_func_nodes(stages, scopes)]
+    [10, 20, 30, 40]
+    """
+    stop = threading.Event()  # set when the consumer stops consuming
+    queues = [Queue(maxsize) for _ in range(len(stages) + 1)]
+
+    def put(queue, item):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def get(queue):
+        while not stop.is_set():
+            try:
+                return queue.get(timeout=0.1)
+            except Empty:
+                pass
+        return _end_of_stream
+
+    def feed(outbox):
+        try:
+            for scope in scopes:
+                if not put(outbox, scope):
+                    return
+        except Exception as error:
+            put(outbox, _Failure(error))
+        put(outbox, _end_of_stream)
+
+    def run_stage(func_nodes, inbox, outbox):
+        while (item := get(inbox)) is not _end_of_stream:
+            if not isinstance(item, _Failure):
+                try:
+                    for func_node in func_nodes:
+                        func_node.call_on_scope(item)
+                except Exception as error:
+                    item = _Failure(error)
+            if not put(outbox, item):
+                return
+        put(outbox, _end_of_stream)
+
+    threads = [threading.Thread(target=feed, args=(queues[0],), daemon=True)]
+    for stage, inbox, outbox in zip(stages, queues, queues[1:]):
+        threads.append(
+            threading.Thread(target=run_stage, args=(stage, inbox, outbox), daemon=True)
+        )
+    for thread in threads:
+        thread.start()
+    try:
+        while (item := queues[-1].get()) is not _end_of_stream:
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+class FuncNodeSubmitter:
+    """Submits func node computations to the executor they should run in.
+
+    The executor of a func node is given by its ``executor`` attribute, or
+    ``dflt_executor`` if the func node doesn't specify any. Executors specified by
+    name are made (with ``max_workers``) the first time they're needed, then reused.
+
+    When the executor is a process pool, the ``call_plan`` of the func node is
+    serialized once (see ``dumps_callable``), and only the serialized plan and the
+    inputs are sent to the worker.
+
+    The executors the submitter made (those specified by name) are shut down by
+    ``close`` (or when exiting a ``with`` block, or when the submitter is garbage
+    collected). Executors given as instances are left alone: They're not the
+    submitter's to shut down.
+
+    >>> def f(a): return a + 1
+    >>> with FuncNodeSubmitter('threads') as submit:
+    ...     submit(FuncNode(f), {'a': 1}).result()
+    2
+    >>> submit(FuncNode(f), {'a': 1})
+    Traceback (most recent call last):
+      ...
+    RuntimeError: cannot schedule new futures after shutdown
+    """
+
+    def __init__(self, dflt_executor: ExecutorSpec = None, max_workers=None):
+        self.dflt_executor = dflt_executor or 'inline'
+        self.max_workers = max_workers
+        self._executors = {}
+        self._pickled_call_plans = {}
+        # (doesn't refer to self, so that the submitter can be garbage collected)
+        self._finalizer = weakref.finalize(
+            self, _shutdown_made_executors, self._executors
+        )
+
+    def close(self):
+        """Shut down the executors the submitter made (waiting for their work)"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def executor_for(self, func_node: FuncNode) -> Executor:
+        spec = getattr(func_node, 'executor', None) or self.dflt_executor
+        executor = self._executors.get(spec, None)
+        if executor is None:
+            executor = self._executors[spec] = mk_executor(spec, self.max_workers)
+        return executor
+
+    def __call__(self, func_node: FuncNode, inputs: dict) -> Future:
+        executor = self.executor_for(func_node)
+        if is_process_pool(executor):
+            call_plan = func_node.call_plan
+            if isinstance(call_plan, ProfiledCallPlan):  # record the call in the worker
+                remote = call_plan.remote()
+                pickled = self._pickled(remote, (remote.call_plan, remote.name))
+                future = executor.submit(_call_pickled, pickled, inputs)
+                return call_plan.collect(future)
+            return executor.submit(_call_pickled, self._pickled(call_plan), inputs)
+        return executor.submit(func_node.call_plan, inputs)
+
+    def _pickled(self, call_plan: Callable, key=None) -> bytes:
+        """The (cached) serialization of ``call_plan``, cached under ``key`` (by
+        default, the call plan itself)"""
+        key = call_plan if key is None else key
+        if key not in self._pickled_call_plans:
+            self._pickled_call_plans[key] = dumps_callable(call_plan)
+        return self._pickled_call_plans[key]
+
+
+def _shutdown_made_executors(executors: Mapping[ExecutorSpec, Executor]):
+    for spec, executor in executors.items():
+        if isinstance(spec, str):  # (made by the submitter, from its name)
+            executor.shutdown(wait=True)
+
+
+def dumps_callable(func: Callable) -> bytes:
+    """Serialize ``func`` with ``pickle``, falling back to ``cloudpickle`` or ``dill``
+    (if installed) for what the standard pickler can't handle (lambdas, local
+    functions, etc.).
+
+    >>> pickle.loads(dumps_callable(sum))([1, 2, 3])
+    6
+    """
+    try:
+        return pickle.dumps(func)
+    except (pickle.PicklingError, AttributeError, TypeError) as error:
+        for module_name in ('cloudpickle', 'dill'):
+            try:
+                module = __import__(module_name)
+            except ImportError:
+                continue
+            return module.dumps(func)
+        raise type(error)(
+            f'{error}\nThe standard pickler failed and neither cloudpickle nor dill '
+            f'are installed. Define the function at the top level of a module, or '
+            f'install cloudpickle (pip install meshed[processes]).'
+        )
+
+
+@lru_cache(maxsize=256)
+def _loads_callable(pickled_func: bytes) -> Callable:
+    return pickle.loads(pickled_func)
+
+
+def _call_pickled(pickled_func: bytes, inputs: dict):
+    """What process workers run: Load (once per worker) and call the function"""
+    return _loads_callable(pickled_func)(inputs)
@@ -330,6 +330,8 @@ class Network(object):
 
         # clear compiled steps
         self.steps = []
+        # index the graph, for the reachability queries of _find_necessary_steps
+        self._indexed_graph = gr.IndexedGraph(self.graph)
 
         # create an execution order such that each layer's needs are provided.
         ordered_nodes = list(gr.topological_sort(self.graph))
@@ -348,7 +350,13 @@ class Network(object):
                 # Add instructions to delete predecessors as possible.  A
                 # predecessor may be deleted if it is a data placeholder that
                 # is no longer needed by future Operations.
-                for predecessor in gr.predecessors(self.graph, node):
+                # (in the order of the graph, not of the set, so that the steps
+                # don't depend on the hash seed)
+                predecessors = sorted(
+                    self._indexed_graph.ancestors([node]),
+                    key=self._indexed_graph.index.__getitem__,
+                )
+                for predecessor in predecessors:
                     if self._debug:
                         print('checking if node %s can be deleted' % predecessor)
                     predecessor_still_needed = False
@@ -395,7 +403,7 @@ class Network(object):
         if cache_key in self._necessary_steps_cache:
             return self._necessary_steps_cache[cache_key]
 
-        graph = self.graph
+        graph = self._indexed_graph
         if not outputs:
 
             # If caller requested all outputs, the necessary nodes are all
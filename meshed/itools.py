@@ -20,6 +20,8 @@ from operator import or_
 
 from i2.signatures import Sig
 
+from meshed.util import CycleError
+
 
 def random_graph(n_nodes=7):
     """Get a random graph.
@@ -271,6 +273,8 @@ def ancestors(g: Mapping, source: Iterable, _exclude_nodes=None):
     >>> ancestors(g, [0])
     set()
     """
+    if isinstance(g, IndexedGraph) and not _exclude_nodes:
+        return g.ancestors(source)
     source = _split_if_str(source)
     assert isinstance(source, Iterable)
     source = set(source) - _exclude_nodes
@@ -297,6 +301,8 @@ def descendants(g: Mapping, source: Iterable, _exclude_nodes=None):
     >>> descendants(g, [4])
     set()
     """
+    if isinstance(g, IndexedGraph) and not _exclude_nodes:
+        return g.descendants(source)
     return ancestors(edge_reversed_graph(g), source, _exclude_nodes)
 
 
@@ -319,6 +325,8 @@ def root_ancestors(graph: dict, nodes: Union[str, Iterable[str]]):
     """
     Returns the roots of the sub-dag that contribute to compute the given nodes.
     """
+    if isinstance(graph, IndexedGraph):
+        return graph.root_ancestors(nodes)
     if isinstance(nodes, str):
         nodes = nodes.split()
     get_ancestors = partial(ancestors, graph)
@@ -422,18 +430,25 @@ def copy_of_g_with_some_keys_removed(g: Mapping, keys: Iterable):
 
 
 def _topological_sort_helper(g, parent, visited, stack):
-    """A recursive function to service topological_sort"""
-
-    visited.add(parent)  # Mark the current node as visited.
+    """Add ``parent``, and the nodes reachable from it that are not ``visited`` yet,
+    to the front of ``stack``, in topological order (and to ``visited``).
 
-    # Recurse for all the vertices adjacent to this node
-    for child in reversed(g.get(parent, [])):
-        if child not in visited:
-            _topological_sort_helper(g, child, visited, stack)
-
-    # Push current node to stack which stores result
-    stack.insert(0, parent)
-    # print(f"  Inserted {parent}: {stack=}")
+    Note: Doesn't check for cycles (``topological_sort`` does).
+    """
+    order = []  # post-order
+    visited.add(parent)
+    path = [(parent, iter(reversed(g.get(parent, ()))))]
+    while path:
+        node, children = path[-1]
+        for child in children:
+            if child not in visited:
+                visited.add(child)
+                path.append((child, iter(reversed(g.get(child, ())))))
+                break
+        else:
+            path.pop()
+            order.append(node)
+    stack[:0] = reversed(order)
 
 
 def topological_sort(g: Mapping):
@@ -469,18 +484,43 @@ def topological_sort(g: Mapping):
     └───┘                 │
       │                   │
       └───────────────────┘
-    """
-    visited = set()
-    stack = []
 
-    # Call the recursive helper function to accumulate topological sorts
-    # starting from all vertices one by one
-    for parent in reversed(g):
-        if parent not in visited:
-            # print(f"Processing {parent}")
-            _topological_sort_helper(g, parent, visited, stack)
+    The order is the reverse of the post-order of a depth-first traversal that
+    visits the nodes (and their adjacencies) in reverse order. It's computed
+    iteratively, in ``O(V + E)`` time, so deep graphs don't hit the recursion limit.
+
+    If the graph has a cycle, a ``CycleError`` naming it is raised:
 
-    return stack
+    >>> topological_sort({'a': ['b'], 'b': ['c'], 'c': ['a']})
+    Traceback (most recent call last):
+      ...
+    meshed.util.CycleError: The graph has a cycle: c -> a -> b -> c
+    """
+    order = []  # post-order (reversed at the end)
+    done = set()
+    for root in reversed(g):
+        if root in done:
+            continue
+        # the current dfs path, as (node, iterator of its yet unvisited adjacencies)
+        path = [(root, iter(reversed(g.get(root, ()))))]
+        on_path = {root}
+        while path:
+            node, children = path[-1]
+            for child in children:
+                if child in on_path:
+                    cycle = [n for n, _ in path]
+                    raise CycleError(cycle[cycle.index(child) :])
+                if child not in done:
+                    path.append((child, iter(reversed(g.get(child, ())))))
+                    on_path.add(child)
+                    break
+            else:  # all adjacencies of node are done, so it is too
+                path.pop()
+                on_path.discard(node)
+                done.add(node)
+                order.append(node)
+    order.reverse()
+    return order
 
 
 from typing import TypeVar
@@ -516,6 +556,204 @@ def edge_reversed_graph(
     return d
 
 
+class IndexedGraph(Mapping):
+    """An immutable graph (adjacency ``Mapping``), indexed for fast queries.
+
+    The forward and reverse adjacencies are indexed once (with nodes as integers),
+    and the reachability (``ancestors``, ``descendants``...) is computed as bitsets
+    (ints), that are memoized. For graphs of up to ``closure_max_size`` nodes that
+    are acyclic, the whole transitive closure is computed (once, at the first query),
+    so a query is only a few bitwise ``or``.
+
+    It's a ``Mapping``, so can be used wherever the ``{src: dsts, ...}`` adjacency
+    mapping it was made from can (the functions of this module, for instance).
+
+    >>> g = {
+    ...     0: [1, 2],
+    ...     1: [2, 3, 4],
+    ...     2: [4],
+    ...     3: [4]
+    ... }
+    >>> ig = IndexedGraph(g)
+    >>> ig == g
+    True
+    >>> ig[1]  # (it can't be changed)
+    (2, 3, 4)
+    >>> ig.ancestors([2, 3])
+    {0, 1}
+    >>> ig.descendants([2, 3])
+    {4}
+    >>> ig.parents([2, 3]), ig.children([2, 3])
+    ({0, 1}, {4})
+    >>> ig.root_nodes(), ig.leaf_nodes()
+    ({0}, {4})
+    >>> ig.root_ancestors([3])
+    {0}
+
+    The functions ``ancestors`` and ``descendants`` of this module use the index when
+    given an ``IndexedGraph``:
+
+    >>> ancestors(ig, [4]) == ig.ancestors([4]) == {0, 1, 2, 3}
+    True
+    """
+
+    closure_max_size = 2000
+    _max_memoized_queries = 1024
+
+    def __init__(self, g: Mapping):
+        self._g = {src: tuple(dsts) for src, dsts in g.items()}
+        self.nodes = tuple(nodes(self._g))
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        children = [[] for _ in self.nodes]
+        parents = [[] for _ in self.nodes]
+        for src, dsts in self._g.items():
+            i = self.index[src]
+            for dst in dsts:
+                j = self.index[dst]
+                children[i].append(j)
+                parents[j].append(i)
+        self._children = tuple(map(tuple, children))
+        self._parents = tuple(map(tuple, parents))
+        # {adjacency: closure} (None for no closure: too big, or cyclic)
+        self._closures = {}
+        # {(adjacency, frozenset of node indices): reachability bitset}
+        self._reachability = {}
+
+    def __getitem__(self, node):
+        return self._g[node]  # (a tuple: the graph can't be changed through it)
+
+    def __eq__(self, other):
+        # (the dsts of other may be lists, sets...: compare them as tuples)
+        if isinstance(other, Mapping):
+            return self._g == {src: tuple(dsts) for src, dsts in other.items()}
+        return NotImplemented
+
+    __hash__ = None
+
+    def __iter__(self):
+        return iter(self._g)
+
+    def __reversed__(self):
+        return reversed(self._g)
+
+    def __len__(self):
+        return len(self._g)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._g})'
+
+    def _indices(self, source) -> frozenset:
+        # (nodes that are not in the graph are ignored)
+        index = self.index
+        return frozenset(index[x] for x in _split_if_str(source) if x in index)
+
+    def _nodes_of(self, bits: int) -> set:
+        nodes_ = self.nodes
+        return {nodes_[i] for i, bit in enumerate(reversed(bin(bits))) if bit == '1'}
+
+    def _closure(self, adjacency):
+        """The ``[bits of nodes reachable from node i, ...]`` or ``None`` if the
+        graph is too big, or is not acyclic"""
+        if adjacency not in self._closures:
+            self._closures[adjacency] = None
+            if len(self.nodes) <= self.closure_max_size:
+                order = _topological_order_of_indices(adjacency)
+                if order is not None:
+                    reach = [0] * len(adjacency)
+                    for i in reversed(order):
+                        bits = 0
+                        for j in adjacency[i]:
+                            bits |= reach[j] | (1 << j)
+                        reach[i] = bits
+                    self._closures[adjacency] = reach
+        return self._closures[adjacency]
+
+    def _reach(self, adjacency, indices: frozenset) -> int:
+        """Bits of the nodes reachable from the ``indices`` nodes (through at least
+        one edge) in ``adjacency``"""
+        key = (adjacency is self._children, indices)
+        bits = self._reachability.get(key, None)
+        if bits is None:
+            closure = self._closure(adjacency)
+            bits = 0
+            if closure is not None:
+                for i in indices:
+                    bits |= closure[i]
+            else:
+                to_visit = [j for i in indices for j in adjacency[i]]
+                while to_visit:
+                    j = to_visit.pop()
+                    if not bits >> j & 1:
+                        bits |= 1 << j
+                        to_visit.extend(adjacency[j])
+            if len(self._reachability) >= self._max_memoized_queries:
+                self._reachability.clear()
+            self._reachability[key] = bits
+        return bits
+
+    def _without(self, bits: int, indices: frozenset) -> int:
+        for i in indices:
+            bits &= ~(1 << i)
+        return bits
+
+    def ancestors(self, source: Iterable) -> set:
+        """Set of all nodes (not in source) reachable TO ``source``"""
+        indices = self._indices(source)
+        return self._nodes_of(self._without(self._reach(self._parents, indices), indices))
+
+    def descendants(self, source: Iterable) -> set:
+        """Set of all nodes (not in source) reachable FROM ``source``"""
+        indices = self._indices(source)
+        return self._nodes_of(
+            self._without(self._reach(self._children, indices), indices)
+        )
+
+    def children(self, source: Iterable) -> set:
+        """Set of all nodes (not in source) adjacent FROM ``source``"""
+        indices = self._indices(source)
+        return {self.nodes[j] for i in indices for j in self._children[i]} - set(
+            map(self.nodes.__getitem__, indices)
+        )
+
+    def parents(self, source: Iterable) -> set:
+        """Set of all nodes (not in source) adjacent TO ``source``"""
+        indices = self._indices(source)
+        return {self.nodes[j] for i in indices for j in self._parents[i]} - set(
+            map(self.nodes.__getitem__, indices)
+        )
+
+    def root_nodes(self) -> set:
+        """The nodes that have no parents"""
+        return {node for node, ps in zip(self.nodes, self._parents) if not ps}
+
+    def leaf_nodes(self) -> set:
+        """The nodes that have no children"""
+        return {node for node, cs in zip(self.nodes, self._children) if not cs}
+
+    def root_ancestors(self, nodes_: Iterable) -> set:
+        """The roots that are ancestors of (some of) the given nodes"""
+        bits = 0
+        for i in self._indices(nodes_):
+            bits |= self._without(self._reach(self._parents, frozenset([i])), {i})
+        return self._nodes_of(bits) & self.root_nodes()
+
+
+def _topological_order_of_indices(adjacency):
+    """Kahn's algorithm on a ``(children indices of node i, ...)`` adjacency.
+    Returns ``None`` if the graph has a cycle."""
+    in_degree = [0] * len(adjacency)
+    for dsts in adjacency:
+        for j in dsts:
+            in_degree[j] += 1
+    order = [i for i, d in enumerate(in_degree) if d == 0]
+    for i in order:  # (order grows as we iterate)
+        for j in adjacency[i]:
+            in_degree[j] -= 1
+            if in_degree[j] == 0:
+                order.append(j)
+    return order if len(order) == len(adjacency) else None
+
+
 # A possibly faster way to find descendant of a node in a directed ACYCLIC graph
 #
 # def find_descendants(d, key):
@@ -0,0 +1,250 @@
+"""Profiling the func nodes of a DAG.
+
+Profiling is enabled with the ``DAG.profile`` context manager, that records every
+call of every func node of the dag (wall time, cpu time, errors, process and
+thread) in a ``NodeProfiler``. When it's not enabled, nothing is recorded (nor
+checked), so it costs nothing.
+
+>>> from meshed import DAG
+>>> def f(a, b):
+...     return a + b
+>>> def g(f, c=2):
+...     return f * c
+>>> dag = DAG([f, g])
+>>> with dag.profile() as profiler:
+...     for a in range(3):
+...         _ = dag(a, 1)
+>>> {name: stats.calls for name, stats in profiler.stats().items()}
+{'f_': 3, 'g_': 3}
+
+The records can then be looked at through ``profiler.print_stats()``, a table
+akin to the one of ``pstats``, or exported as a Chrome trace (see
+``NodeProfiler.dump_chrome_trace``), that can be viewed with https://ui.perfetto.dev
+or ``chrome://tracing`` (offline).
+
+Func nodes computed in process pools (see ``meshed.executors``) are recorded in the
+worker process (so with its pid), and the record is sent back with the output.
+Note that for coroutine functions, only the creation of the coroutine is recorded.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+
+class NodeCall(NamedTuple):
+    """The record of the call of a func node. Times are in nanoseconds."""
+
+    name: str
+    start: int  # time.perf_counter_ns() at the start of the call
+    wall_time: int
+    cpu_time: int  # (cpu time of the thread the call ran in)
+    pid: int
+    tid: int
+    failed: bool
+
+
+class NodeStats(NamedTuple):
+    """The aggregated records of the calls of a func node. Times are in seconds."""
+
+    calls: int
+    errors: int
+    wall_time: float
+    cpu_time: float
+    max_wall_time: float
+
+    @property
+    def wall_time_per_call(self) -> float:
+        return self.wall_time / self.calls if self.calls else 0.0
+
+
+class NodeProfiler:
+    """Records the calls of func nodes (see ``DAG.profile``)."""
+
+    def __init__(self):
+        self.calls: List[NodeCall] = []
+
+    def record(self, name: str, func: Callable, arg):
+        """Call ``func(arg)``, recording the call under ``name``"""
+        start, cpu_start = time.perf_counter_ns(), time.thread_time_ns()
+        failed = True
+        try:
+            output = func(arg)
+            failed = False
+            return output
+        finally:
+            end, cpu_end = time.perf_counter_ns(), time.thread_time_ns()
+            self.calls.append(  # (list.append is thread-safe)
+                NodeCall(
+                    name,
+                    start,
+                    end - start,
+                    cpu_end - cpu_start,
+                    os.getpid(),
+                    threading.get_ident(),
+                    failed,
+                )
+            )
+
+    def clear(self):
+        self.calls = []
+
+    def stats(self) -> Dict[str, NodeStats]:
+        """The ``{name: NodeStats, ...}`` of the recorded calls, by func node name"""
+        aggregates = {}
+        for call in self.calls:
+            calls, errors, wall, cpu, max_wall = aggregates.get(call.name, (0,) * 5)
+            aggregates[call.name] = (
+                calls + 1,
+                errors + call.failed,
+                wall + call.wall_time,
+                cpu + call.cpu_time,
+                max(max_wall, call.wall_time),
+            )
+        return {
+            name: NodeStats(calls, errors, wall / 1e9, cpu / 1e9, max_wall / 1e9)
+            for name, (calls, errors, wall, cpu, max_wall) in aggregates.items()
+        }
+
+    def stats_table(self, sort_by: str = 'wall_time') -> str:
+        """The stats as a table (sorted by the ``sort_by`` field of ``NodeStats``,
+        in decreasing order), akin to the one of ``pstats``."""
+        stats = sorted(
+            self.stats().items(),
+            key=lambda item: getattr(item[1], sort_by),
+            reverse=True,
+        )
+        header = (
+            f"{'ncalls':>8} {'nerrors':>8} {'tottime':>10} {'percall':>10} "
+            f"{'cputime':>10} {'maxtime':>10}  node"
+        )
+        lines = [header]
+        for name, s in stats:
+            lines.append(
+                f'{s.calls:>8} {s.errors:>8} {s.wall_time:>10.6f} '
+                f'{s.wall_time_per_call:>10.6f} {s.cpu_time:>10.6f} '
+                f'{s.max_wall_time:>10.6f}  {name}'
+            )
+        return '\n'.join(lines)
+
+    def print_stats(self, sort_by: str = 'wall_time'):
+        print(self.stats_table(sort_by))
+
+    def chrome_trace(self) -> dict:
+        """The recorded calls in the Chrome trace event format (as "complete" events,
+        with times in microseconds)."""
+        t0 = min((call.start for call in self.calls), default=0)
+        events = [
+            {
+                'name': call.name,
+                'cat': 'func_node',
+                'ph': 'X',
+                'ts': (call.start - t0) / 1e3,
+                'dur': call.wall_time / 1e3,
+                'pid': call.pid,
+                'tid': call.tid,
+                'args': {'cpu_time_us': call.cpu_time / 1e3, 'failed': call.failed},
+            }
+            for call in self.calls
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump_chrome_trace(self, filepath: str):
+        """Write the Chrome trace of the recorded calls in a json file"""
+        with open(filepath, 'w') as fp:
+            json.dump(self.chrome_trace(), fp)
+
+
+class ProfiledCallPlan:
+    """Wraps the ``call_plan`` of a func node to record its calls in a profiler"""
+
+    __slots__ = ('call_plan', 'name', 'profiler')
+
+    def __init__(self, call_plan: Callable, name: str, profiler: NodeProfiler):
+        self.call_plan = call_plan
+        self.name = name
+        self.profiler = profiler
+
+    def __call__(self, scope):
+        return self.profiler.record(self.name, self.call_plan, scope)
+
+    def remote(self) -> 'RemoteProfiledCallPlan':
+        """What to send to another process, to record the calls there (see
+        ``collect``)"""
+        return RemoteProfiledCallPlan(self.call_plan, self.name)
+
+    def collect(self, future: Future) -> Future:
+        """The future of the output of a ``remote`` call (given its ``future``), that
+        records the ``NodeCall`` that came back with the output (or the error)"""
+        collected = Future()
+
+        def _collect(future):
+            try:
+                output, call = future.result()
+            except BaseException as error:
+                if (call := error.__dict__.pop(_node_call_attr, None)) is not None:
+                    self.profiler.calls.append(call)
+                collected.set_exception(error)
+            else:
+                self.profiler.calls.append(call)
+                collected.set_result(output)
+
+        future.add_done_callback(_collect)
+        return collected
+
+    def __reduce__(self):
+        # When pickled (but not through ``remote``), the calls can't be recorded
+        return _identity, (self.call_plan,)
+
+
+_node_call_attr = '_meshed_node_call'  # (where the record of a failed call goes)
+
+
+class RemoteProfiledCallPlan:
+    """A ``call_plan`` whose calls return an ``(output, node_call)`` pair. When the
+    call fails, the ``NodeCall`` is attached to the error instead."""
+
+    __slots__ = ('call_plan', 'name')
+
+    def __init__(self, call_plan: Callable, name: str):
+        self.call_plan = call_plan
+        self.name = name
+
+    def __call__(self, scope):
+        profiler = NodeProfiler()
+        try:
+            output = profiler.record(self.name, self.call_plan, scope)
+        except Exception as error:
+            setattr(error, _node_call_attr, profiler.calls[0])
+            raise
+        return output, profiler.calls[0]
+
+    def __reduce__(self):
+        return type(self), (self.call_plan, self.name)
+
+
+def _identity(x):
+    return x
+
+
+@contextmanager
+def profiled(func_nodes: Iterable, profiler: Optional[NodeProfiler] = None):
+    """A context in which the calls of the ``func_nodes`` are recorded in the
+    ``profiler`` (a new ``NodeProfiler`` by default), which is yielded."""
+    profiler = profiler if profiler is not None else NodeProfiler()
+    func_nodes = list(func_nodes)
+    wrappers = []
+    for func_node in func_nodes:
+        wrapper = ProfiledCallPlan(func_node.call_plan, func_node.name, profiler)
+        func_node.call_plan = wrapper
+        wrappers.append(wrapper)
+    try:
+        yield profiler
+    finally:
+        for func_node, wrapper in zip(func_nodes, wrappers):
+            if func_node.call_plan is wrapper:  # (else, it was recompiled since)
+                func_node.call_plan = wrapper.call_plan
@@ -62,6 +62,7 @@ from typing import (
 from i2 import Sig, ContextFanout
 from meshed.base import FuncNode
 from meshed.dag import DAG
+from meshed.util import signature_of
 
 
 class ExceptionalException(Exception):
@@ -151,13 +152,15 @@ def _handle_exception(
     inputs = dict(exc_val=exc_val, instance=instance)
     if type(exc_val) in handle_exceptions:  # try precise matching first
         exception_handler = handle_exceptions[type(exc_val)]
-        return _call_from_dict(inputs, exception_handler, Sig(exception_handler))
+        return _call_from_dict(
+            inputs, exception_handler, signature_of(exception_handler)
+        )
 
     else:  # if not, find the first matching parent
         for exc_type, exception_handler in handle_exceptions.items():
             if isinstance(exc_val, exc_type):
                 return _call_from_dict(
-                    inputs, exception_handler, Sig(exception_handler)
+                    inputs, exception_handler, signature_of(exception_handler)
                 )
     # You never should get this far, but if you do, there's a problem, let's scream it:
     raise ExceptionalException(
@@ -195,6 +198,14 @@ def _call_from_dict(kwargs: MutableMapping, func: Callable, sig: Sig):
     return func(*args, **kwargs)
 
 
+def _sig_or_default(func) -> Sig:
+    """Like ``Sig.sig_or_default``, but using the ``signature_of`` cache"""
+    try:
+        return signature_of(func)
+    except ValueError:
+        return Sig.sig_or_default(func)
+
+
 def _conditional_pluralization(n_items, singular_msg, plural_msg):
     """To route to the right message (or template) according to ``n_items``"""
     if n_items == 1:
@@ -386,7 +397,7 @@ class Slabs:
         self.scope_factory = scope_factory
         self._handled_exception_types = tuple(self.handle_exceptions)
         self.sigs = {
-            name: Sig.sig_or_default(func) for name, func in self.components.items()
+            name: _sig_or_default(func) for name, func in self.components.items()
         }
         self.context = ContextFanout(**components)
 
@@ -45,3 +45,53 @@ def test_synopsis_string():
         'f_out,g_out -> h_ -> h'
     )
     assert last_fnode.synopsis_string(bind_info='params') == ('ff,gg -> h_ -> h')
+
+
+def test_call_plan_follows_bind_changes():
+    from meshed.base import FuncNode
+
+    def f(x, /, y=2, *, z=3):
+        return x * 100 + y * 10 + z
+
+    fn = FuncNode(f, bind={'x': 'X'})
+    assert fn.call_on_scope({'X': 1}, write_output_into_scope=False) == 123
+    assert fn.call_on_scope({'X': 1, 'y': 5, 'z': 6}) == 156
+
+    # reassigning bind (as DAG.bindings_cleaner does) recompiles the call plan
+    fn.bind = dict(fn.bind, y='Y')
+    assert fn.call_on_scope({'X': 1, 'y': 5, 'Y': 7}) == 173
+
+
+def add_y(x, y=2):
+    return x + y
+
+
+def test_func_node_is_compact_and_caches_its_hash():
+    import copy
+    import pickle
+    import weakref
+    from meshed.base import FuncNode
+
+    fn = FuncNode(add_y, bind={'x': 'X'})
+    assert not hasattr(fn, '__dict__')
+    assert weakref.ref(fn)() is fn
+
+    h = hash(fn)
+    assert fn._hash == h
+    assert fn == FuncNode(add_y, bind={'x': 'X'})
+
+    # reassigning an attribute of the identity of the func node invalidates the hash
+    fn.bind = dict(fn.bind, y='Y')
+    assert fn._hash is None and hash(fn) != h
+    fn.name = 'other_name'
+    assert fn.__name__ == 'other_name'
+    assert repr(fn) == 'FuncNode(x=X,y=Y -> other_name -> add_y)'
+
+    # pickling and copying keep everything but the (recomputed) hash
+    for fn_copy in [pickle.loads(pickle.dumps(fn)), copy.copy(fn), copy.deepcopy(fn)]:
+        assert fn_copy._hash is None
+        assert fn_copy == fn and fn_copy.__name__ == 'other_name'
+        assert fn_copy.call_on_scope({'X': 1, 'Y': 3}) == 4
+
+    # ch_attrs makes a new func node (so a new hash)
+    assert fn.ch_attrs(out='g') != fn
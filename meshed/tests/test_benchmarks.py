@@ -0,0 +1,49 @@
+"""Test benchmarks"""
+import json
+
+
+def test_benchmarks_run_and_compare(tmp_path, capsys):
+    from meshed.benchmarks import scenarios, run_benchmarks, regressions
+    from meshed.benchmarks.runner import main
+
+    chain_scenarios = scenarios(sizes=[5], shapes_to_use=['chain'])
+    results = run_benchmarks(chain_scenarios, repeat=2, number=3)
+    assert set(results['results']) == {
+        'construct/chain/5',
+        'call/chain/5',
+        'call_compiled/chain/5',
+        'getitem/chain/5',
+        'ch_funcs/chain/5',
+        'partial/chain/5',
+        'code_to_dag/chain/5',
+    }
+    assert all('time' in r for r in results['results'].values())
+    assert results['results']['construct/chain/5']['peak_memory'] > 0
+    json.dumps(results)  # it's json-serializable
+
+    slower = json.loads(json.dumps(results))
+    slower['results']['call/chain/5']['time'] *= 2
+    [regression] = regressions(results, slower, threshold=0.5)
+    assert (regression.name, regression.metric) == ('call/chain/5', 'time')
+
+    baseline_path, current_path = tmp_path / 'baseline.json', tmp_path / 'current.json'
+    baseline_path.write_text(json.dumps(results))
+    current_path.write_text(json.dumps(slower))
+    assert main(['compare', str(baseline_path), str(current_path)]) == 1
+    assert 'REGRESSION' in capsys.readouterr().out
+    assert main(['compare', str(baseline_path), str(baseline_path)]) == 0
+
+
+def test_import_benchmarks():
+    from meshed.benchmarks import run_import_benchmarks, import_time_breakdown
+
+    results = run_import_benchmarks(
+        {'import/meshed': 'import meshed', 'import/nothing': 'import no_such_module'},
+        repeat=2,
+    )
+    assert len(results['import/meshed']['times']) == 2
+    assert results['import/meshed']['time'] > 0
+    assert 'ModuleNotFoundError' in results['import/nothing']['error']
+
+    modules = [module for module, *_ in import_time_breakdown('from meshed import DAG')]
+    assert {'meshed', 'meshed.dag'} <= set(modules)
@@ -1,4 +1,5 @@
 """Tests for caching module"""
+import pytest
 
 
 def test_lazy_props():
@@ -56,3 +57,247 @@ def test_lazy_props():
 
     f = Funnel(click_per_impression=0.04)
     assert (f.revenue, f.cost, f.profit) == (200.0, 1.0, 199.0)
+
+
+def test_node_cache_ttl_and_keys():
+    import pickle
+    from meshed import DAG, FuncNode
+    from meshed.caching import NodeCache, content_key
+
+    now = [0.0]
+    calls = []
+
+    def total(prices: dict, qty):
+        calls.append(qty)
+        return sum(prices.values()) * qty
+
+    cache = NodeCache(ttl=10, key=content_key, timer=lambda: now[0])
+    dag = DAG([FuncNode(total, cache=cache)])
+    prices = {'apple': 1, 'pear': 2}
+    assert dag(prices, 2) == dag(dict(prices), 2) == 6
+    assert calls == [2]  # unhashable inputs, but the content key makes it cacheable
+    now[0] = 11  # the output is now too old
+    assert dag(prices, 2) == 6
+    assert calls == [2, 2]
+    assert cache.stats == (1, 2, 0, 1, 1)
+    assert cache.hit_rate == 1 / 3
+
+    # without a key, unhashable inputs are just not cached
+    dag = DAG([total], cache=True)
+    assert dag(prices, 3) == dag(prices, 3) == 9
+    assert dag.cache_stats()['total_'].misses == 2
+
+    # caches can be pickled (to be sent to processes), without their contents
+    cache = NodeCache(ttl=10, key=content_key)
+    assert cache(sum, ([1, 2],), {}) == 3
+    unpickled = pickle.loads(pickle.dumps(cache))
+    assert unpickled.ttl == 10 and len(unpickled) == 0
+
+
+def test_dag_cache_with_threads():
+    from meshed import DAG
+
+    calls = []
+
+    def slow(a):
+        calls.append(a)
+        return a * 2
+
+    def other(slow, b):
+        return slow + b
+
+    dag = DAG([slow, other], cache=True, executor='threads')
+    assert [dag(1, b) for b in range(4)] == [2, 3, 4, 5]
+    assert calls == [1]
+    assert dag.cache_stats()['other_'].misses == 4
+
+
+def test_copied_func_nodes_have_their_own_caches():
+    from meshed import DAG
+
+    def f(a):
+        return a + 1
+
+    def g(f, b):
+        return f * b
+
+    dag = DAG([f, g], cache={'maxsize': 2})
+    assert [dag(1, b) for b in [1, 2, 1]] == [2, 4, 2]
+    assert dag.cache_stats() == {'f_': (2, 1, 0, 0, 1), 'g_': (1, 2, 0, 0, 2)}
+
+    # g is copied (with another func), f isn't
+    new_dag = dag.ch_funcs(g=lambda f, b: f - b)
+    new_g_cache = new_dag.func_nodes[1].cache
+    assert new_g_cache.stats == (0, 0, 0, 0, 0)
+    assert new_g_cache.maxsize == 2  # (same configuration)
+    assert new_dag.func_nodes[0] is dag.func_nodes[0]
+    new_dag(1, 2)
+    assert new_g_cache.misses == 1
+    assert dag.cache_stats()['g_'] == (1, 2, 0, 0, 2)  # (unchanged)
+
+    # all func nodes are copied
+    dag_copy = dag.copy()
+    assert all(stats.hits == 0 for stats in dag_copy.cache_stats().values())
+
+    # the func nodes that are not copied (so those of sub-dags too) share their cache
+    dag['a':'f'](1)
+    assert dag.cache_stats()['f_'].hits == 4
+    assert new_dag.cache_stats()['f_'].hits == 4
+
+
+_disk_cache_calls = []
+
+
+def test_disk_cache(tmp_path):
+    import os
+    from meshed import DAG, FuncNode
+    from meshed.caching import DiskCache
+
+    # (a global: the values a function captures are part of its disk cache key)
+    calls = _disk_cache_calls
+
+    def f(a, b):
+        _disk_cache_calls.append('f')
+        return {'sum': a + b}
+
+    def g(f, c=2):
+        _disk_cache_calls.append('g')
+        return f['sum'] * c
+
+    for compress in [False, 'lzma']:
+        calls.clear()
+        rootdir = tmp_path / str(compress)
+        dag = DAG([f, g], cache=DiskCache(rootdir, compress=compress))
+        assert dag(1, 2) == 6
+        assert calls == ['f', 'g']
+        # A "new process": new dag, new cache, same directory
+        dag = DAG([f, g], cache=DiskCache(rootdir, compress=compress))
+        assert dag(1, 2) == 6
+        assert dag(1, 2, c=3) == 9
+        assert calls == ['f', 'g', 'g']
+        assert dag.cache_stats()['f_'][:2] == (2, 0)
+        # no temporary files left around
+        assert not [p for p in rootdir.rglob('*') if p.name.endswith('.tmp')]
+
+    # The func node identity is part of the key: different bind, different outputs
+    dag = DAG([FuncNode(f, bind={'a': 'b', 'b': 'a'}), g], cache=DiskCache(rootdir))
+    assert dag(1, 2) == 6
+    assert calls[-2:] == ['f', 'g']
+
+
+def test_disk_cache_memory_maps_arrays(tmp_path):
+    np = pytest.importorskip('numpy')
+    from meshed import DAG
+    from meshed.caching import DiskCache
+
+    def arr(n):
+        return np.arange(n, dtype=float)
+
+    def total(arr):
+        return float(arr.sum())
+
+    assert DAG([arr, total], cache=DiskCache(tmp_path))(10) == 45.0
+    dag = DAG([arr, total], cache=DiskCache(tmp_path))
+    assert dag(10) == 45.0
+    assert isinstance(dag.last_scope['arr'], np.memmap)
+
+
+def test_disk_cache_keys_closures_and_defaults(tmp_path):
+    import threading
+    from meshed import DAG
+    from meshed.caching import DiskCache
+
+    def mk_scale(factor):
+        def scale(x):
+            return x * factor
+
+        return scale
+
+    # Same code, same qualified name, but different captured values
+    assert DAG([mk_scale(2)], cache=DiskCache(tmp_path))(10) == 20
+    assert DAG([mk_scale(3)], cache=DiskCache(tmp_path))(10) == 30
+
+    def mk_offset(offset):
+        def add(x, offset=offset):
+            return x + offset
+
+        return add
+
+    assert DAG([mk_offset(1)], cache=DiskCache(tmp_path))(10) == 11
+    assert DAG([mk_offset(2)], cache=DiskCache(tmp_path))(10) == 12
+
+    # What can't be fingerprinted is not disk-cached (but is still computed)
+    def mk_locked(lock):
+        def locked(x):
+            with lock:
+                return x + 1
+
+        return locked
+
+    dag = DAG([mk_locked(threading.Lock())], cache=DiskCache(tmp_path / 'locked'))
+    with pytest.warns(UserWarning, match='will not be disk-cached'):
+        assert dag(1) == 2
+    assert dag(1) == 2
+    assert not list((tmp_path / 'locked').iterdir())
+
+
+def test_content_key_of_sets_is_stable_across_processes():
+    import os
+    import subprocess
+    import sys
+
+    code = (
+        'from meshed.caching import content_key; '
+        "print(content_key({'apple', 'banana', 'cherry'}, b=[frozenset({'x', 'y'})]))"
+    )
+    keys = {
+        subprocess.run(
+            [sys.executable, '-c', code],
+            env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        for seed in range(4)
+    }
+    assert len(keys) == 1
+
+
+class _Scale:
+    def __init__(self, factor):
+        self.factor = factor
+
+    def __call__(self, x):
+        return x * self.factor
+
+    def scale(self, x):
+        return x * self.factor
+
+
+def test_disk_cache_keys_callable_instances_and_methods(tmp_path):
+    from meshed import DAG, FuncNode
+    from meshed.caching import DiskCache
+
+    def scale_dag(func):
+        return DAG([FuncNode(func, name='s', out='y')], cache=DiskCache(tmp_path))
+
+    # Same class, same __call__ code, but different instance state
+    assert scale_dag(_Scale(2))(10) == 20
+    assert scale_dag(_Scale(3))(10) == 30
+    assert scale_dag(_Scale(3).scale)(10) == 30
+    assert scale_dag(_Scale(4).scale)(10) == 40
+
+
+def test_disk_cache_still_returns_outputs_it_cannot_store(tmp_path):
+    import threading
+    from meshed import DAG
+    from meshed.caching import DiskCache
+
+    def lock(a):
+        return threading.Lock()
+
+    dag = DAG([lock], cache=DiskCache(tmp_path))
+    with pytest.warns(UserWarning, match='could not be disk-cached'):
+        assert hasattr(dag(1), 'acquire')
+    assert hasattr(dag(2), 'acquire')  # (no second warning needed: already told)
+    assert not [p for p in tmp_path.rglob('*') if p.is_file()]
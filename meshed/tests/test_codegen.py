@@ -0,0 +1,83 @@
+"""Test compiling dags into python functions"""
+import inspect
+from operator import add, mul
+
+import pytest
+from i2 import Sig
+
+from meshed import DAG, FuncNode
+from meshed.codegen import dag_to_source
+
+
+def f(a, b=2):
+    return a + b
+
+
+def g(f, /, c=3, *, d=4):
+    return f * c + d
+
+
+def h(f, g):
+    return (f, g)
+
+
+@pytest.mark.parametrize(
+    'dag',
+    [
+        DAG([f, g, h]),
+        DAG([f, g, h], free_intermediates=True),
+        DAG([f, g, h], cache=True),
+        DAG([f, g], extract_output_from_scope=lambda scope, leafs: dict(scope)),
+        DAG([f, g, h]).partial(c=5, _remove_bound_arguments=True),
+        DAG([f, g, h]).partial(a=1, c=5, d=0, _fold_constants=True),
+        DAG(
+            [
+                FuncNode(add, bind={'a': 'x', 'b': 'y'}, out='_func0'),
+                FuncNode(mul, bind={'a': '_func0', 'b': 'z'}, out='_func1'),
+            ]
+        ),
+    ],
+)
+def test_compile(dag):
+    func = dag.compile()
+    assert inspect.signature(func) == inspect.signature(dag)
+    for args, kwargs in [((1,), {}), ((1, 2), {'c': 5, 'd': 6}), ((1, 2, 3), {})]:
+        try:
+            expected = dag(*args, **kwargs)
+        except TypeError:  # (not a valid call for this dag)
+            with pytest.raises(TypeError):
+                func(*args, **kwargs)
+        else:
+            assert func(*args, **kwargs) == expected
+    assert inspect.getsource(func) == dag_to_source(dag)
+
+
+def test_compile_source():
+    dag = DAG([f, g, h], free_intermediates=True, cache={'maxsize': 2})
+    assert dag_to_source(dag, 'fgh') == (
+        'def fgh(a, b=_default0, c=_default1, *, d=_default2):\n'
+        "    f = _cache0(_func0, (), {'a': a, 'b': b})\n"
+        "    g = _cache1(_func1, (f, ), {'c': c, 'd': d})\n"
+        "    h = _cache2(_func2, (), {'f': f, 'g': g})\n"
+        '    del f, g\n'
+        '    return h\n'
+    )
+    func = dag.compile()
+    assert [func(1), func(1)] == [(3, 13), (3, 13)]
+    assert dag.cache_stats()['h_'].hits == 1  # (the func nodes' caches are used)
+
+
+def test_compile_of_arguments_taking_their_defaults():
+    def k(x=1, /, y=2):
+        return x * 10 + y
+
+    dag = DAG([k])
+    Sig(dag).remove_names(['x', 'y'])(dag)  # (so x and y take their defaults)
+    assert dag_to_source(dag) == 'def DAG():\n    k = _func0(_default0)\n    return k\n'
+    assert dag.compile()() == dag() == 12
+
+
+def test_compile_errors():
+    dag = DAG([FuncNode(f, out='lambda')])
+    with pytest.raises(ValueError, match="var nodes named \\['lambda'\\]"):
+        dag.compile()
@@ -0,0 +1,135 @@
+"""Test compiled dags"""
+import base64
+import json
+import pickle
+
+import pytest
+from i2 import Sig
+
+from meshed import DAG, FuncNode
+from meshed.compiled import (
+    compile_dag,
+    dag_from_compiled,
+    save_compiled_dag,
+    load_compiled_dag,
+    structural_hash,
+)
+
+
+def f(a, b=2):
+    return a + b
+
+
+def g(f, c: int = 3):
+    return f * c
+
+
+def h(f, g, b=2, d=(1, 2)):
+    return f + g + b + len(d)
+
+
+def mk_dag(**dag_kwargs):
+    return DAG(
+        [f, FuncNode(g, bind={'c': 'x'}), FuncNode(h, name='the_h', out='result')],
+        **dag_kwargs,
+    )
+
+
+def _assert_same_dag(loaded, dag):
+    assert loaded.synopsis_string() == dag.synopsis_string()
+    assert loaded.nodes == dag.nodes
+    assert loaded.__signature__ == dag.__signature__
+    assert (loaded.roots, loaded.leafs) == (dag.roots, dag.leafs)
+    assert loaded(1) == dag(1)
+    assert loaded(1, 5, d=[]) == dag(1, 5, d=[])
+
+
+@pytest.mark.parametrize(
+    'dag_kwargs',
+    [{}, {'name': 'my_dag', 'free_intermediates': True}, {'cache': True}],
+)
+def test_compiled_dag_round_trip(tmp_path, dag_kwargs):
+    dag = mk_dag(**dag_kwargs)
+    filepath = tmp_path / 'dag.json'
+    compiled = save_compiled_dag(dag, str(filepath))
+    assert json.loads(filepath.read_text()) == compiled
+    loaded = load_compiled_dag(str(filepath))
+    _assert_same_dag(loaded, dag)
+    assert loaded.__name__ == dag.__name__
+    assert loaded.free_intermediates == dag.free_intermediates
+    assert compile_dag(loaded)['hash'] == compiled['hash']
+    if dag_kwargs.get('cache'):
+        loaded(1)
+        assert loaded.cache_stats()['the_h'].hits == 1
+
+
+def test_loading_a_compiled_dag_does_not_analyze_it(monkeypatch):
+    dag = mk_dag()
+    compiled = json.loads(json.dumps(compile_dag(dag)))
+
+    def fail(*args, **kwargs):
+        raise AssertionError('The compiled dag was analyzed again')
+
+    monkeypatch.setattr('meshed.dag.topological_sort', fail)
+    monkeypatch.setattr(DAG, 'bindings_cleaner', fail)
+    monkeypatch.setattr(DAG, 'src_name_params', fail)
+    monkeypatch.setattr(FuncNode, '__post_init__', fail)
+    loaded = dag_from_compiled(compiled)
+    assert loaded(1) == dag(1)
+
+
+def test_compiled_dag_of_unimportable_objects():
+    pytest.importorskip('cloudpickle')
+    dag = DAG([FuncNode(lambda x, y=[1, 2]: x + len(y), name='l', out='f'), g])
+    with pytest.raises(ValueError, match='without pickling it'):
+        compile_dag(dag)
+    compiled = json.loads(json.dumps(compile_dag(dag, allow_pickle=True)))
+    assert 'pickle' in compiled['func_nodes'][0]['func']
+    # unpickling can run arbitrary code, so must be explicitly allowed too
+    with pytest.raises(ValueError, match='contains pickled objects'):
+        dag_from_compiled(compiled)
+    loaded = dag_from_compiled(compiled, allow_pickle=True)
+    assert loaded(3) == dag(3)
+
+
+def test_pickled_objects_are_hashed_by_their_code_not_their_pickle_bytes():
+    pytest.importorskip('cloudpickle')
+    import cloudpickle
+
+    def compiled_with(func):
+        return compile_dag(DAG([FuncNode(func, out='y')]), allow_pickle=True)
+
+    compiled = compiled_with(lambda x: x + 1)
+    encoded = compiled['func_nodes'][0]['func']
+    # the same function, pickled differently (e.g. by another cloudpickle version)
+    func = pickle.loads(base64.b64decode(encoded['pickle']))
+    other_bytes = base64.b64encode(cloudpickle.dumps(func, protocol=2)).decode()
+    assert other_bytes != encoded['pickle']
+    encoded['pickle'] = other_bytes
+    assert structural_hash(compiled) == compiled['hash']
+    assert compiled_with(lambda x: x + 2)['hash'] != compiled['hash']
+
+
+def test_compiled_dag_of_a_dag_with_a_changed_signature():
+    dag = mk_dag()
+    new_defaults = {'a': 10, 'd': (1, 2, 3)}
+    dag.__signature__ = Sig(
+        [p.replace(default=new_defaults.get(p.name, p.default)) for p in dag.sig.params]
+    )
+    compiled = compile_dag(dag)
+    sources = {p['name']: 'source' in p for p in compiled['signature']}
+    assert sources == {'a': False, 'b': True, 'x': True, 'd': False}
+    loaded = dag_from_compiled(json.loads(json.dumps(compiled)))
+    assert loaded.__signature__ == dag.__signature__
+    assert loaded() == dag()
+
+
+def test_compiled_dag_validation():
+    compiled = compile_dag(mk_dag())
+    with pytest.raises(ValueError, match="hash of the compiled dag doesn't match"):
+        dag_from_compiled(dict(compiled, leafs=['f']))
+    with pytest.raises(ValueError, match='Unsupported compiled dag version'):
+        dag_from_compiled(dict(compiled, version=0))
+    with pytest.raises(ValueError, match='Not a compiled dag'):
+        dag_from_compiled({'func_nodes': []})
+    assert compile_dag(mk_dag(name='other'))['hash'] != compiled['hash']
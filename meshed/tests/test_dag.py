@@ -296,3 +296,321 @@ def test_dag_partialize():
     new_dag = larger_dag.partial(c=3, a=1)
     assert new_dag(b=5, d=6) == 12
     assert str(signature(new_dag)) == '(b, a=1, c=3, d=4)'
+
+
+def test_dag_partial_with_constant_folding():
+    from collections import Counter
+    from inspect import signature
+    from meshed import DAG, FuncNode
+
+    calls = Counter()
+
+    def rate(region_config):
+        calls['rate'] += 1
+        return region_config['rate']
+
+    def margin(rate, markup=2):
+        calls['margin'] += 1
+        return rate * markup
+
+    def price(cost, margin):
+        calls['price'] += 1
+        return cost + margin
+
+    dag = DAG([rate, margin, FuncNode(price, bind={'cost': 'base_cost'})])
+    assert str(signature(dag)) == '(region_config, base_cost, markup=2)'
+
+    folded = dag.partial(region_config={'rate': 5}, _fold_constants=True)
+    # rate is computed once, here, but not margin, since markup isn't bound
+    assert calls == {'rate': 1}
+    # (the constant rate is bound in the func of margin: it's not a var node anymore)
+    assert folded.synopsis_string() == (
+        'markup -> margin_ -> margin\nbase_cost,margin -> price_ -> price'
+    )
+    assert str(signature(folded)) == '(base_cost, markup=2)'
+    assert folded.roots == tuple(signature(folded).parameters)
+    assert folded(1) == 11
+    assert folded(1, markup=3) == 16
+    assert calls == {'rate': 1, 'margin': 2, 'price': 2}
+
+    # defaulted arguments can be considered as bound too, folding margin as well
+    calls.clear()
+    folded = dag.partial(
+        {'rate': 5},
+        _consider_defaulted_arguments_as_bound=True,
+        _fold_constants=True,
+    )
+    assert [fn.name for fn in folded.func_nodes] == ['price_']
+    assert str(signature(folded)) == '(base_cost)'
+    assert folded.roots == ('base_cost',)
+    assert [folded(1), folded(2)] == [11, 12]
+    assert calls == {'rate': 1, 'margin': 1, 'price': 2}
+    # the folding gives the same results as the dag itself
+    assert folded(7) == dag({'rate': 5}, 7)
+
+    # func nodes that have no inputs are folded, even without bound arguments...
+    calls.clear()
+    dag = DAG.from_funcs(
+        lambda a: a * 2,
+        x=lambda: calls.update(['x']) or 10,
+        y=lambda x, _0: x + _0,
+    )
+    folded = dag.partial(_fold_constants=True)
+    assert calls == {'x': 1}
+    # (y gets x from its func, bound to it, not from the dag's arguments)
+    assert folded.synopsis_string() == 'a -> _0_ -> _0\n_0 -> y_ -> y'
+    assert str(signature(folded)) == '(a)'
+    assert folded.roots == ('a',)
+    assert folded(3) == dag(3) == 16
+    assert calls == {'x': 2}  # (the call of dag)
+
+    # ... and those computing outputs of the dag are kept, as constants
+    folded = dag.partial(a=3, _fold_constants=True)
+    assert str(signature(folded)) == '()'
+    assert [fn.name for fn in folded.func_nodes] == ['y_']
+    assert folded() == 16
+
+    # constants are bound to positional-only params too
+    def scale(x, /, factor):
+        return x * factor
+
+    dag = DAG([FuncNode(lambda: 3, name='three', out='x'), scale])
+    folded = dag.partial(_fold_constants=True)
+    assert str(signature(folded)) == '(factor)'
+    assert folded(5) == dag(factor=5) == 15
+
+
+def test_dag_call_binding_follows_signature_changes():
+    from i2 import Sig
+    from meshed import DAG
+
+    def f(a, b):
+        return a + b
+
+    def g(f, c=3):
+        return f * c
+
+    dag = DAG([f, g])
+    assert dag(1, 2) == dag(1, b=2) == dag(b=2, a=1) == 9
+    with pytest.raises(TypeError):
+        dag(1, 2, 3, 4)
+    with pytest.raises(TypeError):
+        dag(1, 2, not_an_arg=3)
+
+    # changing the signature of the dag changes how arguments are bound
+    Sig(dag).ch_defaults(b=10)(dag)
+    assert dag(1) == 33
+
+
+def test_dag_call_only_computes_what_outputs_need():
+    from meshed import DAG
+
+    called = []
+
+    def f(a, b):
+        called.append('f')
+        return a + b
+
+    def g(f, c):
+        called.append('g')
+        return f * c
+
+    def h(a, d=10):
+        called.append('h')
+        return a - d
+
+    dag = DAG([f, g, h])
+    assert dag.call(a=1, _outputs='h') == -9
+    assert called == ['h']
+    with pytest.raises(TypeError):
+        dag.call(a=1, _outputs='g')  # b and c are needed for g
+    with pytest.raises(ValueError):
+        dag.call(a=1, _outputs='not_a_node')
+
+
+def test_dag_call_skips_what_given_intermediates_make_unnecessary():
+    from meshed import DAG
+
+    called = []
+
+    def f(a, b):
+        called.append('f')
+        return a + b
+
+    def g(f, c):
+        called.append('g')
+        return f * c
+
+    def h(a, d=10):
+        called.append('h')
+        return a - d
+
+    dag = DAG([f, g, h])
+    assert dag(1, 2, 3) == (9, -9)
+    called.clear()
+    # f is given, so f isn't computed, and b isn't needed
+    assert dag(1, c=3, f=5) == (15, -9)
+    assert sorted(called) == ['g', 'h']
+    assert dag.last_scope['f'] == 5
+    called.clear()
+    assert dag.call(c=3, f=5, _outputs='g') == 15
+    assert called == ['g']
+    with pytest.raises(TypeError):
+        dag(1, f=5)  # c is still needed
+    with pytest.raises(TypeError):
+        dag(1, 2, 3, not_a_node=5)
+
+
+def test_dag_free_intermediates():
+    import weakref
+    from meshed import DAG
+
+    class Big:
+        def __init__(self, x):
+            self.x = x
+
+    alive = weakref.WeakSet()
+    max_alive = []
+
+    def mk(x):
+        big = Big(x)
+        alive.add(big)
+        max_alive.append(len(alive))
+        return big
+
+    def a(x):
+        return mk(x + 1)
+
+    def b(a):
+        return mk(a.x * 2)
+
+    def c(b):
+        return mk(b.x - 3)
+
+    def d(c, x):
+        return c.x + x
+
+    for kwargs in [{}, {'executor': 'threads'}]:
+        alive.clear()
+        max_alive.clear()
+        dag = DAG([a, b, c, d], free_intermediates=True, **kwargs)
+        assert dag(2) == 5
+        assert max(max_alive) == 2  # never more than two Big alive together
+        assert set(dag.last_scope) == {'x', 'd'}
+
+    dag = DAG([a, b, c, d])
+    assert dag(2) == 5
+    assert set(dag.last_scope) == {'x', 'a', 'b', 'c', 'd'}
+
+
+def test_dag_update_only_recomputes_what_changed_inputs_affect():
+    from meshed import DAG
+
+    called = []
+
+    def f(a, b):
+        called.append('f')
+        return a + b
+
+    def g(f, c):
+        called.append('g')
+        return f * c
+
+    def h(a, d):
+        called.append('h')
+        return a - d
+
+    for executor in [None, 'threads']:
+        dag = DAG([f, g, h], executor=executor)
+        with pytest.raises(ValueError):
+            dag.update(a=1)  # no previous call
+        assert dag(1, 2, 3, 4) == (9, -3)
+        called.clear()
+        assert dag.update(b=3, d=0) == (12, 1)
+        assert sorted(called) == ['f', 'g', 'h']
+        called.clear()
+        assert dag.update(c=1) == (4, 1)
+        assert called == ['g']
+        assert dag.update() == (4, 1)
+        assert called == ['g']
+        assert dag(1, 3, 1, 0) == dag.update()  # consistent with a full call
+        with pytest.raises(ValueError):
+            dag.update(not_a_var_node=1)
+        # After a call computing only some outputs, h (a leaf) is missing
+        dag.call(1, 2, 3, 4, _outputs=['g'])
+        with pytest.raises(ValueError, match=r"missing from the last scope: \['h'\]"):
+            dag.update(c=5)
+        assert dag.update(d=5) == (9, -4)  # unless the update computes it
+
+
+def test_dag_common_subexpression_elimination():
+    from meshed import DAG, FuncNode
+
+    called = []
+
+    def normalize(x):
+        called.append('normalize')
+        return x / 10
+
+    def scale(v, k=2):
+        called.append('scale')
+        return v * k
+
+    def inc(u):
+        return u + 1
+
+    def combine(u, w):
+        return u + w
+
+    # Two fragments that each compute normalize(x), then scale it
+    fragment_1 = DAG(
+        [
+            FuncNode(normalize, out='nx'),
+            FuncNode(scale, name='s1', bind={'v': 'nx'}, out='s1x'),
+            FuncNode(inc, name='inc1', bind={'u': 's1x'}, out='o1'),
+        ]
+    )
+    fragment_2 = DAG(
+        [
+            FuncNode(normalize, name='norm', out='x_normalized'),
+            FuncNode(scale, name='s2', bind={'v': 'x_normalized'}, out='s2x'),
+            FuncNode(inc, name='inc2', bind={'u': 's2x'}, out='o2'),
+        ]
+    )
+
+    without_cse = DAG([*fragment_1, *fragment_2])
+    with_cse = DAG([*fragment_1, *fragment_2], cse=True)
+    assert len(without_cse.func_nodes) == 6
+    # both normalize, and then (as a consequence) both scale, are merged, but not
+    # the incs, since their outputs are those of the dag
+    assert with_cse.synopsis_string() == (
+        'x -> normalize -> nx\n'
+        'nx,k -> s1 -> s1x\n'
+        's1x -> inc1 -> o1\n'
+        's1x -> inc2 -> o2'
+    )
+    called.clear()
+    assert with_cse(10) == without_cse(10) == (3, 3)
+    assert called.count('normalize') == 1 + 2  # (once with cse, twice without)
+
+    # the union of dags is made with cse if any of them was
+    assert len((DAG(fragment_1, cse=True) + fragment_2).func_nodes) == 4
+    assert len(sum([DAG(fragment_1, cse=True), fragment_2]).func_nodes) == 4
+    assert len((fragment_1 + fragment_2).func_nodes) == 6
+
+    # func nodes whose outputs are outputs of the dag aren't merged...
+    assert DAG([*fragment_1, *fragment_2], cse=True).leafs == ('o1', 'o2')
+    # ... unless they have the same output
+    same_output = [FuncNode(normalize, name=name, out='nx') for name in ['n1', 'n2']]
+    assert len(DAG(same_output, cse=True).func_nodes) == 1
+
+    # A func node can't read a var node twice, so those it reads can't be merged
+    combiner = FuncNode(combine, bind={'u': 's1x', 'w': 's2x'}, out='total')
+    dag = DAG([*fragment_1[:'s1x'], *fragment_2[:'s2x'], combiner], cse=True)
+    assert dag.synopsis_string() == (
+        'x -> normalize -> nx\n'
+        'nx,k -> s1 -> s1x\n'
+        'nx,k -> s2 -> s2x\n'
+        's1x,s2x -> combine -> total'
+    )
+    assert dag(10) == 4
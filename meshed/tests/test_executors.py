@@ -0,0 +1,265 @@
+"""Test executors"""
+import time
+
+import pytest
+
+from meshed import DAG
+from meshed.util import ValidationError
+
+
+def test_threads_executor_runs_independent_branches_concurrently():
+    import threading
+
+    # Neither branch can get past the barrier until the other has reached it
+    # (if they ran sequentially, the barrier would time out, and raise)
+    both_running = threading.Barrier(2, timeout=5)
+
+    def this(a):
+        both_running.wait()
+        return a + 1
+
+    def that(a):
+        both_running.wait()
+        return a * 10
+
+    def combine(this, that):
+        return this, that
+
+    dag = DAG([this, that, combine], executor='threads', max_workers=2)
+    assert dag(2) == (3, 20)
+    assert dag.last_scope == {'a': 2, 'this': 3, 'that': 20, 'combine': (3, 20)}
+
+
+def test_threads_executor_raises_first_failing_node_error():
+    def first(a):
+        time.sleep(0.1)
+        raise ValueError('first')
+
+    def second(a):
+        raise KeyError('second')
+
+    def third(first, second):
+        return first, second
+
+    dag = DAG([first, second, third], executor='threads')
+    with pytest.raises(ValueError, match='first'):
+        dag(1)
+
+
+def test_executors_raise_the_error_a_sequential_call_would():
+    import asyncio
+    import threading
+
+    b_failed = threading.Event()
+
+    def a(x):
+        b_failed.wait(timeout=5)  # (so that b fails first)
+        time.sleep(0.05)
+        return x
+
+    def c(a):
+        raise ValueError('c')
+
+    def b(x):
+        b_failed.set()
+        raise KeyError('b')
+
+    # c comes before b in topological order, so it's c's error that's raised,
+    # though c is only submitted after b failed
+    dag = DAG([a, c, b])
+    assert [fn.name for fn in dag.func_nodes] == ['a_', 'c_', 'b_']
+    dag.executor = 'threads'
+    with pytest.raises(ValueError, match='c'):
+        dag(1)
+    b_failed.set()  # (a is called before b when not in threads: it can't wait for it)
+    dag.executor = None
+    with pytest.raises(ValueError, match='c'):
+        dag(1)
+    with pytest.raises(ValueError, match='c'):
+        asyncio.run(dag.acall(1))
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        DAG([lambda a: a], executor='not_an_executor')
+
+
+def test_changing_the_executor_of_a_dag_after_construction():
+    import threading
+
+    def thread_id(a):
+        return threading.get_ident()
+
+    dag = DAG([thread_id])
+    assert dag(1) == threading.get_ident()
+    dag.executor = 'threads'
+    assert dag(1) != threading.get_ident()
+    dag.executor = None
+    assert dag(1) == threading.get_ident()
+    dag.executor = 'not_an_executor'
+    with pytest.raises(ValueError):
+        dag(1)
+
+
+def _square(x):
+    return x * x
+
+
+def test_processes_executor_with_unpicklable_funcs():
+    import os
+    from meshed import FuncNode
+    from meshed.dag import named_partial
+
+    pytest.importorskip('cloudpickle')
+
+    dag = DAG(
+        [
+            FuncNode(_square, bind={'x': 'a'}, out='a2', executor='processes'),
+            FuncNode(lambda a: os.getpid(), name='pid', executor='processes'),
+            FuncNode(named_partial(pow, exp=3), bind={'base': 'a'}, out='a3'),
+            FuncNode(lambda a2, a3: a2 + a3, name='total'),
+        ]
+    )
+    pid, total = dag(2)
+    assert total == 4 + 8
+    assert pid != os.getpid()
+
+
+def test_dag_level_processes_executor():
+    dag = DAG([_square], executor='processes', max_workers=2)
+    assert dag(3) == 9
+
+
+def test_acall_runs_independent_coroutines_concurrently():
+    import asyncio
+    import threading
+    from meshed import FuncNode
+
+    # Each func node waits for the others to have started (if they ran
+    # sequentially, the waiting would time out, and raise)
+    started = set()
+    all_started = threading.Event()
+
+    def start(name):
+        started.add(name)
+        if len(started) == 3:
+            all_started.set()
+
+    async def all_started_or_timeout():
+        for _ in range(500):  # (5 seconds)
+            if all_started.is_set():
+                return
+            await asyncio.sleep(0.01)
+        raise TimeoutError('The func nodes did not run concurrently')
+
+    async def this(a):
+        start('this')
+        await all_started_or_timeout()
+        return a + 1
+
+    async def that(a):
+        start('that')
+        await all_started_or_timeout()
+        return a * 10
+
+    def blocking(a):  # (would block the event loop, if it wasn't in a thread)
+        start('blocking')
+        assert all_started.wait(timeout=5)
+        return -a
+
+    def combine(this, that, blocking):
+        return this, that, blocking
+
+    dag = DAG([this, that, FuncNode(blocking, executor='threads'), combine])
+    assert asyncio.run(dag.acall(2)) == (3, 20, -2)
+
+
+def test_dag_map_with_processes():
+    def f(a, b=1):
+        return a + b
+
+    def g(f, c=2):
+        return f * c
+
+    dag = DAG([f, g])
+    rows = [{'a': i} for i in range(7)] + [{'a': 1, 'c': 10}, {'f': 5}]
+    expected = [dag(**row) for row in rows]
+    assert list(dag.map(rows)) == expected
+    pytest.importorskip('cloudpickle')  # f and g are local functions
+    assert list(dag.map(rows, chunksize=3, executor='processes')) == expected
+    # columns, and a dag that was already called with threads (so has executors)
+    dag = DAG([f, g], executor='threads')
+    assert dag(1) == 4
+    assert list(
+        dag.map_columns({'a': [1, 2], 'c': [3, 4]}, executor='processes')
+    ) == [6, 12]
+
+
+def test_dag_stream_pipelines_stages():
+    import threading
+    from collections import defaultdict
+
+    fetched = defaultdict(threading.Event)
+
+    def fetch(x):
+        fetched[x].set()
+        return x * 10
+
+    def crunch(fetch):
+        if fetch == 30:
+            raise ValueError('bad record')
+        return fetch + 1
+
+    def crunch_once_next_is_fetched(fetch, n=6):
+        # A record is only crunched once the next one was fetched, concurrently
+        # (if the stages ran sequentially, this would time out)
+        if (x := fetch // 10) + 1 < n:
+            assert fetched[x + 1].wait(timeout=5)
+        return fetch + 1
+
+    dag = DAG([fetch, crunch_once_next_is_fetched])
+    outputs = list(dag.stream({'x': x} for x in range(6)))
+    assert outputs == [1, 11, 21, 31, 41, 51]
+
+    dag = DAG([fetch, crunch])
+    stream = dag.stream({'x': x} for x in range(6))
+    assert [next(stream), next(stream), next(stream)] == [1, 11, 21]
+    with pytest.raises(ValueError, match='bad record'):
+        next(stream)
+
+    with pytest.raises(ValidationError):
+        dag.stream([], stages=[['crunch_'], ['fetch_']])
+    with pytest.raises(ValidationError):
+        dag.stream([], stages=[['fetch_']])
+
+
+def test_executors_made_by_name_are_shut_down():
+    import gc
+    from concurrent.futures import ThreadPoolExecutor
+    from meshed import FuncNode
+    from meshed.executors import FuncNodeSubmitter
+
+    def f(a):
+        return a + 1
+
+    square = FuncNode(_square, executor='processes')
+    given = ThreadPoolExecutor(max_workers=1)
+    submit = FuncNodeSubmitter(given)
+    assert submit(FuncNode(f), {'a': 1}).result() == 2
+    assert submit(square, {'x': 3}).result() == 9
+    made = submit.executor_for(square)
+    del submit
+    gc.collect()  # the pools the submitter made are shut down with it...
+    with pytest.raises(RuntimeError):
+        made.submit(f, 1)
+    assert given.submit(f, 1).result() == 2  # ... but not the ones it was given
+    given.shutdown()
+
+    dag = DAG([f], executor='threads')
+    assert dag(1) == 2
+    made = dag._submitter.executor_for(dag.func_nodes[0])
+    dag.executor = 'inline'  # the threads are not needed anymore
+    assert dag(1) == 2
+    with pytest.raises(RuntimeError):
+        made.submit(f, 1)
+    dag.close()
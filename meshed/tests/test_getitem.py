@@ -84,3 +84,76 @@ def test_full_subgraph(bigger_dag):
     result = bigger_dag[['truth', 'prediction']:'confusion_count']
     expected = 'DAG(func_nodes=[FuncNode(prediction,truth -> confusion_count_ -> confusion_count)], name=None)'
     assert result.__repr__() == expected
+
+
+def test_getitem_of_deep_dag():
+    def inc(x):
+        return x + 1
+
+    n = 3000
+    func_nodes = [
+        FuncNode(inc, name=f'f{i}', bind={'x': f'v{i - 1}' if i else 'a'}, out=f'v{i}')
+        for i in range(n)
+    ]
+    dag = DAG(func_nodes)
+    subdag = dag['v999':'v1999']
+    assert len(subdag.func_nodes) == 1000
+    assert subdag(v999=0) == 1000
+
+
+def test_getitem_is_cached():
+    def f(a):
+        return a + 1
+
+    def g(f):
+        return f * 2
+
+    def h(g):
+        return g - 3
+
+    dag = DAG([f, g, h])
+    subdag = dag['f':'h']
+    assert dag['f':'h'].graph is subdag.graph  # (the analysis isn't redone)
+    assert dag[['f']:['h']].graph is subdag.graph
+    assert subdag(f=2) == 1
+    # the func nodes of the sub-dag are the ones of the dag (not copies)
+    assert all(fn in dag.func_nodes for fn in subdag.func_nodes)
+
+    # a change of the dag's configuration invalidates the cached sub-dags
+    dag.executor = 'threads'
+    other_subdag = dag['f':'h']
+    assert other_subdag.graph is not subdag.graph
+    assert other_subdag.executor == 'threads'
+    assert other_subdag(f=2) == 1
+
+    # the number of cached sub-dags is bounded
+    dag._max_cached_sub_dags = 2
+    for stop in ['f', 'g', 'h']:
+        dag['a':stop]
+    assert len(dag._sub_dags) == 2
+
+
+def test_getitem_returns_independent_sub_dags():
+    from i2 import Sig
+
+    def f(a):
+        return a + 1
+
+    def g(f, b=2):
+        return f * b
+
+    dag = DAG([f, g])
+    subdag = dag['f':'g']
+    assert subdag(f=1) == 2
+    subdag.name = 'changed'
+    subdag.executor = 'threads'
+    Sig('(f, b=3)')(subdag)
+    other_subdag = dag['f':'g']
+    assert other_subdag.last_scope is None
+    assert other_subdag.name is None and other_subdag.executor is None
+    assert str(Sig(other_subdag)) == '(f, b=2)'
+    assert other_subdag(f=1) == 2
+
+    # items that aren't slices still fail explicitly
+    with pytest.raises(AssertionError, match='must be a slice'):
+        dag['a']
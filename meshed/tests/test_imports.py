@@ -0,0 +1,35 @@
+"""Test that the objects of meshed are imported lazily"""
+import subprocess
+import sys
+
+import pytest
+
+
+def _modules_imported_by(statement):
+    code = f'import sys; {statement}; print(*sorted(sys.modules))'
+    return set(subprocess.check_output([sys.executable, '-c', code], text=True).split())
+
+
+@pytest.mark.parametrize(
+    'statement, not_imported',
+    [
+        ('import meshed', {'meshed.dag', 'meshed.base', 'meshed.makers', 'i2'}),
+        (
+            'from meshed import DAG, FuncNode',
+            {'meshed.makers', 'meshed.slabs', 'asyncio', 'multiprocessing'},
+        ),
+    ],
+)
+def test_lazy_imports(statement, not_imported):
+    assert not (_modules_imported_by(statement) & not_imported)
+
+
+def test_lazy_attributes():
+    import meshed
+    from meshed.dag import DAG
+
+    assert meshed.DAG is DAG
+    assert meshed.itools.topological_sort is meshed.topological_sort
+    assert set(meshed.__all__) <= set(dir(meshed))
+    with pytest.raises(AttributeError):
+        meshed.no_such_thing
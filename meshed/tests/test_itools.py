@@ -259,3 +259,85 @@ def test_edge_reversed_graph(simple_graph):
         'e': ['a'],
         'a': [],
     }
+
+
+def test_topological_sort_of_deep_graphs(digraph_children):
+    assert ms.itools.topological_sort(digraph_children) == [0, 1, 2, 3, 4]
+    # deep graphs don't hit the recursion limit
+    n = 50_000
+    chain = {i: [i + 1] for i in range(n)}
+    assert ms.itools.topological_sort(chain) == list(range(n + 1))
+
+
+def test_topological_sort_cycle(graph_children):
+    with pytest.raises(ms.util.CycleError) as exc_info:
+        ms.itools.topological_sort(graph_children)
+    assert exc_info.value.cycle in ([1, 2], [2, 1])
+    with pytest.raises(ms.util.CycleError, match='x -> x'):
+        ms.itools.topological_sort({'x': ['x']})
+
+
+def test_dag_with_a_cycle_raises():
+    def f(a):
+        return a
+
+    def g(b):
+        return b
+
+    with pytest.raises(ms.util.CycleError):
+        ms.DAG([ms.FuncNode(f, out='b'), ms.FuncNode(g, out='a')])
+
+
+@pytest.mark.parametrize('closure_max_size', [0, 2000])
+def test_indexed_graph(digraph_children, closure_max_size):
+    g = digraph_children
+    ig = ms.itools.IndexedGraph(g)
+    ig.closure_max_size = closure_max_size
+    assert ig == g
+    assert list(ig) == list(g) and list(reversed(ig)) == list(reversed(g))
+    assert ms.itools.topological_sort(ig) == ms.itools.topological_sort(g)
+    for source in ([2, 3], [4], [0], [1, 'not_a_node']):
+        assert ig.ancestors(source) == ms.itools.ancestors(g, source)
+        assert ig.descendants(source) == ms.itools.descendants(g, source)
+        assert ig.children(source) == ms.itools.children(g, source)
+        assert ig.parents(source) == ms.itools.parents(g, source)
+    assert ig.root_nodes() == ms.itools.root_nodes(g)
+    assert ig.leaf_nodes() == ms.itools.root_nodes(ms.itools.edge_reversed_graph(g))
+
+
+def test_indexed_graph_with_cycles(graph_children):
+    ig = ms.itools.IndexedGraph(graph_children)
+    assert ig.descendants([3]) == {4}
+    assert ig.descendants([1]) == {2, 3, 4}  # (the source is excluded)
+    assert ig.ancestors([4]) == {0, 1, 2, 3}
+
+
+def test_indexed_graph_is_immutable(digraph_children):
+    ig = ms.itools.IndexedGraph(digraph_children)
+    assert all(isinstance(dsts, tuple) for dsts in ig.values())
+    with pytest.raises(AttributeError):
+        ig[0].append(3)
+
+
+def test_gk_network_steps_dont_depend_on_the_hash_seed():
+    import os
+    import subprocess
+    import sys
+
+    code = (
+        'from meshed.ext.gk import operation, compose\n'
+        "op1 = operation(name='op1', needs=['a', 'b', 'c', 'd'], provides='s')(max)\n"
+        "op2 = operation(name='op2', needs=['s', 'e'], provides='t')(max)\n"
+        "print(compose(name='net')(op1, op2).net.steps)\n"
+    )
+    steps = {
+        subprocess.run(
+            [sys.executable, '-c', code],
+            env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        for seed in range(4)
+    }
+    assert len(steps) == 1
@@ -0,0 +1,72 @@
+"""Test profiling"""
+import json
+import time
+
+import pytest
+
+from meshed import DAG
+
+
+def test_profile_dag(tmp_path):
+    def slow(a):
+        time.sleep(0.02)
+        return a + 1
+
+    def fails_on_zero(slow, b):
+        return slow / b
+
+    dag = DAG([slow, fails_on_zero], executor='threads')
+    original_call_plans = [fn.call_plan for fn in dag.func_nodes]
+    with dag.profile() as profiler:
+        assert dag(1, 2) == 1
+        with pytest.raises(ZeroDivisionError):
+            dag(1, 0)
+    # profiling is off (and the call plans are back) outside of the context
+    assert [fn.call_plan for fn in dag.func_nodes] == original_call_plans
+    dag(1, 2)
+    assert len(profiler.calls) == 4
+
+    stats = profiler.stats()
+    assert stats['slow_'].calls == 2 and stats['slow_'].errors == 0
+    assert stats['fails_on_zero_'].errors == 1
+    assert stats['slow_'].wall_time >= 0.04
+    assert stats['slow_'].cpu_time < stats['slow_'].wall_time  # sleeping is free
+    assert profiler.stats_table().splitlines()[1].endswith('slow_')
+
+    filepath = tmp_path / 'trace.json'
+    profiler.dump_chrome_trace(filepath)
+    events = json.loads(filepath.read_text())['traceEvents']
+    assert [(e['name'], e['ph'], e['args']['failed']) for e in events] == [
+        ('slow_', 'X', False),
+        ('fails_on_zero_', 'X', False),
+        ('slow_', 'X', False),
+        ('fails_on_zero_', 'X', True),
+    ]
+    assert events[0]['dur'] >= 20_000  # microseconds
+
+
+def test_profile_dag_with_processes():
+    # func nodes computed in other processes are recorded there (with their pid)
+    import os
+    from operator import add, mul, truediv
+    from meshed import FuncNode
+
+    dag = DAG(
+        [
+            FuncNode(add, out='s', executor='processes'),
+            FuncNode(truediv, bind={'a': 's'}, out='q', executor='processes'),
+            FuncNode(mul, bind={'a': 'q'}),
+        ]
+    )
+    with dag.profile() as profiler:
+        assert dag(1, 2) == 3.0
+        with pytest.raises(ZeroDivisionError):
+            dag(1, 0)
+    calls = [(c.name, c.pid == os.getpid(), c.failed) for c in profiler.calls]
+    assert calls == [
+        ('add', False, False),
+        ('truediv', False, False),
+        ('mul_', True, False),
+        ('add', False, False),
+        ('truediv', False, True),
+    ]
@@ -24,3 +24,28 @@ def test_func_name():
 
     assert ms.util.func_name(my_func) == 'my_func'
     assert ms.util.func_name(lambda x: x).startswith('lambda_')
+
+
+def test_signature_of():
+    import gc
+    from i2 import Sig
+
+    def f(a, b=2):
+        return a + b
+
+    sig = ms.util.signature_of(f)
+    assert sig == Sig(f) and ms.util.signature_of(f) is sig
+
+    # func nodes and dags made from a same function share the same Sig
+    fn1, fn2 = ms.FuncNode(f, out='x'), ms.FuncNode(f, out='y')
+    assert fn1.sig is fn2.sig is sig
+
+    # reassigning the signature of the function invalidates the cached one
+    Sig(lambda a, b=3: None)(f)
+    assert str(ms.util.signature_of(f)) == '(a, b=3)'
+
+    # the cache doesn't keep functions alive
+    n_cached = len(ms.util._signatures)
+    del f, fn1, fn2
+    gc.collect()
+    assert len(ms.util._signatures) < n_cached
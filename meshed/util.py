@@ -3,6 +3,7 @@ import re
 from functools import partial, wraps
 from inspect import Parameter, getmodule
 from types import ModuleType
+from weakref import WeakKeyDictionary
 from typing import Callable, Any, Union, Iterator, Optional, Iterable, Mapping, TypeVar
 from importlib import import_module
 from operator import itemgetter
@@ -498,6 +499,55 @@ def func_name(func) -> str:
         return unnameable_func_name()
 
 
+# {func: (id(func), signature markers of func, Sig(func))}, weakly keyed by func
+_signatures = WeakKeyDictionary()
+
+
+def _signature_markers(func):
+    # The attributes that, if (re)assigned, change the signature of func
+    return (
+        getattr(func, '__signature__', None),
+        getattr(func, '__defaults__', None),
+        getattr(func, '__kwdefaults__', None),
+    )
+
+
+def signature_of(func: Callable) -> Sig:
+    """The ``Sig(func)``, cached process-wide (weakly keyed by ``func``, so the cache
+    doesn't keep functions alive), so that the many func nodes, slabs and dags made
+    from a same function share a same ``Sig`` (which is only computed once).
+
+    >>> def f(a, b=2): ...
+    >>> signature_of(f)
+    <Sig (a, b=2)>
+    >>> signature_of(f) is signature_of(f)
+    True
+
+    If the signature of ``func`` is changed (by (re)assigning its ``__signature__``,
+    ``__defaults__`` or ``__kwdefaults__``), it is computed again:
+
+    >>> f.__defaults__ = (3,)
+    >>> signature_of(f)
+    <Sig (a, b=3)>
+
+    Callables that can't be weakly referenced (or hashed) are not cached.
+    """
+    markers = _signature_markers(func)
+    try:
+        cached = _signatures.get(func, None)
+    except TypeError:  # func can't be weakly referenced, or isn't hashable
+        return Sig(func)
+    if (
+        cached is not None
+        and cached[0] == id(func)  # (not just an equal callable)
+        and all(x is y for x, y in zip(cached[1], markers))
+    ):
+        return cached[2]
+    sig = Sig(func)
+    _signatures[func] = (id(func), markers, sig)
+    return sig
+
+
 # ---------------------------------------------------------------------------------------
 # Misc
 
@@ -614,6 +664,16 @@ class NotFound(ValidationError):
     """To be raised when something is expected to exist, but doesn't"""
 
 
+class CycleError(ValidationError):
+    """To be raised when a graph is expected to be acyclic, but has a cycle.
+    The ``cycle`` attribute holds the nodes of the cycle (in order)."""
+
+    def __init__(self, cycle):
+        self.cycle = list(cycle)
+        path = ' -> '.join(map(str, self.cycle + self.cycle[:1]))
+        super().__init__(f'The graph has a cycle: {path}')
+
+
 class NameValidationError(ValueError):
     """Use to indicate that there's a problem with a name or generating a valid name"""
 
@@ -641,7 +701,7 @@ def mk_func_name(func, exclude_names=()):
 
 
 def arg_names(func, func_name, exclude_names=()):
-    names = Sig(func).names
+    names = signature_of(func).names
 
     def gen():
         _exclude_names = exclude_names
@@ -974,6 +1034,28 @@ def extract_values(d: dict, keys: Iterable):
         return None
 
 
+def mk_values_extractor(keys: Iterable):
+    """Make a function that does what ``extract_values(d, keys)`` does, for fixed
+    ``keys``, without the per-call generic machinery.
+
+    >>> extract = mk_values_extractor(['b', 'a'])
+    >>> extract({'a': 1, 'b': 2, 'c': 3})
+    (2, 1)
+    >>> mk_values_extractor(['a'])({'a': 1, 'b': 2})
+    1
+    >>> assert mk_values_extractor([])({'a': 1}) is None
+    """
+    keys = tuple(keys)
+    if keys:
+        return itemgetter(*keys)  # a tuple if len(keys) > 1, a single value if not
+    else:
+        return _return_none
+
+
+def _return_none(*args, **kwargs):
+    return None
+
+
 def extract_items(d: dict, keys: Iterable):
     """generator of (k, v) pairs extracted from d for keys"""
     for k in keys: